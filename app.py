@@ -1,6 +1,6 @@
 import streamlit as st
-import dotenv
-from src.models.recommender import MovieRecommender
+from src.data.storage import DEFAULT_USER
+from src.models.settings import load_model as load_configured_model
 from src.ui.translator import Translator
 from src.ui.pages.by_movie import render_tab as render_by_movie
 from src.ui.pages.by_keywords import render_tab as render_by_keywords
@@ -17,12 +17,8 @@ t = Translator(lang_code)
 
 @st.cache_resource
 def load_model():
-    dataset = (
-        dotenv.get_key(dotenv.find_dotenv(), "DATASET_NAME") or "movies_top10k.csv"
-    )
-    model = MovieRecommender(dataset)
-    model.fit()
-    return model
+    # Configured by .env; see src/models/settings.py
+    return load_configured_model()
 
 
 try:
@@ -31,17 +27,18 @@ except Exception as e:
     st.error(f"Error loading model: {e}")
     st.stop()
 
+# Ratings and personal recommendations are scoped to this profile; the
+# model itself is shared by every session.
+user_id = st.sidebar.text_input(t("user_id"), value=DEFAULT_USER).strip()
+user_id = user_id or DEFAULT_USER
+
 st.sidebar.title(t("sidebar_title"))
 st.sidebar.info(t("sidebar_info"))
 
 if st.sidebar.checkbox(t("show_charts"), value=True):
     st.sidebar.subheader(t("chart_title"))
 
-    top_movies = (
-        recommender.df.nlargest(20, "popularity")[["title", "popularity"]]
-        .copy()
-        .reset_index(drop=True)
-    )
+    top_movies = recommender.get_popular_movies(20).reset_index(drop=True)
 
     top_movies["title"] = top_movies["title"].astype(str).str[:25]
     top_movies = top_movies.sort_values("popularity", ascending=False)
@@ -62,13 +59,51 @@ st.markdown(t("app_subtitle"))
 tabs = st.tabs([t("tab1"), t("tab2"), t("tab3"), t("tab4")])
 
 with tabs[0]:
-    render_by_movie(recommender, t)
+    render_by_movie(recommender, t, user_id)
 with tabs[1]:
-    render_by_keywords(recommender, t)
+    render_by_keywords(recommender, t, user_id)
 with tabs[2]:
     render_add_movie(recommender, t)
 with tabs[3]:
-    render_profile(recommender, t)
+    render_profile(recommender, t, user_id)
+
+# Rendered after the tabs so the figures include this run's queries.
+if st.sidebar.checkbox(t("show_diagnostics"), value=False):
+    st.sidebar.subheader(t("diagnostics_title"))
+
+    recommender.telemetry.enabled = st.sidebar.toggle(
+        t("telemetry_enabled"), value=recommender.telemetry.enabled
+    )
+    stats = recommender.telemetry_stats()
+
+    if not stats["enabled"] and not stats["stages"]:
+        st.sidebar.info(t("telemetry_disabled_info"))
+    if stats["stages"]:
+        st.sidebar.markdown(f"**{t('diagnostics_stages')}**")
+        st.sidebar.dataframe(
+            pd.DataFrame.from_dict(stats["stages"], orient="index")[
+                ["count", "mean_ms", "p50_ms", "p95_ms", "p99_ms"]
+            ]
+        )
+
+    st.sidebar.markdown(f"**{t('diagnostics_counters')}**")
+    st.sidebar.json({**stats["counters"], **stats["gauges"]}, expanded=False)
+
+    st.sidebar.markdown(f"**{t('diagnostics_memory')}**")
+    memory = recommender.memory_report()
+    st.sidebar.dataframe(
+        pd.Series(memory["components"], name="bytes").sort_values(ascending=False)
+    )
+
+    st.sidebar.download_button(
+        t("btn_download_metrics"),
+        recommender.telemetry_metrics(),
+        file_name="metrics.txt",
+        mime="text/plain",
+    )
+    if st.sidebar.button(t("btn_reset_telemetry")):
+        recommender.telemetry.reset()
+        st.rerun()
 
 st.divider()
 st.caption(t("footer"))
@@ -0,0 +1,451 @@
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+GENRES = [
+    "Action",
+    "Adventure",
+    "Animation",
+    "Comedy",
+    "Crime",
+    "Documentary",
+    "Drama",
+    "Family",
+    "Fantasy",
+    "History",
+    "Horror",
+    "Music",
+    "Mystery",
+    "Romance",
+    "Science Fiction",
+    "Thriller",
+    "War",
+    "Western",
+]
+
+QUERY_SETTINGS = [
+    {"top_n": 10, "profile_weight": 0.0},
+    {"top_n": 10, "profile_weight": 0.3},
+    {"top_n": 50, "profile_weight": 0.0},
+    {"top_n": 50, "profile_weight": 0.3},
+]
+
+# Relative increase of a metric (all of them are "lower is better") that
+# --compare reports as a regression
+_TOLERANCE = 0.2
+
+
+# ----------------------------
+# Synthetic catalog
+# ----------------------------
+
+
+def make_catalog(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    # Same columns and rough shape as the TMDB dump after kaggle.py: a few
+    # genres per movie, topic-correlated keywords and overview words (so
+    # neighbors are meaningful), heavy-tailed popularity and vote counts.
+    rng = np.random.default_rng(seed)
+    n_words, n_topics, words_per_topic = 30_000, max(50, n_rows // 200), 60
+
+    words = np.array([f"term{i}" for i in range(n_words)])
+    topic_words = rng.zipf(1.3, size=(n_topics, words_per_topic)) % n_words
+    topics = rng.integers(0, n_topics, size=n_rows)
+
+    overview_idx = np.take_along_axis(
+        topic_words[topics],
+        rng.integers(0, words_per_topic, size=(n_rows, 20)),
+        axis=1,
+    )
+    noise_idx = rng.integers(0, n_words, size=(n_rows, 8))
+    keyword_idx = np.take_along_axis(
+        topic_words[topics],
+        rng.integers(0, words_per_topic, size=(n_rows, 4)),
+        axis=1,
+    )
+    genre_idx = rng.integers(0, len(GENRES), size=(n_rows, 2))
+    genre_names = np.array(GENRES)
+
+    return pd.DataFrame(
+        {
+            "id": np.arange(1, n_rows + 1),
+            "title": [f"Movie {i}" for i in range(n_rows)],
+            "genres": [", ".join(sorted(set(g))) for g in genre_names[genre_idx]],
+            "keywords": [", ".join(k) for k in words[keyword_idx]],
+            "overview": [
+                " ".join(o) + " " + " ".join(x)
+                for o, x in zip(words[overview_idx], words[noise_idx])
+            ],
+            "release_date": [
+                f"{y}-{m:02d}-01"
+                for y, m in zip(
+                    rng.integers(1950, 2025, size=n_rows),
+                    rng.integers(1, 13, size=n_rows),
+                )
+            ],
+            "vote_average": rng.uniform(2, 9, size=n_rows).round(1),
+            "vote_count": (rng.pareto(1.5, size=n_rows) * 50 + 51).astype(int),
+            "popularity": (rng.lognormal(2, 1, size=n_rows)).round(3),
+            "runtime": rng.integers(70, 200, size=n_rows),
+            "poster_path": [f"/poster{i}.jpg" for i in range(n_rows)],
+        }
+    )
+
+
+def _write_catalog(df: pd.DataFrame, path: str) -> None:
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    elif path.endswith(".feather"):
+        df.to_feather(path, compression="uncompressed")
+    else:
+        df.to_csv(path, index=False)
+
+
+# ----------------------------
+# Measurements
+# ----------------------------
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+def _latency_stats(seconds: List[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds) * 1000
+    return {
+        "n": len(ms),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+    }
+
+
+def _time_calls(func: Callable, args: List[Any], warmup: int) -> Dict[str, float]:
+    for arg in args[:warmup]:
+        func(arg)
+
+    seconds = []
+    for arg in args:
+        start = time.perf_counter()
+        func(arg)
+        seconds.append(time.perf_counter() - start)
+    return _latency_stats(seconds)
+
+
+def run_size(
+    n_rows: int,
+    n_queries: int,
+    n_adds: int,
+    warmup: int,
+    search: str,
+    representation: str,
+    features: str,
+    file_format: str,
+    compact: bool,
+    seed: int,
+) -> Dict[str, Any]:
+    # Runs in a fresh process (see main) so peak RSS is per catalog size.
+    from src.data.storage import SQLiteStorage
+    from src.models.ann import IVFSearch
+    from src.models.recommender import MovieRecommender
+
+    rng = np.random.default_rng(seed)
+    result: Dict[str, Any] = {"rows": n_rows}
+
+    with tempfile.TemporaryDirectory(prefix="film-bench-") as tmp:
+        start = time.perf_counter()
+        catalog = make_catalog(n_rows, seed=seed)
+        catalog_path = os.path.join(tmp, f"catalog.{file_format}")
+        _write_catalog(catalog, catalog_path)
+        result["generate_s"] = round(time.perf_counter() - start, 3)
+
+        keyword_pool = catalog["keywords"].str.split(", ").explode().unique()
+        del catalog
+
+        model = MovieRecommender(
+            catalog_path,
+            storage=SQLiteStorage(os.path.join(tmp, "user_data.db")),
+            search=IVFSearch() if search == "ivf" else None,
+            representation=representation,
+            features=features,
+            # Measure the incremental add, not the compaction it can trigger.
+            refit_threshold=n_adds + 1,
+            # Measure scoring, not repeats answered by the result cache.
+            result_cache_size=0,
+            compact_catalog=compact,
+        )
+
+        start = time.perf_counter()
+        model.fit()
+        result["fit_s"] = round(time.perf_counter() - start, 3)
+        result["memory"] = model.memory_report()
+
+        titles = model.get_all_titles()
+        for title in rng.choice(titles, size=20, replace=False):
+            model.save_rating(str(title), "like" if rng.random() < 0.7 else "dislike")
+
+        movie_queries = [str(t) for t in rng.choice(titles, size=n_queries)]
+        keyword_queries = [
+            ", ".join(rng.choice(keyword_pool, size=int(rng.integers(1, 4))))
+            for _ in range(n_queries)
+        ]
+
+        queries: Dict[str, Dict[str, float]] = {}
+        for setting in QUERY_SETTINGS:
+            label = (
+                f"top_n={setting['top_n']},profile_weight={setting['profile_weight']}"
+            )
+            queries[f"recommend_by_movie[{label}]"] = _time_calls(
+                lambda q: model.recommend_by_movie(q, **setting),
+                movie_queries,
+                warmup,
+            )
+            queries[f"recommend_by_keywords[{label}]"] = _time_calls(
+                lambda q: model.recommend_by_keywords(q, **setting),
+                keyword_queries,
+                warmup,
+            )
+        for top_n in sorted({s["top_n"] for s in QUERY_SETTINGS}):
+            queries[f"recommend_personal[top_n={top_n}]"] = _time_calls(
+                lambda _: model.recommend_personal(top_n=top_n),
+                list(range(n_queries)),
+                warmup,
+            )
+        result["queries"] = queries
+
+        result["add_new_movie"] = _time_calls(
+            lambda i: model.add_new_movie(
+                f"Benchmark Movie {i}",
+                ["Drama"],
+                keyword_queries[i % len(keyword_queries)],
+                "a synthetic overview",
+            ),
+            list(range(n_adds)),
+            warmup=0,
+        )
+
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+# ----------------------------
+# Reporting
+# ----------------------------
+
+
+def _metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    import scipy
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "scikit-learn": sklearn.__version__,
+        "pandas": pd.__version__,
+        "settings": {
+            "queries": args.queries,
+            "adds": args.adds,
+            "warmup": args.warmup,
+            "search": args.search,
+            "representation": args.representation,
+            "features": args.features,
+            "format": args.format,
+            "compact": args.compact,
+            "seed": args.seed,
+        },
+    }
+
+
+def flatten_metrics(report: Dict[str, Any]) -> Dict[str, float]:
+    # {"10000/fit_s": ..., "10000/recommend_by_movie[...]/p95_ms": ...}
+    metrics = {}
+    for size, result in report["results"].items():
+        for name in ("fit_s", "peak_rss_mb"):
+            if result.get(name) is not None:
+                metrics[f"{size}/{name}"] = result[name]
+        if "memory" in result:
+            metrics[f"{size}/memory_mb"] = result["memory"]["total_bytes"] / 2**20
+        timed = dict(result["queries"], add_new_movie=result["add_new_movie"])
+        for name, stats in timed.items():
+            for stat in ("p50_ms", "p95_ms", "p99_ms"):
+                metrics[f"{size}/{name}/{stat}"] = stats[stat]
+    return metrics
+
+
+def comparison_mismatches(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    # Settings and catalog sizes that differ between two reports; their
+    # timings measure different work and cannot be compared.
+    mismatches = []
+    old_settings = old.get("meta", {}).get("settings", {})
+    new_settings = new.get("meta", {}).get("settings", {})
+    for name in sorted(old_settings.keys() | new_settings.keys()):
+        before, after = old_settings.get(name), new_settings.get(name)
+        if before != after:
+            mismatches.append(f"{name}: {before!r} -> {after!r}")
+
+    old_sizes = sorted(old["results"], key=int)
+    new_sizes = sorted(new["results"], key=int)
+    if old_sizes != new_sizes:
+        mismatches.append(f"sizes: {','.join(old_sizes)} -> {','.join(new_sizes)}")
+    return mismatches
+
+
+def compare(
+    old: Dict[str, Any], new: Dict[str, Any], tolerance: float, force: bool = False
+) -> List[str]:
+    # Returns the metrics that got slower (or bigger) by more than tolerance.
+    # Reports recorded with different settings or sizes are refused unless
+    # force is set.
+    mismatches = comparison_mismatches(old, new)
+    if mismatches and not force:
+        raise ValueError(
+            "Benchmark reports were recorded with different settings or sizes "
+            f"({'; '.join(mismatches)}); rerun with the same options or pass --force."
+        )
+    for mismatch in mismatches:
+        print(f"Warning: Comparing reports with different {mismatch}")
+
+    machine = ("platform", "cpu_count", "python", "numpy", "scipy", "scikit-learn")
+    for name in machine:
+        before, after = old.get("meta", {}).get(name), new.get("meta", {}).get(name)
+        if before != after:
+            print(f"Warning: Reports come from different {name}: {before} -> {after}")
+
+    old_metrics, new_metrics = flatten_metrics(old), flatten_metrics(new)
+    regressions = []
+    for name in sorted(old_metrics.keys() & new_metrics.keys()):
+        before, after = old_metrics[name], new_metrics[name]
+        change = (after - before) / before if before else 0.0
+        marker = ""
+        if change > tolerance:
+            marker = "  <-- regression"
+            regressions.append(name)
+        print(f"{name:75s} {before:10.3f} -> {after:10.3f} ({change:+.1%}){marker}")
+    return regressions
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark fit and query performance on synthetic catalogs."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[10_000, 100_000, 1_000_000],
+        help="Comma-separated catalog sizes (default: 10000,100000,1000000)",
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--adds", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--search", choices=["exact", "ivf"], default="exact")
+    parser.add_argument("--representation", choices=["tfidf", "lsa"], default="tfidf")
+    parser.add_argument(
+        "--features", choices=["vocabulary", "hashed"], default="vocabulary"
+    )
+    parser.add_argument(
+        "--format", choices=["csv", "parquet", "feather"], default="csv"
+    )
+    parser.add_argument(
+        "--compact", action="store_true", help="Use the compact catalog mode"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=_TOLERANCE,
+        help="Relative slowdown reported as a regression (default: 0.2)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Compare against results recorded with other settings or sizes",
+    )
+    args = parser.parse_args()
+
+    report = {"meta": _metadata(args), "results": {}}
+    previous = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            previous = json.load(f)
+        # Refuse before spending the run on results that cannot be compared.
+        planned = dict(report, results={str(size): {} for size in args.sizes})
+        mismatches = comparison_mismatches(previous, planned)
+        if mismatches and not args.force:
+            parser.error(
+                f"{args.compare} was recorded with different settings or sizes "
+                f"({'; '.join(mismatches)}); use the same options or pass --force"
+            )
+
+    # One fresh process per size keeps peak RSS and caches independent.
+    context = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        logging.info(f"Benchmarking {size:,} rows")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(
+                run_size,
+                size,
+                args.queries,
+                args.adds,
+                args.warmup,
+                args.search,
+                args.representation,
+                args.features,
+                args.format,
+                args.compact,
+                args.seed,
+            ).result()
+        report["results"][str(size)] = result
+        logging.info(
+            f"{size:,} rows: fit {result['fit_s']}s, peak RSS {result['peak_rss_mb']} MB"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Wrote {args.output}")
+
+    if previous is not None:
+        regressions = compare(previous, report, args.tolerance, args.force)
+        if regressions:
+            print(
+                f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}"
+            )
+            sys.exit(1)
@@ -0,0 +1,225 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import math
+import os
+import numpy as np
+import pandas as pd
+
+# Text columns that are only needed to fit the model (keywords) or to
+# display a handful of results (overview). Columnar catalogs keep them in
+# Arrow buffers instead of loading them into the DataFrame.
+LAZY_COLUMNS = ("keywords", "overview")
+
+COLUMNAR_EXTENSIONS = (".parquet", ".feather", ".arrow")
+
+# compact_frame stores a string column as a categorical when it has at most
+# this many distinct values per row (genres, release dates, languages).
+CATEGORY_SHARE = 0.5
+
+
+def is_columnar(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in COLUMNAR_EXTENSIONS
+
+
+class LazyColumns:
+    # Arrow-backed columns fetched by row position. Feather files are
+    # memory-mapped (zero-copy when written uncompressed); Parquet columns
+    # are decoded once into Arrow buffers, never into Python strings.
+
+    def __init__(self, path: str, columns: Sequence[str]):
+        import pyarrow as pa
+
+        self.path = path
+        if path.lower().endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            self._table = pq.read_table(path, columns=list(columns), memory_map=True)
+        else:
+            source = pa.memory_map(path, "r")
+            self._table = pa.ipc.open_file(source).read_all().select(list(columns))
+
+        self.columns = tuple(self._table.column_names)
+
+    def __len__(self) -> int:
+        return self._table.num_rows
+
+    def take(self, column: str, indices: Sequence[int]) -> List[Optional[str]]:
+        import pyarrow as pa
+
+        return self._table.column(column).take(pa.array(indices)).to_pylist()
+
+    def series(self, column: str) -> pd.Series:
+        # Materializes the whole column; meant for fitting only.
+        return self._table.column(column).to_pandas()
+
+    def nbytes(self) -> int:
+        return self._table.nbytes
+
+
+class RowStore:
+    # The LAZY_COLUMNS of a CSV catalog, for compact mode: each column is one
+    # UTF-8 buffer plus row offsets instead of a Python string per row, and
+    # is read by row position like LazyColumns.
+    #
+    # The buffers are never modified. Rows appended later (user movies) are
+    # a small delta of strings after them; append returns a new store sharing
+    # the buffers.
+
+    def __init__(
+        self,
+        columns: Dict[str, Tuple[bytes, np.ndarray, np.ndarray]],
+        added: Optional[Dict[str, Tuple[Optional[str], ...]]] = None,
+    ):
+        # column -> (buffer, offsets with one more entry than rows, present),
+        # and column -> values of the rows appended after the buffers
+        self._columns = columns
+        self._added = added if added is not None else {c: () for c in columns}
+        self.columns = tuple(columns)
+        self._n_stored = len(next(iter(columns.values()))[2]) if columns else 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Sequence[str]) -> "RowStore":
+        stored = {}
+        for column in columns:
+            present = df[column].notna().to_numpy()
+            encoded = [
+                str(value).encode("utf-8") if ok else b""
+                for value, ok in zip(df[column].tolist(), present)
+            ]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(e) for e in encoded], out=offsets[1:])
+            stored[column] = (b"".join(encoded), offsets, present)
+        return cls(stored)
+
+    def append(self, rows: pd.DataFrame) -> "RowStore":
+        # The columns of rows that the store holds; missing ones are None.
+        added = {}
+        for column in self.columns:
+            values = rows[column] if column in rows.columns else [None] * len(rows)
+            added[column] = self._added[column] + tuple(
+                None if pd.isna(value) else str(value) for value in values
+            )
+        return RowStore(self._columns, added)
+
+    def __len__(self) -> int:
+        if not self._columns:
+            return 0
+        return self._n_stored + len(next(iter(self._added.values())))
+
+    def take(self, column: str, indices: Sequence[int]) -> List[Optional[str]]:
+        buffer, offsets, present = self._columns[column]
+        added = self._added[column]
+        values = []
+        for i in indices:
+            if i >= self._n_stored:
+                values.append(added[i - self._n_stored])
+            elif present[i]:
+                values.append(buffer[offsets[i] : offsets[i + 1]].decode("utf-8"))
+            else:
+                values.append(None)
+        return values
+
+    def series(self, column: str) -> pd.Series:
+        # Materializes the whole column; meant for fitting only.
+        return pd.Series(self.take(column, range(len(self))), dtype=object)
+
+    def nbytes(self) -> int:
+        stored = sum(
+            len(buffer) + offsets.nbytes + present.nbytes
+            for buffer, offsets, present in self._columns.values()
+        )
+        # The appended strings, counted by length.
+        return stored + sum(
+            len(value or "") for values in self._added.values() for value in values
+        )
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Smaller dtypes for an in-memory catalog: float32 for measurements,
+    # int32 for integers that fit, categoricals for repetitive strings and
+    # Arrow strings for the rest.
+    import pyarrow as pa
+
+    columns = {}
+    for name in df.columns:
+        values = df[name]
+        if pd.api.types.is_float_dtype(values.dtype):
+            narrow = values.astype(np.float32)
+            # Whole numbers (ids with gaps, counts) only if float32 is exact.
+            whole = values.dropna().mod(1).eq(0).all()
+            if not whole or narrow.astype(np.float64).equals(values):
+                columns[name] = narrow
+        elif pd.api.types.is_integer_dtype(values.dtype):
+            info = np.iinfo(np.int32)
+            if values.empty or info.min <= values.min() <= values.max() <= info.max:
+                columns[name] = values.astype(np.int32)
+        elif pd.api.types.infer_dtype(values, skipna=True) in {"string", "empty"}:
+            if values.nunique() <= CATEGORY_SHARE * len(values):
+                columns[name] = values.astype("category")
+            else:
+                columns[name] = values.astype(pd.ArrowDtype(pa.string()))
+    return df.assign(**columns)
+
+
+def append_rows(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    # pd.concat for a compact_frame: the new rows are cast to its dtypes
+    # (categoricals gain their new values) so the result stays compact.
+    rows = rows.copy()
+    widened = {}
+    for name, dtype in df.dtypes.items():
+        if name not in rows.columns:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            new = pd.Index(rows[name].dropna().unique()).difference(dtype.categories)
+            if len(new):
+                widened[name] = df[name].cat.add_categories(new)
+                dtype = widened[name].dtype
+        try:
+            rows[name] = rows[name].astype(dtype)
+        except (TypeError, ValueError):
+            pass  # e.g. a missing value in an int32 column: concat widens it
+    if widened:
+        df = df.assign(**widened)
+    return pd.concat([df, rows])
+
+
+def read_catalog(
+    path: str, compact: bool = False
+) -> Tuple[pd.DataFrame, Optional[Union[LazyColumns, RowStore]]]:
+    # compact moves the LAZY_COLUMNS of a CSV catalog into a RowStore, as
+    # columnar catalogs do with LazyColumns.
+    if not is_columnar(path):
+        df = pd.read_csv(path)
+        lazy = [c for c in LAZY_COLUMNS if c in df.columns]
+        if not compact or not lazy:
+            return df, None
+        return df.drop(columns=lazy), RowStore.from_frame(df, lazy)
+
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        all_columns = pq.read_schema(path).names
+    else:
+        import pyarrow as pa
+
+        all_columns = pa.ipc.open_file(pa.memory_map(path, "r")).schema.names
+
+    eager = [c for c in all_columns if c not in LAZY_COLUMNS]
+    lazy = [c for c in all_columns if c in LAZY_COLUMNS]
+
+    if path.lower().endswith(".parquet"):
+        df = pd.read_parquet(path, columns=eager)
+    else:
+        df = pd.read_feather(path, columns=eager)
+
+    return df, (LazyColumns(path, lazy) if lazy else None)
+
+
+def json_safe(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Missing catalog values come back as NaN, which is not valid JSON.
+    return [
+        {
+            k: None if isinstance(v, float) and math.isnan(v) else v
+            for k, v in rec.items()
+        }
+        for rec in records
+    ]
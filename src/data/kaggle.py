@@ -1,3 +1,5 @@
+from typing import Optional
+import argparse
 import pandas as pd
 import kagglehub
 import os
@@ -5,35 +7,109 @@ from dotenv import load_dotenv
 import dotenv
 import logging
 
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
-def clean_and_reduce_data():
-    path = kagglehub.dataset_download("asaniczka/tmdb-movies-dataset-2023-930k-movies")
-    csv_path = os.path.join(path, "TMDB_movie_dataset_v11.csv")
 
-    df = pd.read_csv(csv_path)
+COLS_TO_KEEP = [
+    "id",
+    "title",
+    "genres",
+    "keywords",
+    "overview",
+    "release_date",
+    "vote_average",
+    "vote_count",
+    "popularity",
+    "runtime",
+    "poster_path",
+]
+
+# Only the columns we keep (plus the adult flag for filtering) are parsed,
+# with explicit dtypes so pandas does not have to infer them per chunk.
+DTYPES = {
+    "id": "int64",
+    "title": "object",
+    "genres": "object",
+    "keywords": "object",
+    "overview": "object",
+    "release_date": "object",
+    "vote_average": "float32",
+    "vote_count": "Int32",
+    "popularity": "float64",
+    "runtime": "Int32",
+    "poster_path": "object",
+    "adult": "boolean",
+}
+
+
+def _peak_memory_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _stream_top_movies(
+    csv_path: str, target_size: int, min_votes: int, chunksize: int
+) -> pd.DataFrame:
+    # Keeps a running top-`target_size` by popularity so the full table is
+    # never held in memory: each chunk is filtered, merged into the current
+    # top set, and cut back down with nlargest (a partial selection).
+    top: Optional[pd.DataFrame] = None
+    rows_read = 0
+
+    reader = pd.read_csv(
+        csv_path,
+        usecols=list(DTYPES),
+        dtype=DTYPES,
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        rows_read += len(chunk)
+
+        mask = (chunk["vote_count"] > min_votes) & ~chunk["adult"].fillna(False)
+        chunk = chunk.loc[mask.fillna(False).to_numpy(dtype=bool), COLS_TO_KEEP]
 
-    logging.log(f"Original shape: {df.shape}")
+        top = chunk if top is None else pd.concat([top, chunk], ignore_index=True)
+        if len(top) > target_size:
+            top = top.nlargest(target_size, "popularity")
 
-    df_filtered = df[(df["vote_count"] > 50) & (~df["adult"])].copy()
+        peak = _peak_memory_mb()
+        logging.info(
+            f"Read {rows_read:,} rows, kept {len(top):,}"
+            + (f", peak memory {peak:.0f} MB" if peak is not None else "")
+        )
 
-    df_filtered = df_filtered.sort_values(by="popularity", ascending=False).head(10000)
+    if top is None:
+        return pd.DataFrame(columns=COLS_TO_KEEP)
+    return top
 
-    logging.log(f"Reduced shape: {df_filtered.shape}")
 
-    cols_to_keep = [
-        "id",
-        "title",
-        "genres",
-        "keywords",
-        "overview",
-        "release_date",
-        "vote_average",
-        "vote_count",
-        "popularity",
-        "runtime",
-        "poster_path",
-    ]
-    df_final = df_filtered[cols_to_keep].copy()
+def _write_output(df: pd.DataFrame, output_file: str) -> None:
+    # The extension of DATASET_NAME picks the format. Columnar catalogs let
+    # the recommender load only the columns it needs at startup.
+    extension = os.path.splitext(output_file)[1].lower()
+    if extension == ".parquet":
+        df.to_parquet(output_file, index=False)
+    elif extension in (".feather", ".arrow"):
+        # Uncompressed so the text columns can be memory-mapped.
+        df.to_feather(output_file, compression="uncompressed")
+    else:
+        df.to_csv(output_file, index=False)
+
+
+def clean_and_reduce_data(
+    target_size: int = 10_000, min_votes: int = 50, chunksize: int = 100_000
+):
+    path = kagglehub.dataset_download("asaniczka/tmdb-movies-dataset-2023-930k-movies")
+    csv_path = os.path.join(path, "TMDB_movie_dataset_v11.csv")
+
+    df_final = _stream_top_movies(csv_path, target_size, min_votes, chunksize)
+
+    logging.info(f"Reduced shape: {df_final.shape}")
 
     df_final["genres"] = df_final["genres"].fillna("")
     df_final["keywords"] = df_final["keywords"].fillna("")
@@ -44,12 +120,30 @@ def clean_and_reduce_data():
     output_file = (
         dotenv.get_key(dotenv.find_dotenv(), "DATASET_NAME") or "movies_top10k.csv"
     )
-    df_final.to_csv(output_file, index=False)
+    _write_output(df_final, output_file)
+
+    logging.info(f"Cleaned data saved to: {output_file}")
 
-    logging.log(f"Cleaned data saved to: {output_file}")
+    peak = _peak_memory_mb()
+    if peak is not None:
+        logging.info(f"Peak memory: {peak:.0f} MB")
 
 
 if __name__ == "__main__":
     load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    parser = argparse.ArgumentParser(
+        description="Download the TMDB dataset and keep the most popular movies."
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=int(os.getenv("DATASET_SIZE", "10000")),
+        help="Number of movies to keep (default: DATASET_SIZE or 10000)",
+    )
+    parser.add_argument("--min-votes", type=int, default=50)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
 
-    clean_and_reduce_data()
+    clean_and_reduce_data(args.size, args.min_votes, args.chunksize)
@@ -0,0 +1,90 @@
+from typing import Optional
+import argparse
+import json
+import logging
+import time
+from dotenv import load_dotenv
+from src.data.catalog import json_safe
+from src.data.storage import DEFAULT_USER
+from src.models.settings import load_model
+
+
+def precompute(
+    mode: str,
+    output_file: str,
+    top_n: int,
+    profile_weight: float,
+    batch_size: int,
+    input_file: Optional[str] = None,
+    user_id: str = DEFAULT_USER,
+) -> None:
+    # The app's settings and fitted artifact, so the precomputed results are
+    # the ones the app and the service would return.
+    model = load_model()
+
+    if mode == "similar":
+        queries = model.get_all_titles()
+        recommend = model.recommend_by_movie_batch
+    else:
+        with open(input_file, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+        recommend = model.recommend_by_keywords_batch
+
+    logging.info(f"Scoring {len(queries)} queries in batches of {batch_size}")
+    start = time.perf_counter()
+
+    with open(output_file, "w", encoding="utf-8") as out:
+        for i in range(0, len(queries), batch_size):
+            batch = queries[i : i + batch_size]
+            results = recommend(
+                batch, top_n=top_n, profile_weight=profile_weight, user_id=user_id
+            )
+            for query, recs in zip(batch, results):
+                out.write(
+                    json.dumps({"query": query, "results": json_safe(recs)}) + "\n"
+                )
+
+            logging.info(f"{min(i + batch_size, len(queries))}/{len(queries)} done")
+
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Wrote {output_file} in {elapsed:.1f}s "
+        f"({len(queries) / max(elapsed, 1e-9):.0f} queries/s)"
+    )
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    parser = argparse.ArgumentParser(
+        description="Precompute recommendations for many queries at once."
+    )
+    parser.add_argument(
+        "mode",
+        choices=["similar", "keywords"],
+        help="'similar': neighbors of every catalog title; "
+        "'keywords': one keyword query per line of --input",
+    )
+    parser.add_argument("--output", default="recommendations.jsonl")
+    parser.add_argument("--input", help="Query file for the keywords mode")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--profile-weight", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument(
+        "--user", default=DEFAULT_USER, help="Profile used by --profile-weight"
+    )
+    args = parser.parse_args()
+
+    if args.mode == "keywords" and not args.input:
+        parser.error("--input is required for the keywords mode")
+
+    precompute(
+        args.mode,
+        args.output,
+        args.top_n,
+        args.profile_weight,
+        args.batch_size,
+        input_file=args.input,
+        user_id=args.user,
+    )
@@ -0,0 +1,271 @@
+from typing import Any, Dict, List, Optional, Union
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+# Ratings written before profiles were per user belong to this user.
+DEFAULT_USER = "default"
+
+
+def _read_json(path: str, expected: type) -> Any:
+    if not os.path.exists(path):
+        return expected()
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+            return data if isinstance(data, expected) else expected()
+    except (json.JSONDecodeError, TypeError) as e:
+        print(f"Warning: Failed to load {path}: {e}")
+        return expected()
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    # Write a sibling temp file and rename it over the target, so a crash
+    # mid-write leaves either the old file or the new one, never half of each.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _ratings_by_user(data: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    # Old ratings files map title -> rating for a single implicit user.
+    if data and all(isinstance(v, str) for v in data.values()):
+        return {DEFAULT_USER: data}
+    return {u: r for u, r in data.items() if isinstance(r, dict)}
+
+
+class JSONStorage:
+    # The original two-file layout (user_movies.json and user_ratings.json,
+    # the latter now mapping user id -> {title: rating}). Every change
+    # rewrites the whole file, now atomically; fine for small histories, see
+    # SQLiteStorage for large ones.
+
+    def __init__(
+        self,
+        movies_path: str = "user_movies.json",
+        ratings_path: str = "user_ratings.json",
+    ):
+        self.movies_path = movies_path
+        self.ratings_path = ratings_path
+
+    # Ratings
+
+    def _load_all_ratings(self) -> Dict[str, Dict[str, str]]:
+        return _ratings_by_user(_read_json(self.ratings_path, dict))
+
+    def load_ratings(self, user_id: str) -> Dict[str, str]:
+        return self._load_all_ratings().get(user_id, {})
+
+    def set_rating(self, user_id: str, title: str, rating: str) -> None:
+        ratings = self._load_all_ratings()
+        ratings.setdefault(user_id, {})[title] = rating
+        _write_json_atomic(self.ratings_path, ratings)
+
+    def delete_rating(self, user_id: str, title: str) -> None:
+        ratings = self._load_all_ratings()
+        if ratings.get(user_id, {}).pop(title, None) is not None:
+            _write_json_atomic(self.ratings_path, ratings)
+
+    def clear_ratings(self, user_id: str) -> None:
+        ratings = self._load_all_ratings()
+        if ratings.pop(user_id, None) is not None:
+            _write_json_atomic(self.ratings_path, ratings)
+
+    # User movies
+
+    def load_movies(self) -> List[Dict[str, Any]]:
+        return _read_json(self.movies_path, list)
+
+    def add_movie(self, movie: Dict[str, Any]) -> None:
+        movies = self.load_movies()
+        movies.append(movie)
+        _write_json_atomic(self.movies_path, movies)
+
+    def remove_movie(self, title: str) -> bool:
+        movies = self.load_movies()
+        kept = [m for m in movies if m.get("title") != title]
+        if len(kept) == len(movies):
+            return False
+        _write_json_atomic(self.movies_path, kept)
+        return True
+
+    def clear_movies(self) -> None:
+        if os.path.exists(self.movies_path):
+            os.remove(self.movies_path)
+
+
+class SQLiteStorage:
+    # One SQLite database in WAL mode: each change is a single-row statement
+    # committed on its own (O(1) whatever the history size), crash-safe, and
+    # startup reads each table with one query.
+    #
+    # When the database is created, existing JSON files can be imported once
+    # via legacy_movies/legacy_ratings.
+
+    # Stored in PRAGMA user_version. 1: ratings keyed by title only;
+    # 2: ratings keyed by (user_id, title).
+    SCHEMA_VERSION = 2
+
+    def __init__(
+        self,
+        path: str = "user_data.db",
+        legacy_movies: Optional[str] = None,
+        legacy_ratings: Optional[str] = None,
+    ):
+        self.path = path
+        is_new = not os.path.exists(path)
+
+        # Streamlit calls in from several threads, so the connection is shared
+        # and every statement goes through the lock.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL still survives application crashes; only a power
+        # loss can drop the most recent commits.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._migrate()
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ratings ("
+                "user_id TEXT NOT NULL, title TEXT NOT NULL, "
+                "rating TEXT NOT NULL, PRIMARY KEY (user_id, title))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS user_movies ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "title TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS user_movies_title ON user_movies (title)"
+            )
+            self._conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+        if is_new:
+            self._import_json(legacy_movies, legacy_ratings)
+
+    def _migrate(self) -> None:
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(ratings)")]
+        if version >= self.SCHEMA_VERSION or not columns or "user_id" in columns:
+            return
+
+        # Single-user ratings table: rebuild it keyed by (user_id, title),
+        # keeping the insertion order.
+        self._conn.execute("ALTER TABLE ratings RENAME TO ratings_v1")
+        self._conn.execute(
+            "CREATE TABLE ratings ("
+            "user_id TEXT NOT NULL, title TEXT NOT NULL, "
+            "rating TEXT NOT NULL, PRIMARY KEY (user_id, title))"
+        )
+        self._conn.execute(
+            "INSERT INTO ratings (user_id, title, rating) "
+            "SELECT ?, title, rating FROM ratings_v1 ORDER BY rowid",
+            (DEFAULT_USER,),
+        )
+        self._conn.execute("DROP TABLE ratings_v1")
+
+    def _import_json(
+        self, movies_path: Optional[str], ratings_path: Optional[str]
+    ) -> None:
+        movies = _read_json(movies_path, list) if movies_path else []
+        ratings = _ratings_by_user(
+            _read_json(ratings_path, dict) if ratings_path else {}
+        )
+        if not movies and not ratings:
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO user_movies (title, data) VALUES (?, ?)",
+                [(m.get("title"), json.dumps(m)) for m in movies],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ratings (user_id, title, rating) "
+                "VALUES (?, ?, ?)",
+                [
+                    (user_id, title, rating)
+                    for user_id, user_ratings in ratings.items()
+                    for title, rating in user_ratings.items()
+                ],
+            )
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # Ratings
+
+    def load_ratings(self, user_id: str) -> Dict[str, str]:
+        # rowid order is insertion order, and an upsert keeps the rowid, so
+        # this matches the ordering of the in-memory dict.
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, rating FROM ratings WHERE user_id = ? ORDER BY rowid",
+                (user_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def set_rating(self, user_id: str, title: str, rating: str) -> None:
+        self._execute(
+            "INSERT INTO ratings (user_id, title, rating) VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id, title) DO UPDATE SET rating = excluded.rating",
+            (user_id, title, rating),
+        )
+
+    def delete_rating(self, user_id: str, title: str) -> None:
+        self._execute(
+            "DELETE FROM ratings WHERE user_id = ? AND title = ?", (user_id, title)
+        )
+
+    def clear_ratings(self, user_id: str) -> None:
+        self._execute("DELETE FROM ratings WHERE user_id = ?", (user_id,))
+
+    # User movies
+
+    def load_movies(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM user_movies ORDER BY seq"
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def add_movie(self, movie: Dict[str, Any]) -> None:
+        self._execute(
+            "INSERT INTO user_movies (title, data) VALUES (?, ?)",
+            (movie.get("title"), json.dumps(movie)),
+        )
+
+    def remove_movie(self, title: str) -> bool:
+        return self._execute("DELETE FROM user_movies WHERE title = ?", (title,)) > 0
+
+    def clear_movies(self) -> None:
+        self._execute("DELETE FROM user_movies")
+
+
+def open_storage(backend: str = "sqlite") -> Union[JSONStorage, SQLiteStorage]:
+    # The storage used by the app and the CLI tools, selected by
+    # STORAGE_BACKEND. The SQLite database imports the JSON files on creation.
+    if backend == "json":
+        return JSONStorage("user_movies.json", "user_ratings.json")
+    if backend == "sqlite":
+        return SQLiteStorage(
+            "user_data.db",
+            legacy_movies="user_movies.json",
+            legacy_ratings="user_ratings.json",
+        )
+    raise ValueError("Storage backend must be 'json' or 'sqlite'.")
@@ -0,0 +1,250 @@
+from typing import Iterator, Optional, Tuple, Union
+import copy
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+Matrix = Union[sp.csr_matrix, np.ndarray]
+
+
+class ExactSearch:
+    # Brute force: every row is a candidate, so callers score the whole
+    # catalog. This is the default and the fallback for the approximate index.
+
+    def build(self, vectors: Matrix) -> None:
+        pass
+
+    def add(self, vectors: Matrix) -> None:
+        pass
+
+    def clone(self) -> "ExactSearch":
+        return ExactSearch()
+
+    def candidates(self, query_vec: Matrix) -> Optional[np.ndarray]:
+        return None
+
+    def neighbor_candidates(
+        self,
+    ) -> Optional[Iterator[Tuple[np.ndarray, np.ndarray]]]:
+        return None
+
+    def nbytes(self) -> int:
+        return 0
+
+
+class IVFSearch:
+    # Inverted-file index: rows are projected to a small dense space, grouped
+    # with spherical k-means, and a query only scores the rows of the n_probe
+    # lists whose centroids are closest to it.
+    #
+    # Short sparse queries (a few keywords) project poorly, so for queries
+    # with at most max_query_terms terms the candidates are instead the rows
+    # sharing a term with the query; every other row scores 0 against it.
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        min_candidates: int = 200,
+        dim: int = 128,
+        n_iter: int = 10,
+        max_train: int = 65_536,
+        max_query_terms: int = 8,
+        seed: int = 0,
+    ):
+        self.n_lists = n_lists  # defaults to ~4 * sqrt(n_rows)
+        self.n_probe = n_probe
+        self.min_candidates = min_candidates
+        self.dim = dim
+        self.n_iter = n_iter
+        self.max_train = max_train
+        self.max_query_terms = max_query_terms
+        self.seed = seed
+
+        self._projection: Optional[sp.csr_matrix] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._list_rows: list = []
+        self._n_rows = 0
+
+        # term -> rows postings (CSC structure of the built matrix)
+        self._postings_indptr: Optional[np.ndarray] = None
+        self._postings_rows: Optional[np.ndarray] = None
+        self._n_posted = 0
+
+    # ----------------------------
+    # Build
+    # ----------------------------
+
+    def build(self, vectors: Matrix) -> None:
+        rng = np.random.default_rng(self.seed)
+        n_rows, n_features = vectors.shape
+
+        self._projection = self._make_projection(n_features, rng)
+        reduced = self._reduce(vectors)
+
+        n_lists = self.n_lists or int(4 * np.sqrt(n_rows))
+        n_lists = max(1, min(n_lists, n_rows))
+
+        # Train the centroids on a sample, then assign every row once.
+        if n_rows > self.max_train:
+            sample = reduced[rng.choice(n_rows, self.max_train, replace=False)]
+        else:
+            sample = reduced
+        self._centroids = self._kmeans(sample, n_lists, rng)
+
+        assignment = self._assign(reduced)
+        order = np.argsort(assignment, kind="stable").astype(np.int32)
+        bounds = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        self._list_rows = [order[bounds[i] : bounds[i + 1]] for i in range(n_lists)]
+        self._n_rows = n_rows
+
+        self._postings_indptr = self._postings_rows = None
+        if sp.issparse(vectors):
+            postings = vectors.tocsc()
+            self._postings_indptr = postings.indptr
+            self._postings_rows = postings.indices
+        self._n_posted = n_rows
+
+    def clone(self) -> "IVFSearch":
+        # A copy that build()/add() can change without affecting this index
+        # (model snapshots keep using it). Arrays are shared, never modified.
+        other = copy.copy(self)
+        other._list_rows = list(self._list_rows)
+        return other
+
+    def add(self, vectors: Matrix) -> None:
+        # Rows appended after build() join the list of their nearest centroid.
+        if self._centroids is None:
+            return
+
+        assignment = self._assign(self._reduce(vectors))
+        new_rows = np.arange(self._n_rows, self._n_rows + len(assignment))
+        for list_id in np.unique(assignment):
+            self._list_rows[list_id] = np.concatenate(
+                [self._list_rows[list_id], new_rows[assignment == list_id]]
+            ).astype(np.int32)
+        self._n_rows += len(assignment)
+
+    def nbytes(self) -> int:
+        arrays = [self._centroids, self._postings_indptr, self._postings_rows]
+        arrays += self._list_rows
+        if self._projection is not None:
+            projection = self._projection
+            arrays += [projection.data, projection.indices, projection.indptr]
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def _make_projection(
+        self, n_features: int, rng: np.random.Generator
+    ) -> sp.csr_matrix:
+        # Sparse sign projection (a few +-1 entries per input feature) keeps
+        # inner products approximately while staying tiny for large
+        # vocabularies, unlike a dense Gaussian matrix.
+        per_feature = 4
+        rows = np.repeat(np.arange(n_features), per_feature)
+        cols = rng.integers(0, self.dim, size=len(rows))
+        signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=len(rows))
+        return sp.csr_matrix(
+            (signs / np.sqrt(per_feature), (rows, cols)),
+            shape=(n_features, self.dim),
+            dtype=np.float32,
+        )
+
+    def _reduce(self, vectors: Matrix) -> np.ndarray:
+        reduced = vectors @ self._projection
+        if sp.issparse(reduced):
+            reduced = reduced.toarray()
+        return normalize(np.asarray(reduced, dtype=np.float32), copy=False)
+
+    def _kmeans(
+        self, points: np.ndarray, n_lists: int, rng: np.random.Generator
+    ) -> np.ndarray:
+        centroids = points[rng.choice(len(points), n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignment = np.argmax(points @ centroids.T, axis=1)
+            members = sp.csr_matrix(
+                (
+                    np.ones(len(points), dtype=np.float32),
+                    (assignment, np.arange(len(points))),
+                ),
+                shape=(n_lists, len(points)),
+            )
+            sums = np.asarray(members @ points)
+
+            counts = np.bincount(assignment, minlength=n_lists)
+            empty = counts == 0
+            if empty.any():
+                # Reseed empty lists with random points.
+                sums[empty] = points[rng.choice(len(points), int(empty.sum()))]
+            centroids = normalize(sums, copy=False)
+
+        return centroids
+
+    def _assign(self, reduced: np.ndarray, chunk_size: int = 65_536) -> np.ndarray:
+        assignment = np.empty(len(reduced), dtype=np.int32)
+        for start in range(0, len(reduced), chunk_size):
+            block = reduced[start : start + chunk_size] @ self._centroids.T
+            assignment[start : start + chunk_size] = np.argmax(block, axis=1)
+        return assignment
+
+    # ----------------------------
+    # Query
+    # ----------------------------
+
+    def candidates(self, query_vec: Matrix) -> Optional[np.ndarray]:
+        if self._centroids is None:
+            return None
+
+        if (
+            sp.issparse(query_vec)
+            and self._postings_rows is not None
+            and query_vec.nnz <= self.max_query_terms
+        ):
+            return self._term_candidates(query_vec.indices)
+
+        centroid_scores = (self._reduce(query_vec) @ self._centroids.T).ravel()
+        probe_order = np.argsort(-centroid_scores)
+
+        # Probe at least n_probe lists, and keep going until min_candidates
+        # rows have been gathered.
+        gathered = []
+        n_gathered = 0
+        for i, list_id in enumerate(probe_order):
+            if i >= self.n_probe and n_gathered >= self.min_candidates:
+                break
+            gathered.append(self._list_rows[list_id])
+            n_gathered += len(self._list_rows[list_id])
+
+        if not gathered:
+            return np.empty(0, dtype=np.int32)
+        return np.sort(np.concatenate(gathered))
+
+    def neighbor_candidates(
+        self,
+    ) -> Optional[Iterator[Tuple[np.ndarray, np.ndarray]]]:
+        # For a neighbor table without all-pairs scoring: the rows of each
+        # list, with the sorted rows of the n_probe lists whose centroids are
+        # closest to that list's centroid (its own list included) as their
+        # candidates.
+        if self._centroids is None:
+            return None
+        return self._neighbor_blocks()
+
+    def _neighbor_blocks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        n_probe = min(self.n_probe, len(self._centroids))
+        for list_id, rows in enumerate(self._list_rows):
+            if len(rows) == 0:
+                continue
+            closeness = self._centroids @ self._centroids[list_id]
+            probed = np.argpartition(-closeness, n_probe - 1)[:n_probe]
+            gathered = [rows] + [self._list_rows[p] for p in probed]
+            yield rows, np.unique(np.concatenate(gathered))
+
+    def _term_candidates(self, terms: np.ndarray) -> np.ndarray:
+        gathered = [
+            self._postings_rows[self._postings_indptr[t] : self._postings_indptr[t + 1]]
+            for t in terms
+        ]
+        # Rows added after build() are not in the postings; always score them.
+        gathered.append(np.arange(self._n_posted, self._n_rows, dtype=np.int32))
+        return np.unique(np.concatenate(gathered))
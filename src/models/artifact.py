@@ -0,0 +1,162 @@
+from typing import Any, Dict, Iterable, Optional, Union
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import scipy.sparse as sp
+
+# Bump whenever the on-disk layout changes so old artifacts are rebuilt.
+ARTIFACT_VERSION = 3
+
+_META_FILE = "meta.json"
+_VOCABULARY_FILE = "vocabulary.json"
+
+
+def content_hash(paths: Iterable[str], extra: str = "") -> str:
+    digest = hashlib.sha256()
+    digest.update(f"artifact-v{ARTIFACT_VERSION}".encode())
+    digest.update(extra.encode())
+
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        if not os.path.exists(path):
+            digest.update(b"<missing>")
+            continue
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def artifact_path(root: str, fingerprint: str) -> str:
+    return os.path.join(root, fingerprint[:16])
+
+
+def save_artifact(
+    root: str,
+    fingerprint: str,
+    vocabulary: Dict[str, int],
+    idf: np.ndarray,
+    vectors: Union[sp.csr_matrix, np.ndarray],
+    projection: Optional[np.ndarray] = None,
+    neighbor_k: int = 0,
+    neighbor_idx: Optional[np.ndarray] = None,
+    neighbor_scores: Optional[np.ndarray] = None,
+) -> str:
+    os.makedirs(root, exist_ok=True)
+    target = artifact_path(root, fingerprint)
+
+    arrays = {
+        "idf": np.asarray(idf),
+        "neighbor_idx": (
+            neighbor_idx
+            if neighbor_idx is not None
+            else np.empty((0, 0), dtype=np.int32)
+        ),
+        "neighbor_scores": (
+            neighbor_scores
+            if neighbor_scores is not None
+            else np.empty((0, 0), dtype=np.float32)
+        ),
+    }
+    if sp.issparse(vectors):
+        arrays.update(data=vectors.data, indices=vectors.indices, indptr=vectors.indptr)
+    else:
+        arrays["dense"] = vectors
+    if projection is not None:
+        arrays["projection"] = projection
+
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "fingerprint": fingerprint,
+        "sparse": sp.issparse(vectors),
+        "shape": list(vectors.shape),
+        "neighbor_k": neighbor_k,
+    }
+
+    # Write next to the target and rename into place, so a concurrent reader
+    # either sees a complete artifact or none at all.
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=root)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(staging, _VOCABULARY_FILE), "w") as f:
+            json.dump(vocabulary, f)
+        with open(os.path.join(staging, _META_FILE), "w") as f:
+            json.dump(meta, f)
+
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _prune_stale(root, keep=os.path.basename(target))
+    return target
+
+
+def load_artifact(root: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    path = artifact_path(root, fingerprint)
+    meta_path = os.path.join(path, _META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        if (
+            meta.get("version") != ARTIFACT_VERSION
+            or meta.get("fingerprint") != fingerprint
+        ):
+            return None
+
+        with open(os.path.join(path, _VOCABULARY_FILE), "r") as f:
+            vocabulary = json.load(f)
+
+        # Memory-map the arrays: worker processes loading the same artifact
+        # share its pages through the OS page cache.
+        arrays = {
+            name[: -len(".npy")]: np.load(os.path.join(path, name), mmap_mode="r")
+            for name in os.listdir(path)
+            if name.endswith(".npy")
+        }
+
+        if meta["sparse"]:
+            vectors = sp.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=tuple(meta["shape"]),
+                copy=False,
+            )
+        else:
+            vectors = arrays["dense"]
+    except (OSError, ValueError, KeyError, json.JSONDecodeError) as e:
+        print(f"Warning: Failed to load model artifact from {path}: {e}")
+        return None
+
+    neighbor_idx = arrays["neighbor_idx"]
+    has_neighbors = neighbor_idx.size > 0
+
+    return {
+        "vocabulary": vocabulary,
+        "idf": np.array(arrays["idf"]),
+        "vectors": vectors,
+        "projection": arrays.get("projection"),
+        "neighbor_k": int(meta.get("neighbor_k", 0)),
+        "neighbor_idx": neighbor_idx if has_neighbors else None,
+        "neighbor_scores": arrays["neighbor_scores"] if has_neighbors else None,
+    }
+
+
+def _prune_stale(root: str, keep: str) -> None:
+    for name in os.listdir(root):
+        if name == keep or name.startswith(".staging-"):
+            continue
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, _META_FILE)):
+            # Readers that still map the old files keep them alive until
+            # they close, so removing them here is safe on POSIX.
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,157 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+LEADERBOARD_SIZE = 100
+
+
+class CatalogIndex:
+    # Catalog metadata the UI asks for on every rerun, derived once from df
+    # instead of rescanning it per call:
+    #
+    #   titles        active titles, in catalog order (rows holds their rows)
+    #   genre_rows    genre -> sorted active rows having it; its keys are the
+    #                 genre vocabulary
+    #   leaderboard   the LEADERBOARD_SIZE most popular active rows, best
+    #                 first, ties in catalog order
+    #
+    # Instances are not modified after build; append and remove return new
+    # indexes, so a published snapshot keeps its own.
+
+    def __init__(
+        self,
+        titles: List[str],
+        rows: np.ndarray,
+        genre_rows: Dict[str, np.ndarray],
+        popularity: np.ndarray,
+        leaderboard: np.ndarray,
+    ):
+        self.titles = titles
+        self.rows = rows
+        self.genre_rows = genre_rows
+        self.genres = sorted(genre_rows)
+        self.popularity = popularity
+        self.leaderboard = leaderboard
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "CatalogIndex":
+        titles = df["title"]
+        rows = np.flatnonzero(titles.notna().to_numpy())
+
+        popularity = (
+            pd.to_numeric(df["popularity"], errors="coerce").to_numpy(
+                np.float64, na_value=np.nan
+            )
+            if "popularity" in df.columns
+            else np.full(len(df), np.nan)
+        )
+
+        return cls(
+            titles.to_numpy()[rows].tolist(),
+            rows,
+            _genre_rows(df["genres"] if "genres" in df.columns else None),
+            popularity,
+            _leaderboard(popularity),
+        )
+
+    def append(self, movie: Dict[str, Any], row: int) -> "CatalogIndex":
+        genre_rows = dict(self.genre_rows)
+        for genre in _split_genres(movie.get("genres")):
+            previous = genre_rows.get(genre, np.empty(0, dtype=np.intp))
+            genre_rows[genre] = np.append(previous, np.intp(row))
+
+        value = _number(movie.get("popularity"))
+        popularity = np.append(self.popularity, value)
+
+        # The new row has the highest position, so it ranks after its ties.
+        leaderboard = self.leaderboard
+        if not np.isnan(value):
+            at = np.searchsorted(-popularity[leaderboard], -value, side="right")
+            if at < LEADERBOARD_SIZE:
+                leaderboard = np.insert(leaderboard, at, row)[:LEADERBOARD_SIZE]
+
+        titles, rows = self.titles, self.rows
+        if pd.notna(movie.get("title")):
+            titles = titles + [movie["title"]]
+            rows = np.append(rows, np.intp(row))
+
+        return CatalogIndex(titles, rows, genre_rows, popularity, leaderboard)
+
+    def remove(self, removed: np.ndarray) -> "CatalogIndex":
+        keep = ~np.isin(self.rows, removed)
+        titles = [title for title, kept in zip(self.titles, keep) if kept]
+
+        genre_rows = {}
+        for genre, rows in self.genre_rows.items():
+            rows = rows[~np.isin(rows, removed)]
+            if len(rows):
+                genre_rows[genre] = rows
+
+        # Removed rows leave the ranking; refilling the leaderboard needs a
+        # pass over the column only when one of them was on it.
+        popularity = self.popularity.copy()
+        popularity[removed] = np.nan
+        leaderboard = self.leaderboard
+        if np.isin(leaderboard, removed).any():
+            leaderboard = _leaderboard(popularity)
+
+        return CatalogIndex(
+            titles, self.rows[keep], genre_rows, popularity, leaderboard
+        )
+
+    def nbytes(self) -> int:
+        # The arrays only; the title list holds references to df's strings.
+        arrays = [self.rows, self.popularity, self.leaderboard]
+        return sum(a.nbytes for a in arrays + list(self.genre_rows.values()))
+
+    def top_popular(self, n: int) -> Optional[np.ndarray]:
+        # Rows of the n most popular movies, or None when n is past the
+        # leaderboard and the caller must rank the catalog itself.
+        if n > LEADERBOARD_SIZE:
+            return None
+        return self.leaderboard[:n]
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _split_genres(genres: Any) -> List[str]:
+    if not isinstance(genres, str):
+        return []
+    return [g.strip() for g in genres.split(",") if g.strip()]
+
+
+def _genre_rows(genres: Optional[pd.Series]) -> Dict[str, np.ndarray]:
+    # Parsed once per distinct genres string, then inverted per genre.
+    if genres is None:
+        return {}
+    codes, uniques = pd.factorize(genres)
+
+    codes_of: Dict[str, List[int]] = {}
+    for code, value in enumerate(uniques):
+        for genre in _split_genres(value):
+            codes_of.setdefault(genre, []).append(code)
+
+    return {
+        genre: np.flatnonzero(np.isin(codes, genre_codes))
+        for genre, genre_codes in codes_of.items()
+    }
+
+
+def _leaderboard(popularity: np.ndarray) -> np.ndarray:
+    # Every row tied with the last place is a candidate, so the stable sort
+    # breaks ties by position whatever argpartition picked.
+    valid = ~np.isnan(popularity)
+    if not valid.any():
+        return np.empty(0, dtype=np.intp)
+
+    values = popularity[valid]
+    k = min(LEADERBOARD_SIZE, len(values))
+    cutoff = np.partition(values, len(values) - k)[len(values) - k]
+    candidates = np.flatnonzero(valid & (popularity >= cutoff))
+    order = np.argsort(-popularity[candidates], kind="stable")
+    return candidates[order[:LEADERBOARD_SIZE]]
@@ -0,0 +1,196 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class MovieFilter:
+    # Structured restriction for the recommend_* methods. Unset fields do not
+    # filter; genres match a movie having any of them, and a movie with a
+    # missing value fails every range tested against that value.
+
+    def __init__(
+        self,
+        genres: Optional[Iterable[str]] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        min_votes: Optional[int] = None,
+        runtime_min: Optional[float] = None,
+        runtime_max: Optional[float] = None,
+    ):
+        self.genres = frozenset(g.strip() for g in genres or () if g.strip())
+        self.year_min = year_min
+        self.year_max = year_max
+        self.min_rating = min_rating
+        self.min_votes = min_votes
+        self.runtime_min = runtime_min
+        self.runtime_max = runtime_max
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> "MovieFilter":
+        # From a JSON object with the constructor's field names.
+        unknown = set(values) - set(cls().__dict__)
+        if unknown:
+            raise ValueError(f"Unknown filter fields: {', '.join(sorted(unknown))}")
+
+        numbers = {
+            name: float(value)
+            for name, value in values.items()
+            if name != "genres" and value is not None
+        }
+        return cls(genres=values.get("genres"), **numbers)
+
+    def is_empty(self) -> bool:
+        return not self.genres and all(
+            value is None for name, value in self.__dict__.items() if name != "genres"
+        )
+
+    def key(self) -> Tuple:
+        # Hashable and order-independent, for the result cache.
+        return (tuple(sorted(self.genres)),) + tuple(
+            value for name, value in self.__dict__.items() if name != "genres"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, MovieFilter) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+
+class FilterIndex:
+    # The filterable metadata of every df row as NumPy columns, so a filter
+    # is a handful of vectorized comparisons rather than a DataFrame query:
+    # release year, vote average, vote count and runtime as float32 (NaN when
+    # missing), and genres as a bitmap with one bit per genre, in as many
+    # uint64 words as the genres need.
+    #
+    # Instances are not modified after build; append returns a new index.
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        genre_bits: np.ndarray,
+        genre_ids: Dict[str, int],
+    ):
+        self.columns = columns
+        self.genre_bits = genre_bits
+        self.genre_ids = genre_ids
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "FilterIndex":
+        return cls._from_frame(df, {})
+
+    @classmethod
+    def _from_frame(cls, df: pd.DataFrame, genre_ids: Dict[str, int]) -> "FilterIndex":
+        genre_ids = dict(genre_ids)
+        genres = (
+            df["genres"] if "genres" in df.columns else pd.Series("", index=df.index)
+        )
+        return cls(
+            {
+                "year": _years(df.get("release_date"), len(df)),
+                "rating": _numbers(df.get("vote_average"), len(df)),
+                "votes": _numbers(df.get("vote_count"), len(df)),
+                "runtime": _numbers(df.get("runtime"), len(df)),
+            },
+            _genre_bits(genres, genre_ids),
+            genre_ids,
+        )
+
+    def append(self, movie: Dict[str, Any]) -> "FilterIndex":
+        added = self._from_frame(pd.DataFrame([movie]), self.genre_ids)
+
+        # A new genre past the last word widens the bitmap.
+        bits = self.genre_bits
+        if added.genre_bits.shape[1] > bits.shape[1]:
+            bits = np.pad(
+                bits, ((0, 0), (0, added.genre_bits.shape[1] - bits.shape[1]))
+            )
+
+        return FilterIndex(
+            {
+                name: np.concatenate([column, added.columns[name]])
+                for name, column in self.columns.items()
+            },
+            np.vstack([bits, added.genre_bits]),
+            added.genre_ids,
+        )
+
+    def __len__(self) -> int:
+        return len(self.genre_bits)
+
+    def mask(self, filters: MovieFilter) -> np.ndarray:
+        # Rows passing every set field of filters.
+        mask = np.ones(len(self), dtype=bool)
+
+        if filters.genres:
+            wanted = np.zeros(self.genre_bits.shape[1], dtype=np.uint64)
+            for genre in filters.genres:
+                if genre in self.genre_ids:
+                    bit = self.genre_ids[genre]
+                    wanted[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+            mask &= (self.genre_bits & wanted).any(axis=1)
+
+        for column, low, high in (
+            ("year", filters.year_min, filters.year_max),
+            ("rating", filters.min_rating, None),
+            ("votes", filters.min_votes, None),
+            ("runtime", filters.runtime_min, filters.runtime_max),
+        ):
+            # NaN compares False, so missing values fail the range.
+            if low is not None:
+                mask &= self.columns[column] >= low
+            if high is not None:
+                mask &= self.columns[column] <= high
+
+        return mask
+
+    def bounds(self) -> Dict[str, Tuple[float, float]]:
+        # (min, max) of each column over the rows that have a value.
+        bounds = {}
+        for name, column in self.columns.items():
+            present = column[~np.isnan(column)]
+            if len(present):
+                bounds[name] = (float(present.min()), float(present.max()))
+        return bounds
+
+    def nbytes(self) -> int:
+        return self.genre_bits.nbytes + sum(c.nbytes for c in self.columns.values())
+
+
+def _numbers(values: Optional[pd.Series], n_rows: int) -> np.ndarray:
+    if values is None:
+        return np.full(n_rows, np.nan, dtype=np.float32)
+    return pd.to_numeric(values, errors="coerce").to_numpy(np.float32, na_value=np.nan)
+
+
+def _years(dates: Optional[pd.Series], n_rows: int) -> np.ndarray:
+    # "YYYY-MM-DD" -> year; parsed once per distinct date.
+    if dates is None:
+        return np.full(n_rows, np.nan, dtype=np.float32)
+    codes, uniques = pd.factorize(dates)
+    years = pd.to_numeric(
+        pd.Series(uniques, dtype=object).astype(str).str[:4], errors="coerce"
+    ).to_numpy(np.float32, na_value=np.nan)
+    # Missing dates have code -1, which picks the trailing NaN.
+    return np.append(years, np.float32(np.nan))[codes]
+
+
+def _genre_bits(genres: pd.Series, genre_ids: Dict[str, int]) -> np.ndarray:
+    # One bitmap row per distinct genres string, then gathered per movie.
+    # genre_ids is extended in place with genres seen for the first time.
+    # Missing genres have code -1, which picks a trailing all-zero row.
+    codes, uniques = pd.factorize(genres)
+    parsed = [[g.strip() for g in str(u).split(",") if g.strip()] for u in uniques]
+    for names in parsed:
+        for name in names:
+            genre_ids.setdefault(name, len(genre_ids))
+
+    n_words = max(1, -(-len(genre_ids) // 64))
+    table = np.zeros((len(uniques) + 1, n_words), dtype=np.uint64)
+    for i, names in enumerate(parsed):
+        for name in names:
+            bit = genre_ids[name]
+            table[i, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+    return table[codes]
@@ -0,0 +1,118 @@
+from typing import List, Optional, Sequence, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+import math
+import multiprocessing
+import os
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator
+from sklearn.feature_extraction.text import HashingVectorizer
+
+
+class HashedTfidfVectorizer(BaseEstimator):
+    # TF-IDF without a vocabulary: terms are hashed straight to one of
+    # n_features columns, so documents can be tokenized independently. fit
+    # hashes chunks of documents on a process pool, merges their document
+    # frequencies into idf_ and stacks the CSR blocks; transform applies the
+    # same hashing and idf_, so keyword queries land in the fitted space.
+    #
+    # min_df/max_df prune terms as in TfidfVectorizer (their idf_ is 0, so
+    # they drop out of every vector). Colliding terms share a column, which
+    # is rare with the default 2**18 columns and a 20k-term catalog.
+
+    def __init__(
+        self,
+        n_features: int = 2**18,
+        stop_words: Optional[str] = "english",
+        ngram_range: Tuple[int, int] = (1, 2),
+        min_df: Union[int, float] = 2,
+        max_df: Union[int, float] = 0.8,
+        dtype=np.float32,
+        n_jobs: Optional[int] = None,
+        min_chunk_size: int = 1_000,
+    ):
+        self.n_features = n_features
+        self.stop_words = stop_words
+        self.ngram_range = ngram_range
+        self.min_df = min_df
+        self.max_df = max_df
+        self.dtype = dtype
+        self.n_jobs = n_jobs
+        self.min_chunk_size = min_chunk_size
+
+    def _hasher(self) -> HashingVectorizer:
+        # Raw term counts; idf weighting and normalization come afterwards.
+        return HashingVectorizer(
+            n_features=self.n_features,
+            stop_words=self.stop_words,
+            ngram_range=self.ngram_range,
+            alternate_sign=False,
+            norm=None,
+            dtype=self.dtype,
+        )
+
+    def fit_transform(self, texts: Sequence[str], y=None) -> sp.csr_matrix:
+        texts = list(texts)
+        # One chunk per worker, unless that would make chunks too small to
+        # be worth sending to a process.
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        chunk_size = max(self.min_chunk_size, math.ceil(len(texts) / n_jobs))
+        chunks = [
+            texts[start : start + chunk_size]
+            for start in range(0, len(texts), chunk_size)
+        ]
+        n_jobs = min(n_jobs, len(chunks))
+
+        if n_jobs <= 1:
+            results = [_hash_chunk(self._hasher(), chunk) for chunk in chunks]
+        else:
+            # spawn: the parent may be a threaded server (Streamlit, the HTTP
+            # service), which fork does not handle safely.
+            with ProcessPoolExecutor(
+                max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                results = list(
+                    pool.map(_hash_chunk, [self._hasher()] * len(chunks), chunks)
+                )
+
+        blocks = [block for block, _ in results]
+        doc_freq = np.sum([df for _, df in results], axis=0)
+        self._fit_idf(doc_freq, len(texts))
+
+        counts = (
+            sp.vstack(blocks, format="csr") if blocks else self._hasher().transform([])
+        )
+        return self._weight(counts)
+
+    def fit(self, texts: Sequence[str], y=None) -> "HashedTfidfVectorizer":
+        self.fit_transform(texts)
+        return self
+
+    def transform(self, texts: Sequence[str]) -> sp.csr_matrix:
+        return self._weight(self._hasher().transform(texts))
+
+    def _fit_idf(self, doc_freq: np.ndarray, n_docs: int) -> None:
+        # Smoothed idf, as TfidfVectorizer: ln((1 + n) / (1 + df)) + 1
+        idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+        min_df = self.min_df if isinstance(self.min_df, int) else self.min_df * n_docs
+        max_df = self.max_df if isinstance(self.max_df, int) else self.max_df * n_docs
+        idf[(doc_freq < max(min_df, 1)) | (doc_freq > max_df)] = 0
+        self.idf_ = idf.astype(self.dtype)
+        # Vocabulary-free: there are no term -> column entries to persist.
+        self.vocabulary_ = {}
+
+    def _weight(self, counts: sp.csr_matrix) -> sp.csr_matrix:
+        counts = counts.tocsr()
+        counts.data *= self.idf_[counts.indices]
+        counts.eliminate_zeros()
+        return counts
+
+
+def _hash_chunk(
+    hasher: HashingVectorizer, texts: List[str]
+) -> Tuple[sp.csr_matrix, np.ndarray]:
+    # Runs in a worker: term counts of the chunk and its document frequencies.
+    counts = hasher.transform(texts).tocsr()
+    counts.sum_duplicates()
+    doc_freq = np.bincount(counts.indices, minlength=hasher.n_features)
+    return counts, doc_freq
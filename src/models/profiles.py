@@ -0,0 +1,102 @@
+from typing import Callable, Dict, Optional, Union
+from collections import OrderedDict
+import itertools
+import threading
+import numpy as np
+import scipy.sparse as sp
+
+_generations = itertools.count()
+
+
+class UserProfile:
+    # One user's ratings plus the state derived from them: the running
+    # like/dislike sums over their rows of the shared item matrix, from which
+    # the profile vector is built per query. Nothing here copies the item
+    # matrix itself.
+
+    def __init__(self, ratings: Dict[str, str]):
+        self.ratings = ratings
+        # Bumped whenever self.ratings changes; keys the cached vector
+        # together with the model version.
+        self.version: int = 0
+        # Unique per UserProfile object, so a profile that was evicted and
+        # reloaded (version back at 0) never matches results cached for the
+        # old one.
+        self.generation: int = next(_generations)
+
+        # Valid while sums_version matches the model version. One row each:
+        # sparse for TF-IDF, which only holds the terms of the rated movies,
+        # dense for LSA.
+        self.like_sum: Optional[Union[sp.csr_matrix, np.ndarray]] = None
+        self.dislike_sum: Optional[Union[sp.csr_matrix, np.ndarray]] = None
+        self.like_count: int = 0
+        self.dislike_count: int = 0
+        self.sums_version: int = -1
+
+        # Serializes the requests of this user that read or update the sums.
+        self.lock = threading.Lock()
+
+    def nbytes(self) -> int:
+        total = 0
+        for matrix in (self.like_sum, self.dislike_sum):
+            if sp.issparse(matrix):
+                total += (
+                    matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+                )
+            elif matrix is not None:
+                total += matrix.nbytes
+        return total
+
+
+class ProfileCache:
+    # Bounded LRU of UserProfile objects keyed by user id. A profile that is
+    # not cached (never seen, or evicted) is rebuilt from the ratings returned
+    # by load_ratings, so memory is capped at max_profiles profiles however
+    # many users the storage holds.
+
+    def __init__(
+        self,
+        load_ratings: Callable[[str], Dict[str, str]],
+        max_profiles: int = 256,
+    ):
+        if max_profiles < 1:
+            raise ValueError("max_profiles must be at least 1.")
+
+        self._load_ratings = load_ratings
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, UserProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> UserProfile:
+        with self._lock:
+            profile = self._profiles.get(user_id)
+            if profile is not None:
+                self._profiles.move_to_end(user_id)
+                return profile
+
+        # Load outside the lock so a slow storage read does not block
+        # users that are already cached.
+        profile = UserProfile(self._load_ratings(user_id))
+
+        with self._lock:
+            # Another thread may have loaded the same user meanwhile.
+            existing = self._profiles.get(user_id)
+            if existing is not None:
+                self._profiles.move_to_end(user_id)
+                return existing
+
+            self._profiles[user_id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+            return profile
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._profiles
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def nbytes(self) -> int:
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return sum(p.nbytes() for p in profiles)
@@ -1,33 +1,310 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 import pandas as pd
+from sklearn.base import clone
+from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+import scipy.sparse as sp
 import os
 import json
+import itertools
+import threading
+import time
 import numpy as np
+from src.data.catalog import RowStore, append_rows, compact_frame, read_catalog
+from src.data.storage import DEFAULT_USER, JSONStorage, SQLiteStorage
+from src.models.ann import ExactSearch, IVFSearch
+from src.models.artifact import content_hash, load_artifact, save_artifact
+from src.models.catalog_index import CatalogIndex
+from src.models.filters import FilterIndex, MovieFilter
+from src.models.hashed import HashedTfidfVectorizer
+from src.models.profiles import ProfileCache, UserProfile
+from src.models.result_cache import ResultCache
+from src.models.snapshot import (
+    ModelSnapshot,
+    SnapshotField,
+    pinned,
+    reads_snapshot,
+    writes_snapshot,
+    writing,
+)
+from src.models.telemetry import Telemetry, timed
+from src.models.title_search import TitleSearchIndex
+
+
+def _top_n_indices(
+    scores: np.ndarray, top_n: int, excluded: Optional[np.ndarray] = None
+) -> np.ndarray:
+    # Partial selection: argpartition finds the best top_n in O(n), and only
+    # those are fully sorted (score descending, then row index for ties).
+    if excluded is not None and excluded.any():
+        scores = np.where(excluded, -np.inf, scores)
+        available = len(scores) - int(np.count_nonzero(excluded))
+    else:
+        available = len(scores)
+
+    k = min(int(top_n), available)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+        # argpartition keeps arbitrary rows of a tie at the k-th score; the
+        # ones ranked are the lowest rows of the tie.
+        kth = scores[top].min()
+        above = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)[: k - len(above)]
+        top = np.concatenate([above, tied])
+    else:
+        top = np.arange(len(scores))
+    return top[np.lexsort((top, -scores[top]))][:k]
+
+
+# With a filter passing at most this fraction of the catalog, only its rows
+# are gathered and scored; above it, gathering costs about as much as it saves,
+# so every row is scored and the rest masked out of the ranking.
+_SUBSET_SCORING = 0.5
+_FILTERED_EXACT_ROWS = 2048
+
+# An exact neighbor table scores every pair of movies, which takes minutes
+# past this many rows; larger catalogs only get one from the IVF candidates.
+NEIGHBOR_EXACT_ROWS = 50_000
+
+# How recommend_by_keywords combines the comma-separated keywords:
+#   "sum"       one query vector, the sum of the keyword vectors
+#   "weighted"  the same with one weight per keyword (default 1, 1/2, 1/3...)
+#   "max"       every keyword scored separately; a movie keeps its best score
+KEYWORD_STRATEGIES = ("sum", "weighted", "max")
+
+# Numbers each fitted or loaded vectorizer; only increases, so it can version
+# the term cache even across writers whose draft was never published.
+_vectorizer_generations = itertools.count(1)
+
+
+def _active(filters: Optional[MovieFilter]) -> Optional[MovieFilter]:
+    return filters if filters is not None and not filters.is_empty() else None
+
+
+def _filter_key(filters: Optional[MovieFilter]) -> Optional[tuple]:
+    return filters.key() if filters is not None else None
+
+
+def _positions_in(sorted_rows: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    # Positions in sorted_rows of the given rows that it contains.
+    positions = np.searchsorted(sorted_rows, rows)
+    positions = positions[positions < len(sorted_rows)]
+    return positions[np.isin(sorted_rows[positions], rows)]
+
+
+def _split_keywords(text: str) -> List[str]:
+    return [kw.strip() for kw in text.split(",") if kw.strip()]
+
+
+def _stack_weighted(groups) -> Union[sp.csr_matrix, np.ndarray]:
+    # One row per group of (row vector, weight) pairs: the weighted sum of
+    # the group's rows. Sparse rows are concatenated as raw CSR arrays, which
+    # is much cheaper than vstack plus a folding product for a few terms.
+    first = groups[0][0][0]
+    if not sp.issparse(first):
+        return np.vstack([sum(w * vec for vec, w in group) for group in groups])
+
+    indices, data, indptr = [], [], [0]
+    for group in groups:
+        for vec, w in group:
+            indices.append(vec.indices)
+            data.append(vec.data * np.float32(w))
+        indptr.append(indptr[-1] + sum(len(vec.indices) for vec, _ in group))
+
+    stacked = sp.csr_matrix(
+        (np.concatenate(data), np.concatenate(indices), np.asarray(indptr)),
+        shape=(len(groups), first.shape[1]),
+    )
+    stacked.sum_duplicates()
+    return stacked
+
+
+def _top_n_per_row(scores: np.ndarray, top_n: int) -> np.ndarray:
+    # Row-wise version of _top_n_indices for a (queries x items) score block.
+    # Excluded entries are expected to be -inf already.
+    n_items = scores.shape[1]
+    k = min(int(top_n), n_items)
+    if k < n_items:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        # Rows whose tie at the k-th score runs past the partition are
+        # selected one by one, so they also rank the lowest rows of the tie.
+        kth = np.take_along_axis(scores, top, axis=1).min(axis=1)
+        for i in np.flatnonzero((scores >= kth[:, None]).sum(axis=1) > k):
+            top[i] = _top_n_indices(scores[i], k)
+    else:
+        top = np.tile(np.arange(n_items), (scores.shape[0], 1))
+
+    # Sorting by index first makes the stable score sort break ties by row.
+    top.sort(axis=1)
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _to_dense(scores: Union[sp.spmatrix, np.ndarray]) -> np.ndarray:
+    if sp.issparse(scores):
+        return scores.toarray()
+    return np.asarray(scores)
+
+
+def _matrix_nbytes(matrix: Union[sp.csr_matrix, np.ndarray]) -> int:
+    if sp.issparse(matrix):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return matrix.nbytes
+
+
+def _time_queries(
+    matrix: Union[sp.csr_matrix, np.ndarray], n_queries: int = 8
+) -> float:
+    # Mean wall time in ms to score one catalog row against the whole matrix.
+    n_queries = min(n_queries, matrix.shape[0])
+    if n_queries == 0:
+        return 0.0
+
+    rows = np.linspace(0, matrix.shape[0] - 1, n_queries).astype(int)
+    start = time.perf_counter()
+    for row in rows:
+        _to_dense(matrix @ matrix[row : row + 1].T)
+    return (time.perf_counter() - start) * 1000 / n_queries
 
 
 class MovieRecommender:
+    # Model state lives in an immutable ModelSnapshot (see
+    # src/models/snapshot.py). The public methods are readers, which pin the
+    # published snapshot without locking, or writers, which build a new
+    # snapshot under a lock and swap it in when done; a refit therefore never
+    # blocks or disturbs recommendations running on other threads.
+    df = SnapshotField("df")
+    vectorizer = SnapshotField("vectorizer")
+    vectors = SnapshotField("vectors")
+    search = SnapshotField("search")
+    neighbor_k = SnapshotField("neighbor_k")
+    _projection = SnapshotField("projection")
+    _tfidf_stats = SnapshotField("tfidf_stats")
+    _neighbor_idx = SnapshotField("neighbor_idx")
+    _neighbor_scores = SnapshotField("neighbor_scores")
+    _removed = SnapshotField("removed")
+    _pending_changes = SnapshotField("pending_changes")
+    _n_base = SnapshotField("n_base")
+    _lazy = SnapshotField("lazy")
+    _model_version = SnapshotField("version")
+    _vectorizer_version = SnapshotField("vectorizer_version")
+    _title_rows = SnapshotField("title_rows")
+    _id_rows = SnapshotField("id_rows")
+    _next_id = SnapshotField("next_id")
+    _filter_index = SnapshotField("filter_index")
+    _catalog_index = SnapshotField("catalog_index")
+    _title_search = SnapshotField("title_search")
+
     def __init__(
         self,
         csv_path: str,
         json_movies: str = "user_movies.json",
         json_ratings: str = "user_ratings.json",
+        refit_threshold: int = 50,
+        profile_alpha: float = 1.0,
+        profile_beta: float = 0.5,
+        search: Optional[Union[ExactSearch, IVFSearch]] = None,
+        representation: str = "tfidf",
+        n_components: int = 256,
+        storage: Optional[Union[JSONStorage, SQLiteStorage]] = None,
+        max_profiles: int = 256,
+        telemetry: bool = False,
+        result_cache_size: int = 1024,
+        result_cache_ttl: Optional[float] = None,
+        term_cache_size: int = 4096,
+        features: str = "vocabulary",
+        n_jobs: Optional[int] = None,
+        compact_catalog: bool = False,
     ):
+        if representation not in {"tfidf", "lsa"}:
+            raise ValueError("Representation must be 'tfidf' or 'lsa'.")
+        if features not in {"vocabulary", "hashed"}:
+            raise ValueError("Features must be 'vocabulary' or 'hashed'.")
+
         self.csv_path = csv_path
         self.json_movies = json_movies
         self.json_ratings = json_ratings
-
-        self.vectorizer = TfidfVectorizer(
-            max_features=20_000,
-            stop_words="english",
-            ngram_range=(1, 2),  # Include unigrams and bigrams
-            min_df=2,  # Ignore terms that appear in less than 2 documents
-            max_df=0.8,  # Ignore terms that appear in more than 80% of documents
+        # Where ratings and user-added movies are persisted; defaults to the
+        # two JSON files above
+        self.storage = (
+            storage if storage is not None else JSONStorage(json_movies, json_ratings)
         )
-        self.vectors: Optional[np.ndarray] = None
-        self.df: pd.DataFrame = self._load_movies()
-        self.ratings: Dict[str, str] = self._load_ratings()
+        # Number of incremental adds/removals after which the model is
+        # compacted with a full refit (new terms are only learned on refit),
+        # on a background thread; see _compact_in_background
+        self.refit_threshold = refit_threshold
+        self._compaction: Optional[threading.Thread] = None
+        # Weights of the liked and disliked means in the user profile vector
+        self.profile_alpha = profile_alpha
+        self.profile_beta = profile_beta
+        # "tfidf": self.vectors is the L2-normalized TF-IDF CSR matrix.
+        # "lsa": TF-IDF is projected to n_components dimensions with
+        # TruncatedSVD and self.vectors is a dense, L2-normalized float32
+        # array, so scoring is a single BLAS matrix-vector product.
+        self.representation = representation
+        self.n_components = n_components
+        # "vocabulary": TfidfVectorizer with a learned 20k-term vocabulary,
+        # fitted in one thread. "hashed": HashedTfidfVectorizer, which needs
+        # no vocabulary and tokenizes chunks of the catalog on n_jobs
+        # processes (all cores by default).
+        self.features = features
+        # Keep self.df small: float32/int32 numbers, categorical or Arrow
+        # strings, and (CSV catalogs) keywords/overview in a RowStore of UTF-8
+        # buffers rather than a Python string per row (see memory_report()).
+        self.compact_catalog = compact_catalog
+
+        # Each user's ratings and cached profile live in a UserProfile; the
+        # most recently used max_profiles of them are kept in memory and the
+        # rest are reloaded from storage on demand.
+        self._profiles = ProfileCache(self.storage.load_ratings, max_profiles)
+
+        # Per-stage latency histograms and counters (see telemetry_stats());
+        # off by default, and can be switched with self.telemetry.enabled.
+        self.telemetry = Telemetry(enabled=telemetry)
+
+        # Results of recent recommend_* calls, keyed by the query and the
+        # model/profile versions they were computed at (0 disables it)
+        self._results = ResultCache(result_cache_size, result_cache_ttl)
+        # Query vector of each recently used keyword, for the same fitted
+        # vectorizer (keywords repeat across queries far more than whole
+        # queries); adding or removing movies keeps them valid
+        self._term_vectors = ResultCache(term_cache_size)
+        # (vectorizer, ms) of the raw TF-IDF scoring time representation_report()
+        # measured for that fitted vectorizer
+        self._tfidf_timing: Optional[tuple] = None
+
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._snapshot = ModelSnapshot()
+        with writing(self):
+            # Candidate search used by the recommend_* methods: ExactSearch
+            # scores the whole catalog, IVFSearch only the rows of the probed
+            # lists
+            self.search = search if search is not None else ExactSearch()
+            if features == "hashed":
+                self.vectorizer = HashedTfidfVectorizer(
+                    stop_words="english",
+                    ngram_range=(1, 2),
+                    min_df=2,
+                    max_df=0.8,
+                    dtype=np.float32,
+                    n_jobs=n_jobs,
+                )
+            else:
+                self.vectorizer = TfidfVectorizer(
+                    max_features=20_000,
+                    stop_words="english",
+                    ngram_range=(1, 2),  # Include unigrams and bigrams
+                    min_df=2,  # Ignore terms that appear in less than 2 documents
+                    max_df=0.8,  # Ignore terms that appear in more than 80% of documents
+                    dtype=np.float32,
+                )
+            self.df = self._load_movies()
+            self._build_lookup_index()
 
     # ----------------------------
     # Data Loading
@@ -37,200 +314,1175 @@ class MovieRecommender:
         if not os.path.exists(self.csv_path):
             raise FileNotFoundError(f"Base data file not found: {self.csv_path}")
 
-        df_base = pd.read_csv(self.csv_path)
+        df_base, self._lazy = read_catalog(self.csv_path, compact=self.compact_catalog)
+        # Rows past this position come from the user movies file
+        self._n_base = len(df_base)
 
-        if os.path.exists(self.json_movies):
+        user_data = self.storage.load_movies()
+        if user_data:
             try:
-                with open(self.json_movies, "r") as f:
-                    user_data = json.load(f)
-                    if user_data:
-                        user_df = pd.DataFrame(user_data)
-                        df_base = pd.concat([df_base, user_df], ignore_index=True)
-            except (json.JSONDecodeError, KeyError, TypeError) as e:
-                print(
-                    f"Warning: Failed to load user movies from {self.json_movies}: {e}"
-                )
-
+                user_df = pd.DataFrame(user_data)
+                lazy = self._lazy
+                if isinstance(lazy, RowStore):
+                    # Compact CSV catalogs keep the user rows' text there too.
+                    lazy = lazy.append(user_df)
+                    user_df = user_df.drop(columns=list(lazy.columns), errors="ignore")
+                df_base = pd.concat([df_base, user_df], ignore_index=True)
+                self._lazy = lazy
+            except (KeyError, TypeError) as e:
+                print(f"Warning: Failed to load user movies: {e}")
+
+        if self.compact_catalog:
+            df_base = compact_frame(df_base)
         return df_base
 
-    def _load_ratings(self) -> Dict[str, str]:
-        if not os.path.exists(self.json_ratings):
-            return {}
+    @property
+    def ratings(self) -> Dict[str, str]:
+        # Ratings of the default user, for single-user callers.
+        return self.get_ratings()
+
+    def get_ratings(self, user_id: str = DEFAULT_USER) -> Dict[str, str]:
+        # A copy: the profile's dict changes under other sessions' ratings,
+        # and only the rating methods may modify it.
+        profile = self._profiles.get(user_id)
+        with profile.lock:
+            return dict(profile.ratings)
+
+    def _build_lookup_index(self) -> None:
+        self._title_rows = self.df.groupby("title", sort=False).indices
+
+        self._id_rows = {}
+        if "id" in self.df.columns:
+            ids = self.df["id"]
+            valid = ids.notna().to_numpy()
+            positions = np.flatnonzero(valid)
+            id_values = ids.to_numpy()[valid].astype(np.int64)
+            self._id_rows = dict(zip(id_values.tolist(), positions.tolist()))
+        self._next_id = max(self._id_rows, default=0) + 1
+        self._filter_index = FilterIndex.build(self.df)
+        self._catalog_index = CatalogIndex.build(self.df)
+        self._title_search = TitleSearchIndex.build(
+            self.df["title"], self._catalog_index.popularity
+        )
 
-        try:
-            with open(self.json_ratings, "r") as f:
-                data = json.load(f)
-                return data if isinstance(data, dict) else {}
-        except (json.JSONDecodeError, TypeError) as e:
-            print(f"Warning: Failed to load ratings from {self.json_ratings}: {e}")
-            return {}
+    def _rows_for_title(self, title: str) -> np.ndarray:
+        return self._title_rows.get(title, np.empty(0, dtype=np.intp))
+
+    def _rows_for_titles(self, titles) -> np.ndarray:
+        rows = [self._title_rows[t] for t in titles if t in self._title_rows]
+        if not rows:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(rows)
+
+    def _resolve_title(self, title: str) -> Optional[int]:
+        rows = self._rows_for_title(title)
+        if len(rows) == 0:
+            return None
+        if len(rows) == 1 or "popularity" not in self.df.columns:
+            return int(rows[0])
+
+        # Duplicate titles: use the most popular entry as the query movie.
+        popularity = self.df["popularity"].to_numpy()[rows]
+        return int(rows[np.nanargmax(np.nan_to_num(popularity, nan=-np.inf))])
+
+    @reads_snapshot
+    def get_row_by_id(self, movie_id: int) -> Optional[int]:
+        return self._id_rows.get(int(movie_id))
 
     # ----------------------------
     # Model Training
     # ----------------------------
 
-    def fit(self) -> None:
-        self.df["combined_features"] = (
-            self.df["genres"].fillna("")
+    @writes_snapshot
+    @timed("fit", event="refits")
+    def fit(
+        self, neighbors: Optional[int] = None, max_block_bytes: int = 64 << 20
+    ) -> None:
+        # neighbors=None keeps the previous neighbor-index setting, so the
+        # refits triggered by movie management preserve it.
+        if neighbors is not None:
+            self.neighbor_k = max(int(neighbors), 0)
+
+        self._build_lookup_index()
+        features = self._catalog_features()
+
+        # Fit a fresh vectorizer: the published one is still in use by readers.
+        self.vectorizer = clone(self.vectorizer)
+        self._vectorizer_version = next(_vectorizer_generations)
+        tfidf = normalize(self.vectorizer.fit_transform(features), copy=False).tocsr()
+        del features
+        # Its scoring time is measured on demand, by representation_report().
+        self._tfidf_stats = {"vector_bytes": _matrix_nbytes(tfidf)}
+
+        if self.representation == "lsa":
+            n_components = max(1, min(self.n_components, min(tfidf.shape) - 1))
+            svd = TruncatedSVD(n_components=n_components, random_state=0)
+            svd.fit(tfidf)
+            self._projection = svd.components_.astype(np.float32)
+            self.vectors = self._project(tfidf)
+        else:
+            self._projection = None
+            self.vectors = tfidf
+        self._removed = np.zeros(len(self.df), dtype=bool)
+        self._pending_changes = 0
+        self._model_version += 1
+        self.search = self.search.clone()
+        self.search.build(self.vectors)
+
+        self._neighbor_idx = None
+        self._neighbor_scores = None
+        if self.neighbor_k > 0:
+            self._build_neighbor_index(self.neighbor_k, max_block_bytes)
+
+    def _catalog_features(self) -> pd.Series:
+        return self._combined_features(
+            pd.DataFrame(
+                {
+                    "genres": self._text_column("genres"),
+                    "keywords": self._text_column("keywords"),
+                    "overview": self._text_column("overview"),
+                }
+            )
+        )
+
+    @staticmethod
+    def _combined_features(df: pd.DataFrame) -> pd.Series:
+        return (
+            df["genres"].fillna("")
             + " "
-            + self.df["keywords"].fillna("")
+            + df["keywords"].fillna("")
             + " "
-            + self.df["overview"].fillna("")
+            + df["overview"].fillna("")
+        )
+
+    def _text_column(self, column: str) -> pd.Series:
+        # Full-length text column. The rows the lazy columns hold (the base
+        # rows of a columnar catalog, every row of a compact CSV one) come
+        # from them, the user-added rows after those from self.df.
+        if self._lazy is None or column not in self._lazy.columns:
+            if column not in self.df.columns:
+                return pd.Series("", index=self.df.index)
+            # Compact catalogs hold categorical/Arrow strings.
+            return self.df[column].astype(object)
+
+        base = self._lazy.series(column)
+        n_lazy = len(self._lazy)
+        if len(self.df) == n_lazy:
+            return base.set_axis(self.df.index)
+
+        user = (
+            self.df[column].iloc[n_lazy:]
+            if column in self.df.columns
+            else pd.Series("", index=self.df.index[n_lazy:])
+        )
+        return pd.concat([base, user], ignore_index=True).set_axis(self.df.index)
+
+    @timed("transform")
+    def _transform(self, texts) -> Union[sp.csr_matrix, np.ndarray]:
+        # Text -> row vectors in the space of self.vectors. Keyword queries and
+        # added movies are folded into LSA with the fitted projection.
+        tfidf = normalize(self.vectorizer.transform(texts), copy=False)
+        if self._projection is None:
+            return tfidf
+        return self._project(tfidf)
+
+    def _project(self, tfidf: sp.csr_matrix) -> np.ndarray:
+        dense = np.asarray(tfidf @ self._projection.T, dtype=np.float32)
+        return np.ascontiguousarray(normalize(dense, copy=False))
+
+    def _row_vector(self, idx: int) -> Union[sp.csr_matrix, np.ndarray]:
+        # A single row kept two-dimensional for both representations
+        return self.vectors[idx : idx + 1]
+
+    @writes_snapshot
+    @timed("compact", event="compactions")
+    def compact(self) -> None:
+        # Drop tombstoned rows and learn the vocabulary of added movies.
+        self.df = self._load_movies()
+        self.fit()
+
+    def _build_neighbor_index(self, k: int, max_block_bytes: int) -> None:
+        n_items = self.vectors.shape[0]
+        k = min(k, n_items - 1)
+        if k <= 0:
+            return
+
+        # (rows, candidate rows) blocks; None candidates means every row.
+        blocks = self.search.neighbor_candidates()
+        if blocks is None:
+            if n_items > NEIGHBOR_EXACT_ROWS:
+                print(
+                    f"Warning: No neighbor table for {n_items:,} rows; exact "
+                    f"tables stop at {NEIGHBOR_EXACT_ROWS:,} rows, use the ivf "
+                    "search backend for larger catalogs."
+                )
+                return
+            blocks = [(np.arange(n_items), None)]
+
+        # Rows with fewer candidates than k are padded with themselves at
+        # -inf, which queries skip.
+        neighbor_idx = np.tile(np.arange(n_items, dtype=np.int32)[:, None], (1, k))
+        neighbor_scores = np.full((n_items, k), -np.inf, dtype=np.float32)
+        # A sparse product costs up to 8 bytes per entry before densifying.
+        entry_bytes = 12 if sp.issparse(self.vectors) else 4
+
+        for rows, candidates in blocks:
+            items = self.vectors if candidates is None else self.vectors[candidates]
+            items_t = items.T.tocsr() if sp.issparse(items) else items.T
+            n_cols = items.shape[0]
+            row_cols = rows if candidates is None else np.searchsorted(candidates, rows)
+            width = min(k, n_cols)
+
+            # Bound the (chunk x candidates) score block.
+            chunk_size = max(1, max_block_bytes // (entry_bytes * n_cols))
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start : start + chunk_size]
+                own_cols = row_cols[start : start + chunk_size]
+                block = _to_dense(self.vectors[chunk] @ items_t)
+                block[np.arange(len(chunk)), own_cols] = -np.inf
+
+                top = _top_n_per_row(block, width)
+                cols = top if candidates is None else candidates[top]
+                neighbor_idx[chunk, :width] = cols
+                neighbor_scores[chunk, :width] = np.take_along_axis(block, top, axis=1)
+
+        self._neighbor_idx = neighbor_idx
+        self._neighbor_scores = neighbor_scores
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+
+    def _artifact_fingerprint(self) -> str:
+        # How the fit is parallelized does not change the fitted model.
+        vectorizer_params = {
+            name: value
+            for name, value in self.vectorizer.get_params().items()
+            if name not in {"n_jobs", "min_chunk_size"}
+        }
+        params = json.dumps(
+            {
+                "vectorizer": vectorizer_params,
+                "representation": self.representation,
+                "n_components": self.n_components,
+                "user_movies": self.storage.load_movies(),
+            },
+            sort_keys=True,
+            default=str,
         )
+        return content_hash([self.csv_path], extra=params)
+
+    @writes_snapshot
+    def save(self, artifact_dir: str) -> str:
+        if self.vectors is None:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        if self._pending_changes:
+            # The artifact must line up row for row with _load_movies().
+            self.compact()
+
+        return save_artifact(
+            artifact_dir,
+            self._artifact_fingerprint(),
+            vocabulary={t: int(i) for t, i in self.vectorizer.vocabulary_.items()},
+            idf=self.vectorizer.idf_,
+            vectors=self.vectors,
+            projection=self._projection,
+            neighbor_k=self.neighbor_k if self._neighbor_idx is not None else 0,
+            neighbor_idx=self._neighbor_idx,
+            neighbor_scores=self._neighbor_scores,
+        )
+
+    @writes_snapshot
+    def load(self, artifact_dir: str) -> bool:
+        artifact = load_artifact(artifact_dir, self._artifact_fingerprint())
+        if artifact is None or artifact["vectors"].shape[0] != len(self.df):
+            return False
 
-        self.vectors = self.vectorizer.fit_transform(
-            self.df["combined_features"]
-        ).toarray()
+        # The lookup index follows self.df through every change except
+        # tombstones, which take rows out of it and which loading clears.
+        stale_lookup = bool(self._removed.any())
+
+        self.vectorizer = clone(self.vectorizer)
+        self._vectorizer_version = next(_vectorizer_generations)
+        self.vectorizer.vocabulary_ = artifact["vocabulary"]
+        self.vectorizer.idf_ = artifact["idf"]
+        self.vectors = artifact["vectors"]
+        self._projection = artifact["projection"]
+        self._removed = np.zeros(len(self.df), dtype=bool)
+        self._pending_changes = 0
+        self._model_version += 1
+        self.search = self.search.clone()
+        self.search.build(self.vectors)
+
+        if stale_lookup:
+            self._build_lookup_index()
+
+        self.neighbor_k = artifact["neighbor_k"]
+        self._neighbor_idx = artifact["neighbor_idx"]
+        self._neighbor_scores = artifact["neighbor_scores"]
+        return True
+
+    @writes_snapshot
+    def fit_or_load(self, artifact_dir: str, neighbors: Optional[int] = None) -> bool:
+        # Returns True when a matching artifact was loaded, False when the
+        # model had to be fitted (the fresh artifact is saved for next time).
+        if self.load(artifact_dir) and (
+            neighbors is None or int(neighbors) == self.neighbor_k
+        ):
+            return True
+
+        self.fit(neighbors=neighbors)
+        self.save(artifact_dir)
+        return False
 
     # ----------------------------
     # Recommendation Logic
     # ----------------------------
 
+    @reads_snapshot
+    @timed("recommend_by_movie", event="queries")
     def recommend_by_movie(
-        self, movie_title: str, top_n: int = 5, profile_weight: float = 0.0
+        self,
+        movie_title: str,
+        top_n: int = 5,
+        profile_weight: float = 0.0,
+        user_id: str = DEFAULT_USER,
+        filters: Optional[MovieFilter] = None,
     ) -> List[Dict[str, Any]]:
         if self.vectors is None:
             raise RuntimeError("Model not fitted. Call fit() first.")
 
-        if movie_title not in self.df["title"].values:
-            return []
-
-        movie_idx = self.df[self.df["title"] == movie_title].index[0]
-        sim_scores = cosine_similarity([self.vectors[movie_idx]], self.vectors)[0]
+        filters = _active(filters)
+        return self._cached_query(
+            ("movie", movie_title, top_n, profile_weight, _filter_key(filters)),
+            user_id if profile_weight > 0 else None,
+            lambda: self._recommend_by_movie(
+                movie_title, top_n, profile_weight, user_id, self._filter_mask(filters)
+            ),
+        )
 
-        if profile_weight > 0:
-            user_vec = self._get_adjusted_user_vector()
-            if user_vec is not None:
-                profile_scores = cosine_similarity([user_vec], self.vectors)[0]
-                final_scores = (
-                    1 - profile_weight
-                ) * sim_scores + profile_weight * profile_scores
-            else:
-                final_scores = sim_scores
-        else:
-            final_scores = sim_scores
+    def _recommend_by_movie(
+        self,
+        movie_title: str,
+        top_n: int,
+        profile_weight: float,
+        user_id: str,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        movie_idx = self._resolve_title(movie_title)
+        if movie_idx is None:
+            return []
 
-        return self._get_top_recommendations(
-            final_scores, exclude_idx=movie_idx, top_n=top_n
+        if self._neighbor_idx is not None:
+            results = self._recommend_from_neighbors(
+                movie_idx,
+                self._rows_for_title(movie_title),
+                top_n,
+                profile_weight,
+                user_id,
+                mask,
+            )
+            if results is not None:
+                return results
+
+        # Every entry sharing the queried title is excluded, not only the
+        # one used as the query.
+        return self._recommend(
+            self._row_vector(movie_idx),
+            top_n,
+            profile_weight=profile_weight,
+            exclude_idx=self._rows_for_title(movie_title),
+            user_id=user_id,
+            mask=mask,
         )
 
+    @reads_snapshot
+    @timed("recommend_by_keywords", event="queries")
     def recommend_by_keywords(
-        self, keywords: str, top_n: int = 5, profile_weight: float = 0.0
+        self,
+        keywords: str,
+        top_n: int = 5,
+        profile_weight: float = 0.0,
+        user_id: str = DEFAULT_USER,
+        strategy: str = "sum",
+        weights: Optional[List[float]] = None,
+        filters: Optional[MovieFilter] = None,
     ) -> List[Dict[str, Any]]:
+        # Each comma-separated keyword is a term of the query, combined with
+        # the chosen strategy (see KEYWORD_STRATEGIES). weights, one per
+        # keyword, apply to "weighted" only.
         if self.vectors is None:
             raise RuntimeError("Model not fitted. Call fit() first.")
 
-        split_keywords = [kw.strip() for kw in keywords.split(",") if kw.strip()]
-        if not split_keywords:
+        terms = _split_keywords(keywords)
+        if not terms:
             return []
+        term_weights = self._term_weights(len(terms), strategy, weights)
+
+        filters = _active(filters)
+        return self._cached_query(
+            (
+                "keywords",
+                tuple(terms),
+                strategy,
+                term_weights,
+                top_n,
+                profile_weight,
+                _filter_key(filters),
+            ),
+            user_id if profile_weight > 0 else None,
+            lambda: self._recommend(
+                self._keyword_queries([terms], [term_weights])[0],
+                top_n,
+                profile_weight=profile_weight,
+                user_id=user_id,
+                mask=self._filter_mask(filters),
+            ),
+        )
 
-        query_vec = self.vectorizer.transform(split_keywords).toarray()
-        query_scores = cosine_similarity(query_vec, self.vectors)[0]
-
-        if profile_weight > 0:
-            user_vec = self._get_adjusted_user_vector()
-            if user_vec is not None:
-                profile_scores = cosine_similarity([user_vec], self.vectors)[0]
-                final_scores = (
-                    1 - profile_weight
-                ) * query_scores + profile_weight * profile_scores
-            else:
-                final_scores = query_scores
-        else:
-            final_scores = query_scores
-
-        return self._get_top_recommendations(final_scores, top_n=top_n)
-
-    def recommend_personal(self, top_n: int = 5) -> List[Dict[str, Any]]:
+    @reads_snapshot
+    @timed("recommend_personal", event="queries")
+    def recommend_personal(
+        self,
+        top_n: int = 5,
+        user_id: str = DEFAULT_USER,
+        filters: Optional[MovieFilter] = None,
+    ) -> List[Dict[str, Any]]:
         if self.vectors is None:
             raise RuntimeError("Model not fitted. Call fit() first.")
 
-        user_vec = self._get_adjusted_user_vector()
+        filters = _active(filters)
+        return self._cached_query(
+            ("personal", top_n, _filter_key(filters)),
+            user_id,
+            lambda: self._recommend_personal(
+                top_n, user_id, self._filter_mask(filters)
+            ),
+        )
+
+    def _recommend_personal(
+        self, top_n: int, user_id: str, mask: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        user_vec = self._get_adjusted_user_vector(user_id=user_id)
         if user_vec is None:
             return []
 
-        scores = cosine_similarity([user_vec], self.vectors)[0]
-        watched_titles = set(self.ratings.keys())
+        watched_titles = set(self.get_ratings(user_id).keys())
+        return self._recommend(
+            user_vec, top_n, exclude_titles=watched_titles, mask=mask
+        )
+
+    def _filter_mask(self, filters: Optional[MovieFilter]) -> Optional[np.ndarray]:
+        # Rows allowed by filters (tombstones are excluded separately), or
+        # None when nothing is filtered.
+        if filters is None:
+            return None
+        with self.telemetry.stage("filter"):
+            return self._filter_index.mask(filters)
+
+    @reads_snapshot
+    def get_filter_bounds(self) -> Dict[str, Any]:
+        # Value ranges of the filterable columns and the known genres, for
+        # building filter widgets.
+        return {
+            **self._filter_index.bounds(),
+            "genres": self._catalog_index.genres,
+        }
+
+    def _cached_query(
+        self,
+        key: tuple,
+        user_id: Optional[str],
+        compute: Callable[[], List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        # Serves repeat queries from the result cache. Queries that depend on
+        # a user's ratings (user_id given) are also keyed by that profile's
+        # generation and version, so a rating change is a cache miss.
+        if not self._results.enabled:
+            return compute()
+
+        key += self._profile_key(user_id)
+        version = self._model_version
+        results = self._results.get(key, version)
+        if results is not None:
+            self.telemetry.count("result_cache_hits")
+        else:
+            self.telemetry.count("result_cache_misses")
+            results = compute()
+            self._results.put(key, version, results)
+
+        # Callers get their own dicts, so they cannot change cached entries.
+        return [dict(result) for result in results]
 
-        return self._get_top_recommendations(
-            scores, exclude_titles=watched_titles, top_n=top_n
+    def _cached_batch(
+        self,
+        keys: List[tuple],
+        user_id: Optional[str],
+        compute: Callable[[List[int]], List[List[Dict[str, Any]]]],
+    ) -> List[List[Dict[str, Any]]]:
+        # _cached_query for a batch, sharing its entries: compute(positions)
+        # scores only the queries at those positions of keys, the misses.
+        if not self._results.enabled:
+            return compute(list(range(len(keys))))
+
+        suffix = self._profile_key(user_id)
+        keys = [key + suffix for key in keys]
+        version = self._model_version
+        results = [self._results.get(key, version) for key in keys]
+        missing = [i for i, recs in enumerate(results) if recs is None]
+        self.telemetry.count("result_cache_hits", len(keys) - len(missing))
+        self.telemetry.count("result_cache_misses", len(missing))
+
+        if missing:
+            for i, recs in zip(missing, compute(missing)):
+                self._results.put(keys[i], version, recs)
+                results[i] = recs
+        return [[dict(result) for result in recs] for recs in results]
+
+    def _profile_key(self, user_id: Optional[str]) -> tuple:
+        if user_id is None:
+            return ()
+        profile = self._profiles.get(user_id)
+        return (
+            user_id,
+            profile.generation,
+            profile.version,
+            self.profile_alpha,
+            self.profile_beta,
+        )
+
+    def _recommend(
+        self,
+        query_vec: Union[sp.csr_matrix, np.ndarray],
+        top_n: int,
+        profile_weight: float = 0.0,
+        exclude_idx: Optional[Union[int, np.ndarray]] = None,
+        exclude_titles: Optional[set] = None,
+        exact: bool = False,
+        user_id: str = DEFAULT_USER,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        # mask: rows allowed by the query's filters (None allows every row)
+        original_mask = mask
+        user_vec = None
+        if profile_weight > 0:
+            user_vec = self._get_adjusted_user_vector(user_id=user_id)
+
+        n_allowed = np.count_nonzero(mask) if mask is not None else len(self._removed)
+        if n_allowed <= _FILTERED_EXACT_ROWS:
+            # So few rows pass the filter that scoring them all is cheaper
+            # than probing an index whose candidates would mostly be rejected.
+            exact = True
+
+        rows = None
+        if not exact:
+            with self.telemetry.stage("candidates"):
+                rows = self._candidates(query_vec)
+                if rows is not None and user_vec is not None:
+                    profile_rows = self.search.candidates(user_vec)
+                    if profile_rows is not None:
+                        rows = np.union1d(rows, profile_rows)
+        probed = rows is not None
+
+        if mask is not None:
+            if rows is not None:
+                rows = rows[mask[rows]]
+                mask = None
+            elif n_allowed <= _SUBSET_SCORING * len(mask):
+                # Selective filter: score only the rows that pass it.
+                rows = np.flatnonzero(mask)
+                mask = None
+
+        scores = self._cosine_scores(query_vec, rows=rows)
+        if user_vec is not None:
+            profile_scores = self._cosine_scores(user_vec, rows=rows)
+            scores = (1 - profile_weight) * scores + profile_weight * profile_scores
+
+        results = self._get_top_recommendations(
+            scores,
+            top_n=top_n,
+            exclude_idx=exclude_idx,
+            exclude_titles=exclude_titles,
+            rows=rows,
+            mask=mask,
         )
+        if probed and len(results) < top_n:
+            # The probed candidates ran out after exclusions, use brute force.
+            self.telemetry.count("candidate_fallbacks")
+            return self._recommend(
+                query_vec,
+                top_n,
+                profile_weight=profile_weight,
+                exclude_idx=exclude_idx,
+                exclude_titles=exclude_titles,
+                exact=True,
+                user_id=user_id,
+                mask=original_mask,
+            )
+        return results
+
+    def _candidates(
+        self, query_vec: Union[sp.csr_matrix, np.ndarray]
+    ) -> Optional[np.ndarray]:
+        # Union of the candidates of every query row (several for the "max"
+        # keyword strategy); None means score every row.
+        if query_vec.shape[0] == 1:
+            return self.search.candidates(query_vec)
+
+        gathered = []
+        for i in range(query_vec.shape[0]):
+            rows = self.search.candidates(query_vec[i : i + 1])
+            if rows is None:
+                return None
+            gathered.append(rows)
+        return np.unique(np.concatenate(gathered))
+
+    def _recommend_from_neighbors(
+        self,
+        movie_idx: int,
+        exclude_rows: np.ndarray,
+        top_n: int,
+        profile_weight: float,
+        user_id: str = DEFAULT_USER,
+        mask: Optional[np.ndarray] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        n_indexed = len(self._neighbor_idx)
+        if movie_idx >= n_indexed:
+            # Added after the last fit, so it has no precomputed neighbors.
+            self.telemetry.count("neighbor_table_misses")
+            return None
+
+        candidates = self._neighbor_idx[movie_idx]
+        scores = self._neighbor_scores[movie_idx]
+
+        n_items = self.vectors.shape[0]
+        if n_items > n_indexed:
+            # Movies added since the last fit are scored exactly and merged in.
+            added = np.arange(n_indexed, n_items)
+            added_scores = self._cosine_scores(self._row_vector(movie_idx), rows=added)
+            candidates = np.concatenate([candidates, added])
+            scores = np.concatenate([scores, added_scores])
+
+        # Padding in the table (rows with fewer candidates than k) is at -inf.
+        keep = np.isfinite(scores) & ~np.isin(candidates, exclude_rows)
+        keep &= ~self._removed[candidates]
+        if mask is not None:
+            keep &= mask[candidates]
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) < top_n:
+            # Not enough precomputed neighbors, fall back to full scoring.
+            self.telemetry.count("neighbor_table_misses")
+            return None
+
+        if profile_weight > 0:
+            user_vec = self._get_adjusted_user_vector(user_id=user_id)
+            if user_vec is not None:
+                profile_scores = self._cosine_scores(user_vec, rows=candidates)
+                scores = (1 - profile_weight) * scores + profile_weight * profile_scores
+
+        self.telemetry.count("neighbor_table_hits")
+        with self.telemetry.stage("rank"):
+            top = _top_n_indices(scores, top_n)
+        return self._format_results(candidates[top], scores[top])
+
+    @timed("score")
+    def _cosine_scores(
+        self,
+        query_vec: Union[sp.csr_matrix, np.ndarray],
+        rows: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        # Rows of self.vectors are unit length, so a dot product against the
+        # normalized query is the cosine similarity. The query is a sparse row
+        # (movie, keywords) or a dense row (user profile, LSA). Several query
+        # rows are scored in one product and each item keeps its best score.
+        query_vec = normalize(query_vec, copy=True)
+        matrix = self.vectors if rows is None else self.vectors[rows]
+        scores = _to_dense(matrix @ query_vec.T)
+        if scores.shape[1] > 1:
+            return scores.max(axis=1)
+        return scores.ravel()
 
     def _get_top_recommendations(
         self,
         scores: np.ndarray,
         top_n: int = 5,
-        exclude_idx: Optional[int] = None,
+        exclude_idx: Optional[Union[int, np.ndarray]] = None,
         exclude_titles: Optional[set] = None,
+        rows: Optional[np.ndarray] = None,
+        mask: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
-        scored_items = list(enumerate(scores))
-        scored_items.sort(key=lambda x: x[1], reverse=True)
+        # scores covers every row, or only the candidate rows when given;
+        # mask (full scoring only) marks the rows the filters allow.
+        drop = []
+        if exclude_idx is not None:
+            drop.append(np.atleast_1d(exclude_idx))
+        if exclude_titles:
+            drop.append(self._rows_for_titles(exclude_titles))
+
+        if rows is None:
+            excluded = (
+                self._removed | ~mask if mask is not None else self._removed.copy()
+            )
+            for d in drop:
+                excluded[d] = True
+        else:
+            excluded = self._removed[rows]
+            if drop:
+                excluded |= np.isin(rows, np.concatenate(drop))
 
-        results = []
-        for idx, score in scored_items:
-            if exclude_idx is not None and idx == exclude_idx:
-                continue
-            if (
-                exclude_titles is not None
-                and self.df.iloc[idx]["title"] in exclude_titles
-            ):
-                continue
-
-            results.append(self._format_result(idx, score))
-            if len(results) >= top_n:
-                break
+        with self.telemetry.stage("rank"):
+            top_idx = _top_n_indices(scores, top_n, excluded)
+        item_idx = top_idx if rows is None else rows[top_idx]
+        return self._format_results(item_idx, scores[top_idx])
 
-        return results
+    # ----------------------------
+    # Keyword Queries
+    # ----------------------------
+
+    @staticmethod
+    def _term_weights(
+        n_terms: int, strategy: str, weights: Optional[List[float]] = None
+    ) -> Optional[tuple]:
+        # Weights used to fold a query's terms into one vector, or None when
+        # the terms are scored separately ("max").
+        if strategy not in KEYWORD_STRATEGIES:
+            raise ValueError(
+                f"Strategy must be one of {', '.join(KEYWORD_STRATEGIES)}."
+            )
+        if strategy == "max":
+            return None
+        if strategy == "sum":
+            return (1.0,) * n_terms
+
+        if weights is None:
+            # Earlier keywords count more: 1, 1/2, 1/3, ...
+            return tuple(1.0 / (i + 1) for i in range(n_terms))
+        if len(weights) != n_terms:
+            raise ValueError("Provide one weight per keyword.")
+        return tuple(float(w) for w in weights)
+
+    def _keyword_queries(
+        self, term_lists: List[List[str]], term_weights: List[Optional[tuple]]
+    ) -> tuple:
+        # Query matrix for several keyword queries at once, and the
+        # term_offsets to pass to _recommend_batch (None when every query was
+        # folded into a single row). All the terms are looked up together, so
+        # keywords missing from the term cache cost one transform call.
+        vectors = self._term_vectors_for(
+            list(dict.fromkeys(t for terms in term_lists for t in terms))
+        )
+
+        if all(weights is None for weights in term_weights):
+            groups = [[(vectors[t], 1.0)] for terms in term_lists for t in terms]
+            offsets = np.cumsum([0] + [len(terms) for terms in term_lists])
+            return _stack_weighted(groups), offsets
+
+        if any(weights is None for weights in term_weights):
+            raise ValueError("Queries of one batch must share a strategy.")
+        groups = [
+            [(vectors[t], w) for t, w in zip(terms, weights)]
+            for terms, weights in zip(term_lists, term_weights)
+        ]
+        return _stack_weighted(groups), None
+
+    def _term_vectors_for(
+        self, terms: List[str]
+    ) -> Dict[str, Union[sp.csr_matrix, np.ndarray]]:
+        # Row vector of each term, from the term cache when possible.
+        version = self._vectorizer_version
+        vectors = {}
+        missing = []
+        for term in terms:
+            vec = self._term_vectors.get(term, version)
+            if vec is None:
+                missing.append(term)
+            else:
+                vectors[term] = vec
+
+        self.telemetry.count("term_cache_hits", len(vectors))
+        if missing:
+            self.telemetry.count("term_cache_misses", len(missing))
+            transformed = self._transform(missing)
+            for i, term in enumerate(missing):
+                vectors[term] = transformed[i : i + 1]
+                self._term_vectors.put(term, version, vectors[term])
+        return vectors
 
     # ----------------------------
-    # User Profile
+    # Batch Recommendation
     # ----------------------------
 
-    def _get_adjusted_user_vector(self, alpha: float = 1.0, beta: float = 0.5):
+    @reads_snapshot
+    @timed("recommend_by_movie_batch", event="batch_calls")
+    def recommend_by_movie_batch(
+        self,
+        movie_titles: List[str],
+        top_n: int = 5,
+        profile_weight: float = 0.0,
+        chunk_size: Optional[int] = None,
+        user_id: str = DEFAULT_USER,
+        filters: Optional[MovieFilter] = None,
+    ) -> List[List[Dict[str, Any]]]:
         if self.vectors is None:
-            return None
+            raise RuntimeError("Model not fitted. Call fit() first.")
+
+        query_rows = [self._resolve_title(title) for title in movie_titles]
+        found = [i for i, row in enumerate(query_rows) if row is not None]
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in movie_titles]
+        if not found:
+            return results
+
+        # Same cache entries and neighbor table as recommend_by_movie.
+        filters = _active(filters)
+        batch = self._cached_batch(
+            [
+                ("movie", movie_titles[i], top_n, profile_weight, _filter_key(filters))
+                for i in found
+            ],
+            user_id if profile_weight > 0 else None,
+            lambda missing: self._recommend_movies(
+                [movie_titles[found[j]] for j in missing],
+                [query_rows[found[j]] for j in missing],
+                top_n,
+                profile_weight,
+                chunk_size,
+                user_id,
+                self._filter_mask(filters),
+            ),
+        )
+        for i, recs in zip(found, batch):
+            results[i] = recs
+        return results
+
+    def _recommend_movies(
+        self,
+        titles: List[str],
+        query_rows: List[int],
+        top_n: int,
+        profile_weight: float,
+        chunk_size: Optional[int],
+        user_id: str,
+        mask: Optional[np.ndarray],
+    ) -> List[List[Dict[str, Any]]]:
+        # Queries the single-query path answers without scoring the catalog
+        # (neighbor-table hits, or every query when the search backend probes
+        # candidates) are served one by one; the rest share one batch.
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(titles)
+        probing = not isinstance(self.search, ExactSearch)
+        for i, (title, row) in enumerate(zip(titles, query_rows)):
+            if probing:
+                results[i] = self._recommend_by_movie(
+                    title, top_n, profile_weight, user_id, mask
+                )
+            elif self._neighbor_idx is not None:
+                results[i] = self._recommend_from_neighbors(
+                    row,
+                    self._rows_for_title(title),
+                    top_n,
+                    profile_weight,
+                    user_id,
+                    mask,
+                )
 
-        liked_titles = [t for t, r in self.ratings.items() if r == "like"]
-        disliked_titles = [t for t, r in self.ratings.items() if r == "dislike"]
+        rest = [i for i, recs in enumerate(results) if recs is None]
+        if rest:
+            batch = self._recommend_batch(
+                self.vectors[[query_rows[i] for i in rest]],
+                top_n,
+                profile_weight,
+                [self._rows_for_title(titles[i]) for i in rest],
+                chunk_size,
+                user_id=user_id,
+                mask=mask,
+            )
+            for i, recs in zip(rest, batch):
+                results[i] = recs
+        return results
 
-        like_vec = None
-        dislike_vec = None
+    @reads_snapshot
+    @timed("recommend_by_keywords_batch", event="batch_calls")
+    def recommend_by_keywords_batch(
+        self,
+        keyword_queries: List[str],
+        top_n: int = 5,
+        profile_weight: float = 0.0,
+        chunk_size: Optional[int] = None,
+        user_id: str = DEFAULT_USER,
+        strategy: str = "sum",
+        filters: Optional[MovieFilter] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        # Same query semantics as recommend_by_keywords, with the default
+        # weights of the strategy.
+        if self.vectors is None:
+            raise RuntimeError("Model not fitted. Call fit() first.")
 
-        if liked_titles:
-            like_indices = self.df[self.df["title"].isin(liked_titles)].index
-            if not like_indices.empty:
-                like_vec = np.mean(self.vectors[like_indices], axis=0)
+        term_lists = [_split_keywords(query) for query in keyword_queries]
+        found = [i for i, terms in enumerate(term_lists) if terms]
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in keyword_queries]
+        if not found:
+            return results
+
+        # Same cache entries as recommend_by_keywords.
+        filters = _active(filters)
+        term_lists = [term_lists[i] for i in found]
+        term_weights = [
+            self._term_weights(len(terms), strategy) for terms in term_lists
+        ]
+        batch = self._cached_batch(
+            [
+                (
+                    "keywords",
+                    tuple(terms),
+                    strategy,
+                    weights,
+                    top_n,
+                    profile_weight,
+                    _filter_key(filters),
+                )
+                for terms, weights in zip(term_lists, term_weights)
+            ],
+            user_id if profile_weight > 0 else None,
+            lambda missing: self._recommend_keyword_lists(
+                [term_lists[j] for j in missing],
+                [term_weights[j] for j in missing],
+                top_n,
+                profile_weight,
+                chunk_size,
+                user_id,
+                self._filter_mask(filters),
+            ),
+        )
+        for i, recs in zip(found, batch):
+            results[i] = recs
+        return results
 
-        if like_vec is None:
-            return None
+    def _recommend_keyword_lists(
+        self,
+        term_lists: List[List[str]],
+        term_weights: List[Optional[tuple]],
+        top_n: int,
+        profile_weight: float,
+        chunk_size: Optional[int],
+        user_id: str,
+        mask: Optional[np.ndarray],
+    ) -> List[List[Dict[str, Any]]]:
+        if not isinstance(self.search, ExactSearch):
+            # A probing search backend scores a few candidates per query,
+            # cheaper than a batch product against the whole catalog.
+            return [
+                self._recommend(
+                    self._keyword_queries([terms], [weights])[0],
+                    top_n,
+                    profile_weight=profile_weight,
+                    user_id=user_id,
+                    mask=mask,
+                )
+                for terms, weights in zip(term_lists, term_weights)
+            ]
+
+        queries, term_offsets = self._keyword_queries(term_lists, term_weights)
+        return self._recommend_batch(
+            queries,
+            top_n,
+            profile_weight,
+            None,
+            chunk_size,
+            user_id=user_id,
+            term_offsets=term_offsets,
+            mask=mask,
+        )
 
-        if disliked_titles:
-            dislike_indices = self.df[self.df["title"].isin(disliked_titles)].index
-            if not dislike_indices.empty:
-                dislike_vec = np.mean(self.vectors[dislike_indices], axis=0)
+    def _recommend_batch(
+        self,
+        queries: Union[sp.csr_matrix, np.ndarray],
+        top_n: int,
+        profile_weight: float = 0.0,
+        exclude_rows: Optional[List[np.ndarray]] = None,
+        chunk_size: Optional[int] = None,
+        max_block_bytes: int = 64 << 20,
+        user_id: str = DEFAULT_USER,
+        term_offsets: Optional[np.ndarray] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        # With term_offsets, query q is rows term_offsets[q]:term_offsets[q+1]
+        # of queries and each item keeps its best score over those rows (the
+        # "max" keyword strategy); otherwise every row is one query.
+        #
+        # With a filter mask, the rows it allows are gathered once and only
+        # they are scored; block columns are then positions in item_rows.
+        item_rows = np.flatnonzero(mask) if mask is not None else None
+        vectors = self.vectors if item_rows is None else self.vectors[item_rows]
+        removed = self._removed if item_rows is None else self._removed[item_rows]
+        if item_rows is not None and exclude_rows is not None:
+            exclude_rows = [_positions_in(item_rows, rows) for rows in exclude_rows]
+
+        n_items = vectors.shape[0]
+        if chunk_size is None:
+            # Bound the dense (chunk x catalog) score block.
+            chunk_size = max(1, max_block_bytes // (4 * max(n_items, 1)))
+
+        profile_scores = None
+        if profile_weight > 0:
+            user_vec = self._get_adjusted_user_vector(user_id=user_id)
+            if user_vec is not None:
+                profile_scores = self._cosine_scores(user_vec, rows=item_rows)
+                profile_scores = profile_scores.astype(np.float32)
+
+        queries = normalize(queries, copy=True)
+        vectors_t = vectors.T.tocsr() if sp.issparse(vectors) else None
+        n_queries = queries.shape[0] if term_offsets is None else len(term_offsets) - 1
+        results = []
+
+        for start in range(0, n_queries, chunk_size):
+            stop = min(start + chunk_size, n_queries)
+            if term_offsets is None:
+                chunk = queries[start:stop]
+            else:
+                chunk = queries[term_offsets[start] : term_offsets[stop]]
+            # One matrix-matrix product scores the whole chunk.
+            with self.telemetry.stage("score_block"):
+                if vectors_t is not None:
+                    block = _to_dense(chunk @ vectors_t)
+                else:
+                    block = _to_dense(chunk @ vectors.T)
+                block = block.astype(np.float32, copy=False)
+                if term_offsets is not None:
+                    block = np.maximum.reduceat(
+                        block, term_offsets[start:stop] - term_offsets[start], axis=0
+                    )
+
+            if profile_scores is not None:
+                block *= 1 - profile_weight
+                block += profile_weight * profile_scores
+
+            block[:, removed] = -np.inf
+            if exclude_rows is not None:
+                for i, rows in enumerate(exclude_rows[start : start + chunk_size]):
+                    block[i, rows] = -np.inf
+
+            with self.telemetry.stage("rank"):
+                top = _top_n_per_row(block, top_n)
+                top_scores = np.take_along_axis(block, top, axis=1)
+
+            # Format the whole chunk with one lookup per column.
+            valid = np.isfinite(top_scores)
+            if item_rows is not None:
+                top = item_rows[top]
+            formatted = iter(self._format_results(top[valid], top_scores[valid]))
+            for row_valid in valid:
+                results.append([next(formatted) for _ in range(int(row_valid.sum()))])
 
-        user_vec = alpha * like_vec
-        if dislike_vec is not None:
-            user_vec = user_vec - beta * dislike_vec
+        return results
+
+    # ----------------------------
+    # User Profile
+    # ----------------------------
+
+    @timed("profile")
+    def _get_adjusted_user_vector(
+        self,
+        alpha: Optional[float] = None,
+        beta: Optional[float] = None,
+        user_id: str = DEFAULT_USER,
+    ) -> Optional[Union[sp.csr_matrix, np.ndarray]]:
+        if self.vectors is None:
+            return None
 
-        return user_vec
+        alpha = self.profile_alpha if alpha is None else alpha
+        beta = self.profile_beta if beta is None else beta
+
+        profile = self._profiles.get(user_id)
+        with profile.lock:
+            if profile.sums_version != self._model_version:
+                self._rebuild_profile_sums(profile)
+            if profile.like_count == 0:
+                return None
+
+            # alpha * mean(liked) - beta * mean(disliked), a single row as
+            # sparse as the sums.
+            user_vec = profile.like_sum * (alpha / profile.like_count)
+            if profile.dislike_count > 0:
+                user_vec = user_vec - profile.dislike_sum * (
+                    beta / profile.dislike_count
+                )
+            return user_vec
+
+    def _rebuild_profile_sums(self, profile: UserProfile) -> None:
+        liked_titles = [t for t, r in profile.ratings.items() if r == "like"]
+        disliked_titles = [t for t, r in profile.ratings.items() if r == "dislike"]
+
+        like_rows = self._rows_for_titles(liked_titles)
+        dislike_rows = self._rows_for_titles(disliked_titles)
+
+        profile.like_sum = self._sum_rows(like_rows)
+        profile.like_count = len(like_rows)
+        profile.dislike_sum = self._sum_rows(dislike_rows)
+        profile.dislike_count = len(dislike_rows)
+        profile.sums_version = self._model_version
+
+    def _sum_rows(self, rows: np.ndarray) -> Union[sp.csr_matrix, np.ndarray]:
+        # float64 so the running sums do not drift as ratings come and go.
+        n_features = self.vectors.shape[1]
+        if not sp.issparse(self.vectors):
+            if len(rows) == 0:
+                return np.zeros((1, n_features), dtype=np.float64)
+            return self.vectors[rows].sum(axis=0, dtype=np.float64, keepdims=True)
+
+        # A sparse product keeps the sum sparse; summing along an axis would
+        # return a dense row of the whole vocabulary.
+        if len(rows) == 0:
+            return sp.csr_matrix((1, n_features), dtype=np.float64)
+        ones = sp.csr_matrix(np.ones((1, len(rows)), dtype=np.float64))
+        return (ones @ self.vectors[rows]).tocsr()
+
+    def _update_profile_sums(
+        self, profile: UserProfile, title: str, rating: Optional[str], sign: int
+    ) -> None:
+        # Adds (sign=1) or removes (sign=-1) one rating from the running sums
+        # in O(vocabulary) instead of rebuilding the profile from scratch.
+        if rating not in {"like", "dislike"}:
+            return
+        if self.vectors is None:
+            return
+        if profile.sums_version != self._model_version:
+            # The sums were built against another model version, possibly a
+            # newer snapshot than the one this call pinned; applying the
+            # rating is not possible, so they are rebuilt on next use.
+            profile.sums_version = -1
+            return
+
+        rows = self._rows_for_title(title)
+        if len(rows) == 0:
+            return
+
+        contribution = sign * self._sum_rows(rows)
+        if rating == "like":
+            profile.like_count += sign * len(rows)
+            profile.like_sum = profile.like_sum + contribution
+            if profile.like_count == 0:
+                # Drop accumulated rounding error and the emptied terms.
+                profile.like_sum = self._sum_rows(rows[:0])
+        else:
+            profile.dislike_count += sign * len(rows)
+            profile.dislike_sum = profile.dislike_sum + contribution
+            if profile.dislike_count == 0:
+                profile.dislike_sum = self._sum_rows(rows[:0])
 
     # ----------------------------
     # Movie Management
     # ----------------------------
 
+    @writes_snapshot
     def add_new_movie(
         self, title: str, genres_list: List[str], keywords: str, overview: str
     ) -> bool:
-        if title in self.df["title"].values:
+        if title in self._title_rows:
             return False
 
         genres_str = ", ".join(genres_list)
-        new_id = (
-            int(self.df["id"].max()) + 1
-            if "id" in self.df.columns and not self.df["id"].empty
-            else 1
-        )
+        new_id = self._next_id
 
         new_movie = {
             "id": new_id,
@@ -244,115 +1496,394 @@ class MovieRecommender:
             "poster_path": None,
         }
 
-        self._save_movie_to_json(new_movie)
-
-        new_row = pd.DataFrame([new_movie])
-        self.df = pd.concat([self.df, new_row], ignore_index=True)
-        self.fit()
+        self.storage.add_movie(new_movie)
+        self._append_movie(new_movie)
 
         return True
 
-    def _save_movie_to_json(self, movie: Dict[str, Any]) -> None:
-        data = []
-        if os.path.exists(self.json_movies):
-            try:
-                with open(self.json_movies, "r") as f:
-                    data = json.load(f)
-            except (json.JSONDecodeError, TypeError):
-                data = []
+    def _append_movie(self, movie: Dict[str, Any]) -> None:
+        row = len(self.df)
+        new_row = pd.DataFrame([movie], index=[row])
+        df_row = new_row
+        if isinstance(self._lazy, RowStore):
+            # Its text goes to the RowStore, not to new df columns.
+            self._lazy = self._lazy.append(new_row)
+            df_row = new_row.drop(columns=list(self._lazy.columns), errors="ignore")
+        if self.compact_catalog:
+            self.df = append_rows(self.df, df_row)
+        else:
+            self.df = pd.concat([self.df, df_row])
 
-        data.append(movie)
-        with open(self.json_movies, "w") as f:
-            json.dump(data, f, indent=4)
+        # Copy-on-write: the published snapshot still references these.
+        self._title_rows = {
+            **self._title_rows,
+            movie["title"]: np.array([row], dtype=np.intp),
+        }
+        self._id_rows = {**self._id_rows, int(movie["id"]): row}
+        self._next_id = max(self._next_id, int(movie["id"]) + 1)
+        self._filter_index = self._filter_index.append(movie)
+        self._catalog_index = self._catalog_index.append(movie, row)
+        self._title_search = self._title_search.append(
+            movie["title"], movie.get("popularity")
+        )
 
-    def save_rating(self, title: str, rating: str) -> None:
+        if self.vectors is None:
+            return
+
+        # Transform with the fitted vocabulary and append a row instead of
+        # refitting; the vocabulary catches up at the next compaction.
+        vec = self._transform(self._combined_features(new_row))
+        if sp.issparse(self.vectors):
+            self.vectors = sp.vstack([self.vectors, vec], format="csr")
+        else:
+            self.vectors = np.vstack([self.vectors, vec])
+        self.search = self.search.clone()
+        self.search.add(vec)
+        self._removed = np.append(self._removed, False)
+        self._model_version += 1
+        self._register_change()
+
+    def _tombstone_rows(self, rows: np.ndarray) -> None:
+        rows = rows[~self._removed[rows]]
+        if len(rows) == 0:
+            return
+
+        # Copy-on-write: the published snapshot still references these.
+        title_rows = dict(self._title_rows)
+        id_rows = dict(self._id_rows)
+        removed = self._removed.copy()
+        gone = []
+
+        for row in rows:
+            title = self.df.at[row, "title"]
+            remaining = title_rows.get(title)
+            if remaining is not None:
+                remaining = remaining[remaining != row]
+                if len(remaining):
+                    title_rows[title] = remaining
+                else:
+                    del title_rows[title]
+                    gone.append(title)
+
+            movie_id = self.df.at[row, "id"] if "id" in self.df.columns else None
+            if pd.notna(movie_id) and id_rows.get(int(movie_id)) == row:
+                del id_rows[int(movie_id)]
+
+        removed[rows] = True
+        self._title_rows = title_rows
+        self._id_rows = id_rows
+        self._removed = removed
+        self._catalog_index = self._catalog_index.remove(rows)
+        self._title_search = self._title_search.remove(gone)
+        self._model_version += 1
+        self._register_change(len(rows))
+
+    def _register_change(self, count: int = 1) -> None:
+        self._pending_changes += count
+        if self._pending_changes >= self.refit_threshold and self._compaction is None:
+            # Called by a writer, under the write lock, like every change of
+            # self._compaction.
+            self._compaction = threading.Thread(
+                target=self._compact_in_background, name="compaction", daemon=True
+            )
+            self._compaction.start()
+
+    def _compact_in_background(self) -> None:
+        # A compaction is a full refit, so it is built on a private copy of
+        # the published snapshot without holding the write lock, and only
+        # published if no writer published anything meanwhile; otherwise it
+        # starts over from the newer snapshot.
+        try:
+            while True:
+                with self._write_lock:
+                    base = self._snapshot
+                    if base.pending_changes < self.refit_threshold:
+                        self._compaction = None
+                        return
+
+                draft = base.copy()
+                with pinned(self, draft, writable=True):
+                    self.compact()
+
+                with self._write_lock:
+                    if self._snapshot is base:
+                        self._snapshot = draft
+        except Exception as e:
+            print(f"Warning: Background compaction failed: {e}")
+            with self._write_lock:
+                self._compaction = None
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        # Blocks until a running background compaction has been published.
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join(timeout)
+
+    @reads_snapshot
+    def save_rating(self, title: str, rating: str, user_id: str = DEFAULT_USER) -> None:
         if rating not in {"like", "dislike"}:
             raise ValueError("Rating must be 'like' or 'dislike'.")
 
-        self.ratings[title] = rating
-        with open(self.json_ratings, "w") as f:
-            json.dump(self.ratings, f, indent=4)
-
-    def remove_rating(self, title: str) -> bool:
-        if title in self.ratings:
-            del self.ratings[title]
-            with open(self.json_ratings, "w") as f:
-                json.dump(self.ratings, f, indent=4)
-            return True
-        return False
+        profile = self._profiles.get(user_id)
+        with profile.lock:
+            previous = profile.ratings.get(title)
+            if previous != rating:
+                self._update_profile_sums(profile, title, previous, -1)
+                self._update_profile_sums(profile, title, rating, 1)
+                profile.version += 1
+
+            profile.ratings[title] = rating
+        self.storage.set_rating(user_id, title, rating)
+
+    @reads_snapshot
+    def remove_rating(self, title: str, user_id: str = DEFAULT_USER) -> bool:
+        profile = self._profiles.get(user_id)
+        with profile.lock:
+            if title not in profile.ratings:
+                return False
+            self._update_profile_sums(profile, title, profile.ratings[title], -1)
+            profile.version += 1
+            del profile.ratings[title]
+        self.storage.delete_rating(user_id, title)
+        return True
 
+    @writes_snapshot
     def remove_user_movie(self, title: str) -> bool:
-        if not os.path.exists(self.json_movies):
-            return False
-
-        try:
-            with open(self.json_movies, "r") as f:
-                user_movies = json.load(f)
-        except (json.JSONDecodeError, TypeError):
-            return False
-
-        if not isinstance(user_movies, list):
-            return False
-
-        before_count = len(user_movies)
-        user_movies = [m for m in user_movies if m.get("title") != title]
-        after_count = len(user_movies)
-
-        if before_count == after_count:
+        if not self.storage.remove_movie(title):
             return False
 
-        with open(self.json_movies, "w") as f:
-            json.dump(user_movies, f, indent=4)
+        if self.vectors is None:
+            self.df = self._load_movies()
+            self._build_lookup_index()
+            return True
 
-        self.df = self._load_movies()
-        self.fit()
+        user_rows = self._rows_for_title(title)
+        self._tombstone_rows(user_rows[user_rows >= self._n_base])
 
         return True
 
-    def clear_all_ratings(self) -> None:
-        self.ratings = {}
-        with open(self.json_ratings, "w") as f:
-            json.dump(self.ratings, f, indent=4)
+    @reads_snapshot
+    def clear_all_ratings(self, user_id: str = DEFAULT_USER) -> None:
+        profile = self._profiles.get(user_id)
+        with profile.lock:
+            profile.ratings.clear()
+            profile.version += 1
+            if profile.sums_version == self._model_version:
+                self._rebuild_profile_sums(profile)
+            else:
+                profile.sums_version = -1
+        self.storage.clear_ratings(user_id)
 
+    @writes_snapshot
     def clear_all_user_movies(self) -> None:
-        if os.path.exists(self.json_movies):
-            os.remove(self.json_movies)
+        self.storage.clear_movies()
 
-        self.df = self._load_movies()
-        self.fit()
+        if self.vectors is None:
+            self.df = self._load_movies()
+            self._build_lookup_index()
+            return
+
+        self._tombstone_rows(np.arange(self._n_base, len(self.df)))
 
     # ----------------------------
     # Utilities
     # ----------------------------
 
     def _format_result(self, idx: int, score: float) -> Dict[str, Any]:
-        row = self.df.iloc[idx]
+        return self._format_results([idx], [score])[0]
 
+    @timed("format")
+    def _format_results(self, indices, scores) -> List[Dict[str, Any]]:
+        # Column-wise takes instead of one df.iloc per result
+        indices = np.asarray(indices, dtype=np.intp)
+        if len(indices) == 0:
+            return []
+
+        fields = {}
+        for column in ("title", "genres", "poster_path", "overview"):
+            if self._lazy is not None and column in self._lazy.columns:
+                fields[column] = self._take_lazy(column, indices)
+            elif column in self.df.columns:
+                values = self.df[column].take(indices)
+                if isinstance(values.dtype, pd.ArrowDtype):
+                    # Arrow strings are missing as pd.NA, which JSON rejects.
+                    values = values.to_numpy(object, na_value=None)
+                fields[column] = values.tolist()
+            else:
+                fields[column] = [None] * len(indices)
+
+        return [
+            {
+                "title": fields["title"][i],
+                "genres": fields["genres"][i],
+                "score": round(float(scores[i]), 2),
+                "poster_path": fields["poster_path"][i],
+                "overview": fields["overview"][i],
+            }
+            for i in range(len(indices))
+        ]
+
+    def _take_lazy(self, column: str, indices: np.ndarray) -> List[Any]:
+        # Fetch only the displayed rows from the lazy column; user-added rows
+        # past the ones it holds live in self.df.
+        values: List[Any] = [None] * len(indices)
+        is_base = indices < len(self._lazy)
+
+        if is_base.any():
+            base_values = self._lazy.take(column, indices[is_base])
+            for i, value in zip(np.flatnonzero(is_base), base_values):
+                values[i] = value
+        if not is_base.all() and column in self.df.columns:
+            user_values = self.df[column].take(indices[~is_base]).tolist()
+            for i, value in zip(np.flatnonzero(~is_base), user_values):
+                values[i] = value
+
+        return values
+
+    @reads_snapshot
+    def representation_report(self) -> Dict[str, Any]:
+        # Memory and per-query scoring cost of the active representation,
+        # next to the raw TF-IDF figures measured during the last fit.
+        if self.vectors is None:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+
+        active = {
+            "shape": list(self.vectors.shape),
+            "dtype": str(self.vectors.dtype),
+            "vector_bytes": _matrix_nbytes(self.vectors),
+            "projection_bytes": (
+                self._projection.nbytes if self._projection is not None else 0
+            ),
+            "query_ms": _time_queries(self.vectors),
+        }
         return {
-            "title": row["title"],
-            "genres": row["genres"],
-            "score": round(float(score), 2),
-            "poster_path": row.get("poster_path"),
-            "overview": row.get("overview"),
+            "representation": self.representation,
+            "active": active,
+            "tfidf": dict(self._tfidf_stats, query_ms=self._tfidf_query_ms()),
         }
 
-    def get_all_titles(self) -> List[str]:
-        return self.df["title"].dropna().tolist()
+    def _tfidf_query_ms(self) -> float:
+        # Measured once per fit. In lsa mode the raw TF-IDF matrix was not
+        # kept, so it is rebuilt from the catalog for the measurement.
+        cached = self._tfidf_timing
+        if cached is not None and cached[0] is self.vectorizer:
+            return cached[1]
 
-    def get_all_genres(self) -> List[str]:
-        all_genres = set()
+        if self.representation == "lsa":
+            matrix = normalize(self.vectorizer.transform(self._catalog_features()))
+        else:
+            matrix = self.vectors
+        query_ms = _time_queries(matrix.tocsr())
+        self._tfidf_timing = (self.vectorizer, query_ms)
+        return query_ms
+
+    @reads_snapshot
+    def memory_report(self) -> Dict[str, Any]:
+        # Bytes held per component of the published model. The catalog frame
+        # is measured deep (Python strings included); the other figures count
+        # array buffers only, not the small objects around them.
+        if self.vectors is None:
+            raise RuntimeError("Model not fitted. Call fit() first.")
 
-        for genres in self.df["genres"].dropna():
-            all_genres.update(g.strip() for g in genres.split(","))
+        columns = self.df.memory_usage(index=False, deep=True)
+        neighbors = [self._neighbor_idx, self._neighbor_scores]
+        components = {
+            "catalog_frame": int(columns.sum()),
+            "catalog_text": self._lazy.nbytes() if self._lazy is not None else 0,
+            "vectors": _matrix_nbytes(self.vectors),
+            "projection": (
+                self._projection.nbytes if self._projection is not None else 0
+            ),
+            "idf": getattr(self.vectorizer, "idf_", np.empty(0)).nbytes,
+            "search_index": self.search.nbytes(),
+            "neighbor_table": sum(a.nbytes for a in neighbors if a is not None),
+            "filter_index": self._filter_index.nbytes(),
+            "catalog_index": self._catalog_index.nbytes(),
+            "title_search": self._title_search.nbytes(),
+            "tombstones": self._removed.nbytes,
+            "profiles": self._profiles.nbytes(),
+        }
+        return {
+            "compact_catalog": self.compact_catalog,
+            "total_bytes": sum(components.values()),
+            "components": components,
+            "catalog_columns": {name: int(n) for name, n in columns.items()},
+        }
 
-        return sorted(all_genres)
+    @reads_snapshot
+    def telemetry_stats(self) -> Dict[str, Any]:
+        # Stage histograms and counters, plus the current model gauges.
+        stats = self.telemetry.snapshot()
+        stats["gauges"] = self._telemetry_gauges()
+        return stats
 
-    def get_user_added_movies(self) -> List[Dict[str, Any]]:
-        if not os.path.exists(self.json_movies):
+    @reads_snapshot
+    def telemetry_metrics(self) -> str:
+        # The same figures in the Prometheus text exposition format.
+        return self.telemetry.prometheus(gauges=self._telemetry_gauges())
+
+    def result_cache_stats(self) -> Dict[str, Any]:
+        return self._results.stats()
+
+    def _telemetry_gauges(self) -> Dict[str, float]:
+        return {
+            "catalog_rows": len(self.df) if self.df is not None else 0,
+            "removed_rows": int(self._removed.sum()),
+            "pending_changes": self._pending_changes,
+            "model_version": self._model_version,
+            "cached_profiles": len(self._profiles),
+            "result_cache_entries": len(self._results),
+        }
+
+    @reads_snapshot
+    def get_active_movies(self) -> pd.DataFrame:
+        # self.df minus tombstoned rows
+        if not self._removed.any():
+            return self.df
+        return self.df[~self._removed]
+
+    # The accessors below read the snapshot's CatalogIndex, so Streamlit
+    # reruns do not rescan the catalog; they return copies callers may modify.
+
+    @reads_snapshot
+    def get_all_titles(self) -> List[str]:
+        return list(self._catalog_index.titles)
+
+    @reads_snapshot
+    def get_all_genres(self) -> List[str]:
+        return list(self._catalog_index.genres)
+
+    @reads_snapshot
+    @timed("title_search")
+    def search_titles(self, query: str, limit: int = 10) -> List[str]:
+        # Active titles matching query (prefix, inner word or misspelled),
+        # most popular first; see TitleSearchIndex.
+        if limit < 1:
             return []
-        try:
-            with open(self.json_movies, "r") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        except (json.JSONDecodeError, TypeError):
+        return self._title_search.search(query, limit)
+
+    @reads_snapshot
+    def get_titles_by_genre(self, genre: str) -> List[str]:
+        rows = self._catalog_index.genre_rows.get(genre)
+        if rows is None:
             return []
+        return self.df["title"].to_numpy()[rows].tolist()
+
+    @reads_snapshot
+    def get_popular_movies(self, n: int = 20) -> pd.DataFrame:
+        # title and popularity of the n most popular active movies, best first
+        rows = self._catalog_index.top_popular(n)
+        if rows is None:
+            return self.get_active_movies().nlargest(n, "popularity")[
+                ["title", "popularity"]
+            ]
+        return pd.DataFrame(
+            {
+                "title": self.df["title"].to_numpy()[rows],
+                "popularity": self._catalog_index.popularity[rows],
+            },
+            index=self.df.index[rows],
+        )
+
+    def get_user_added_movies(self) -> List[Dict[str, Any]]:
+        return self.storage.load_movies()
@@ -0,0 +1,87 @@
+from typing import Any, Dict, Hashable, Optional
+from collections import OrderedDict
+import threading
+import time
+
+
+class ResultCache:
+    # Bounded LRU of values computed against one model version: the results
+    # of recommend_* calls, and the query vectors of keywords. Keys carry
+    # everything else a value depends on (query, top_n, profile_weight and,
+    # for profile-weighted queries, the user's profile generation/version).
+    # The first lookup at a newer model version drops everything cached for
+    # older ones, so invalidation is exact.
+    #
+    # ttl (seconds) optionally bounds how long an entry is served, and
+    # max_entries=0 disables the cache.
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        if max_entries < 0:
+            raise ValueError("max_entries must not be negative.")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._version = -1
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        with self._lock:
+            self._advance(version)
+            entry = self._entries.get(key) if version == self._version else None
+            if entry is not None and self.ttl is not None:
+                if time.monotonic() - entry[1] > self.ttl:
+                    del self._entries[key]
+                    entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, version: int, value: Any) -> None:
+        with self._lock:
+            self._advance(version)
+            if version != self._version:
+                # Computed on a snapshot that has since been replaced.
+                return
+
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _advance(self, version: int) -> None:
+        if version > self._version:
+            self._entries.clear()
+            self._version = version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
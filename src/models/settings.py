@@ -0,0 +1,49 @@
+from typing import Optional
+import dotenv
+from src.data.storage import open_storage
+from src.models.ann import IVFSearch
+from src.models.recommender import MovieRecommender
+
+
+def _setting(name: str, default: str) -> str:
+    return dotenv.get_key(dotenv.find_dotenv(), name) or default
+
+
+def load_model(telemetry: Optional[bool] = None) -> MovieRecommender:
+    # The model configured by .env (see .env.example), fitted or loaded from
+    # the shared artifact. The Streamlit app, the HTTP service and the
+    # precompute script all build it here, so they agree on the settings and
+    # reuse each other's artifact.
+    dataset = _setting("DATASET_NAME", "movies_top10k.csv")
+    artifact_dir = _setting("ARTIFACT_DIR", ".model_cache")
+    # "ivf" trades exactness for query speed on large catalogs
+    search_backend = _setting("SEARCH_BACKEND", "exact")
+    # "lsa" scores dense TruncatedSVD embeddings instead of raw TF-IDF
+    representation = _setting("REPRESENTATION", "tfidf")
+    # "hashed" fits without a vocabulary, tokenizing on all cores
+    features = _setting("FEATURES", "vocabulary")
+    # Smaller in-memory catalog; see the diagnostics panel's memory figures
+    compact = _setting("COMPACT_CATALOG", "0") == "1"
+    # "sqlite" writes each rating/movie as one row instead of rewriting the
+    # JSON files; existing JSON files are imported when the database is new
+    storage_backend = _setting("STORAGE_BACKEND", "sqlite")
+    # Per-stage timings for the diagnostics panel; can also be switched on
+    # from the panel itself
+    if telemetry is None:
+        telemetry = _setting("TELEMETRY", "0") == "1"
+    # Precomputed neighbors per movie for "by movie" queries (the app's top_n
+    # input goes up to 50); 0 scores every query against the whole catalog
+    neighbors = int(_setting("NEIGHBORS", "64"))
+
+    model = MovieRecommender(
+        dataset,
+        search=IVFSearch() if search_backend == "ivf" else None,
+        representation=representation,
+        features=features,
+        storage=open_storage(storage_backend),
+        telemetry=telemetry,
+        compact_catalog=compact,
+    )
+    # Reuse the fitted artifact when the dataset is unchanged.
+    model.fit_or_load(artifact_dir, neighbors=neighbors)
+    return model
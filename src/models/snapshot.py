@@ -0,0 +1,140 @@
+from typing import Any, Callable, Dict, Optional, Union
+from contextlib import contextmanager
+import copy
+import functools
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+class ModelSnapshot:
+    # Everything the recommend_* methods read, as one object. A published
+    # snapshot is never modified: writers copy it, change the copy and publish
+    # the copy with a single attribute assignment, so a reader that grabbed a
+    # snapshot keeps a consistent view (rows, tombstones, lookups, index)
+    # however long it runs.
+
+    def __init__(self):
+        self.df: Optional[pd.DataFrame] = None
+        # Rows past n_base come from the user movies; lazy holds the Arrow
+        # text columns of a Parquet/Feather catalog (None for CSV)
+        self.n_base: int = 0
+        self.lazy = None
+
+        self.vectorizer = None
+        self.vectors: Optional[Union[sp.csr_matrix, np.ndarray]] = None
+        # components_ of the fitted TruncatedSVD (lsa only)
+        self.projection: Optional[np.ndarray] = None
+        self.tfidf_stats: Dict[str, float] = {}
+        self.search = None
+
+        # Optional item-to-item table: row i holds the neighbor_k most similar
+        # movies to movie i, best first (see fit(neighbors=...))
+        self.neighbor_k: int = 0
+        self.neighbor_idx: Optional[np.ndarray] = None
+        self.neighbor_scores: Optional[np.ndarray] = None
+
+        # Tombstones for movies removed since the last fit, and the number of
+        # incremental changes waiting for the next compaction
+        self.removed: np.ndarray = np.zeros(0, dtype=bool)
+        self.pending_changes: int = 0
+
+        # Changes whenever the rows of vectors change; keys the cached user
+        # profiles
+        self.version: int = 0
+        # Changes whenever the vectorizer (and projection) is refitted or
+        # loaded; keys the cached keyword vectors
+        self.vectorizer_version: int = 0
+
+        # title -> row positions (several when the title is duplicated) and
+        # id -> row position, rebuilt whenever df changes
+        self.title_rows: Dict[str, np.ndarray] = {}
+        self.id_rows: Dict[int, int] = {}
+        self.next_id: int = 1
+
+        # Metadata columns and genre bitmap evaluated by MovieFilter queries
+        self.filter_index = None
+        # Active titles, genre -> rows and the popularity leaderboard, for
+        # the UI accessors
+        self.catalog_index = None
+        # Prefix and trigram index of the titles, for search_titles
+        self.title_search = None
+
+    def copy(self) -> "ModelSnapshot":
+        # Shallow: the copy shares every array and dict with this snapshot,
+        # so writers must replace a field rather than modify it in place.
+        return copy.copy(self)
+
+
+class SnapshotField:
+    # Model attribute stored in the snapshot the current thread works on: the
+    # draft of a running writer, the snapshot pinned by a running reader, or
+    # else the published one.
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, model, owner=None) -> Any:
+        if model is None:
+            return self
+        return getattr(current_snapshot(model), self.name)
+
+    def __set__(self, model, value: Any) -> None:
+        if not getattr(model._local, "writable", False):
+            raise RuntimeError(f"{self.name} can only change inside a snapshot writer.")
+        setattr(model._local.snapshot, self.name, value)
+
+
+def current_snapshot(model) -> ModelSnapshot:
+    pinned = getattr(model._local, "snapshot", None)
+    return pinned if pinned is not None else model._snapshot
+
+
+@contextmanager
+def pinned(model, snapshot: ModelSnapshot, writable: bool):
+    previous = (
+        getattr(model._local, "snapshot", None),
+        getattr(model._local, "writable", False),
+    )
+    model._local.snapshot, model._local.writable = snapshot, writable
+    try:
+        yield snapshot
+    finally:
+        model._local.snapshot, model._local.writable = previous
+
+
+@contextmanager
+def writing(model):
+    # Writers are serialized by the model's write lock and work on a copy of
+    # the published snapshot, which is published only if they return normally.
+    if getattr(model._local, "writable", False):
+        yield model._local.snapshot  # nested writer: share the outer draft
+        return
+
+    with model._write_lock:
+        with pinned(model, model._snapshot.copy(), writable=True) as draft:
+            yield draft
+        model._snapshot = draft
+
+
+def reads_snapshot(method: Callable) -> Callable:
+    # Pins the published snapshot for the whole call, without locking, so
+    # everything the method reads comes from one model version even if a
+    # writer publishes a new one meanwhile.
+    @functools.wraps(method)
+    def wrapper(model, *args, **kwargs):
+        if getattr(model._local, "snapshot", None) is not None:
+            return method(model, *args, **kwargs)
+        with pinned(model, model._snapshot, writable=False):
+            return method(model, *args, **kwargs)
+
+    return wrapper
+
+
+def writes_snapshot(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(model, *args, **kwargs):
+        with writing(model):
+            return method(model, *args, **kwargs)
+
+    return wrapper
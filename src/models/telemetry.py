@@ -0,0 +1,173 @@
+from typing import Any, Callable, Dict, List, Optional
+from collections import defaultdict
+from contextlib import nullcontext
+import bisect
+import functools
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds: 10us to ~40s, sqrt(2) apart, so
+# quantiles estimated from the buckets are within ~41% of the true value.
+BUCKET_BOUNDS: List[float] = [1e-5 * 2 ** (i / 2) for i in range(44)]
+
+_DISABLED = nullcontext()
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        # Linear interpolation inside the bucket holding the q-th
+        # observation, like Prometheus' histogram_quantile().
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen, lower = 0, 0.0
+        for bound, n in zip(BUCKET_BOUNDS, self.buckets):
+            if n and seen + n >= rank:
+                return lower + (bound - lower) * (rank - seen) / n
+            seen += n
+            lower = bound
+        return BUCKET_BOUNDS[-1]
+
+
+class _Stage:
+    __slots__ = ("telemetry", "name", "start")
+
+    def __init__(self, telemetry: "Telemetry", name: str):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.telemetry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Telemetry:
+    # Per-stage latency histograms and event counters for the hot paths.
+    # Stages nest (a query's total includes its transform/score/rank/format
+    # stages), so their times overlap rather than add up.
+    #
+    # When disabled, stage() returns a shared no-op context manager and
+    # count() returns immediately; the flag can be flipped at runtime.
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = defaultdict(Histogram)
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._started = time.time()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._histograms[name].observe(seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] += n
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                name: {
+                    "count": h.count,
+                    "total_ms": round(h.sum * 1000, 3),
+                    "mean_ms": round(h.sum * 1000 / h.count, 3) if h.count else 0.0,
+                    "p50_ms": round(h.quantile(0.50) * 1000, 3),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 3),
+                    "p99_ms": round(h.quantile(0.99) * 1000, 3),
+                }
+                for name, h in sorted(self._histograms.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+
+        return {
+            "enabled": self.enabled,
+            "uptime_s": round(time.time() - self._started, 1),
+            "counters": counters,
+            "stages": stages,
+        }
+
+    def prometheus(
+        self,
+        prefix: str = "film_recommender",
+        gauges: Optional[Dict[str, float]] = None,
+    ) -> str:
+        # Prometheus text exposition format (version 0.0.4).
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per recommender stage.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for name, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKET_BOUNDS, h.buckets):
+                    cumulative += n
+                    lines.append(
+                        f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound:.6g}"}} '
+                        f"{cumulative}"
+                    )
+                lines.append(
+                    f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {h.count}'
+                )
+                lines.append(
+                    f'{prefix}_stage_seconds_sum{{stage="{name}"}} {h.sum:.9f}'
+                )
+                lines.append(
+                    f'{prefix}_stage_seconds_count{{stage="{name}"}} {h.count}'
+                )
+
+            lines.append(f"# HELP {prefix}_events_total Recommender event counters.")
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in sorted(self._counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def timed(stage: str, event: Optional[str] = None) -> Callable:
+    # Records every call of a model method as `stage`, and counts it under
+    # `event` when given.
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(model, *args, **kwargs):
+            telemetry = model.telemetry
+            if not telemetry.enabled:
+                return method(model, *args, **kwargs)
+            if event is not None:
+                telemetry.count(event)
+            with telemetry.stage(stage):
+                return method(model, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
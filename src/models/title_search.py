@@ -0,0 +1,344 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+import bisect
+import copy
+import math
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Prefix ranges larger than this have their most popular titles precomputed;
+# smaller ones are ranked per query.
+PREFIX_SCAN_LIMIT = 4096
+PREFIX_TOP_K = 50
+
+# Trigram matching reads the postings of the rarest query trigrams, up to
+# POSTINGS_BUDGET ids, and nominates RERANK_POOL candidates per result among
+# the titles having MIN_READ_SHARE of those. The candidates are then ranked
+# by all query trigrams and kept if they share MIN_TRIGRAM_SHARE of them.
+POSTINGS_BUDGET = 12_000
+MIN_READ_SHARE = 1 / 2
+RERANK_POOL = 4
+MIN_TRIGRAM_SHARE = 1 / 3
+
+_NON_WORD = re.compile(r"[\W_]+")
+_COMBINING = re.compile("[\u0300-\u036f]")
+_MAX_CHAR = "\U0010ffff"
+
+
+def normalize_title(title: str) -> str:
+    # Case-, accent- and punctuation-insensitive form of a title or query.
+    text = _COMBINING.sub("", unicodedata.normalize("NFKD", title)).lower()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+class TitleSearchIndex:
+    # Title autocomplete over the distinct active titles, ranked by
+    # popularity. A query is answered in up to two passes:
+    #
+    #   1. titles equal to the normalized query, then titles starting with
+    #      it: a bisect over the sorted normalized titles, ranked from the
+    #      precomputed top titles of each prefix matching more than
+    #      PREFIX_SCAN_LIMIT titles, so short prefixes cost no more than
+    #      long ones
+    #   2. if that found fewer than `limit`, titles sharing the query's
+    #      character trigrams, so words inside a title ("matrix" -> "The
+    #      Matrix") and misspellings still match; ranked by trigrams shared,
+    #      then popularity
+    #
+    # The base arrays are built once per fit and never modified. Titles added
+    # or removed since then are a small delta (added titles scanned per
+    # query, removed ones filtered out) until compaction rebuilds the index;
+    # append and remove return new indexes sharing the base arrays.
+
+    def __init__(
+        self,
+        titles: List[str],
+        popularity: np.ndarray,
+        keys: List[str],
+        key_ids: np.ndarray,
+        top_by_prefix: Dict[str, np.ndarray],
+        gram_codes: np.ndarray,
+        gram_ptr: np.ndarray,
+        gram_ids: np.ndarray,
+        added: Tuple[Tuple[str, str, float], ...] = (),
+        removed: frozenset = frozenset(),
+    ):
+        # Title ids index titles and popularity; keys are the sorted
+        # normalized titles, key_ids their title ids and key_pos the inverse.
+        self.titles = titles
+        self.popularity = popularity
+        self.keys = keys
+        self.key_ids = key_ids
+        self.key_pos = np.empty_like(key_ids)
+        self.key_pos[key_ids] = np.arange(len(key_ids), dtype=key_ids.dtype)
+        self.top_by_prefix = top_by_prefix
+        # Trigram -> title ids, as CSR: the ids of gram_codes[g] are
+        # gram_ids[gram_ptr[g]:gram_ptr[g + 1]]
+        self.gram_codes = gram_codes
+        self.gram_ptr = gram_ptr
+        self.gram_ids = gram_ids
+        # (normalized, title, popularity) of titles added since build, and
+        # the titles removed since build
+        self.added = added
+        self.removed = removed
+
+    @classmethod
+    def build(
+        cls, titles: Sequence[str], popularity: Sequence[float]
+    ) -> "TitleSearchIndex":
+        # One entry per distinct title, with the popularity of its most
+        # popular row.
+        best = (
+            pd.DataFrame(
+                {
+                    "title": titles,
+                    "popularity": pd.to_numeric(popularity, errors="coerce"),
+                }
+            )
+            .dropna(subset=["title"])
+            .groupby("title", sort=False)["popularity"]
+            .max()
+        )
+        titles = best.index.astype(str).tolist()
+        ranking = best.to_numpy(np.float64, na_value=-np.inf)
+
+        normalized = [normalize_title(title) for title in titles]
+        order = sorted(range(len(titles)), key=normalized.__getitem__)
+        keys = [normalized[i] for i in order]
+        key_ids = np.array(order, dtype=np.int32)
+
+        return cls(
+            titles,
+            ranking,
+            keys,
+            key_ids,
+            _prefix_tops(keys, key_ids, ranking),
+            *_trigram_postings(normalized),
+        )
+
+    def _with_delta(
+        self, added: Tuple[Tuple[str, str, float], ...], removed: frozenset
+    ) -> "TitleSearchIndex":
+        # Shallow copy: the base arrays are shared, only the delta differs.
+        index = copy.copy(self)
+        index.added = added
+        index.removed = removed
+        return index
+
+    def append(self, title: str, popularity: float) -> "TitleSearchIndex":
+        entry = (normalize_title(title), title, _ranking(popularity))
+        return self._with_delta(self.added + (entry,), self.removed - {title})
+
+    def remove(self, titles: Iterable[str]) -> "TitleSearchIndex":
+        titles = frozenset(titles)
+        added = tuple(entry for entry in self.added if entry[1] not in titles)
+        return self._with_delta(added, self.removed | titles)
+
+    def nbytes(self) -> int:
+        # The NumPy arrays only; the Python title and key lists come on top.
+        return sum(
+            a.nbytes
+            for a in (
+                self.popularity,
+                self.key_ids,
+                self.key_pos,
+                self.gram_codes,
+                self.gram_ptr,
+                self.gram_ids,
+            )
+        )
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        query = normalize_title(query)
+        # Removed titles are filtered out of the candidates, so each pass
+        # asks for that many more.
+        want = limit + len(self.removed)
+
+        lo = bisect.bisect_left(self.keys, query)
+        exact_hi = bisect.bisect_right(self.keys, query, lo)
+        hi = bisect.bisect_left(self.keys, query + _MAX_CHAR, exact_hi)
+
+        exact = self._ranked(self.key_ids[lo:exact_hi], want)
+        candidates = [((0, -self.popularity[i]), self.titles[i]) for i in exact]
+        candidates += [
+            ((1, -self.popularity[i]), self.titles[i])
+            for i in self._prefix_top(query, lo, hi, want)
+        ]
+        candidates += [
+            ((int(key != query), -popularity), title)
+            for key, title, popularity in self.added
+            if key.startswith(query)
+        ]
+        results = self._merge(candidates, limit, [])
+
+        if len(results) < limit and len(query) >= 3:
+            # Candidates from the rarest trigrams, reranked by all of them.
+            ids = self._trigram_candidates(query, RERANK_POOL * (want + len(results)))
+            pool = [
+                (self.keys[self.key_pos[i]], self.titles[i], self.popularity[i])
+                for i in ids.tolist()
+            ]
+            grams = _trigram_set(query)
+            needed = max(1, math.ceil(len(grams) * MIN_TRIGRAM_SHARE))
+            candidates = []
+            for key, title, popularity in pool + list(self.added):
+                shared = len(grams & _trigram_set(key))
+                if shared >= needed:
+                    candidates.append(((-shared, -popularity), title))
+            results = self._merge(candidates, limit, results)
+
+        return results
+
+    def _merge(
+        self,
+        candidates: List[Tuple[tuple, str]],
+        limit: int,
+        results: List[str],
+    ) -> List[str]:
+        # Appends the best-ranked candidates not removed or already found.
+        seen = set(self.removed).union(results)
+        for _, title in sorted(candidates, key=lambda c: c[0]):
+            if len(results) >= limit:
+                break
+            if title not in seen:
+                seen.add(title)
+                results.append(title)
+        return results
+
+    def _ranked(self, ids: np.ndarray, k: int) -> np.ndarray:
+        return _most_popular(ids, self.popularity, k)
+
+    def _prefix_top(self, prefix: str, lo: int, hi: int, k: int) -> np.ndarray:
+        if hi - lo > PREFIX_SCAN_LIMIT and k <= PREFIX_TOP_K:
+            # Every prefix of more than PREFIX_SCAN_LIMIT keys was precomputed.
+            return self.top_by_prefix[prefix][:k]
+        return self._ranked(self.key_ids[lo:hi], k)
+
+    def _trigram_candidates(self, query: str, k: int) -> np.ndarray:
+        # Ids of the k titles sharing the most query trigrams, then most
+        # popular. Only the rarest trigrams fitting POSTINGS_BUDGET are read;
+        # they are also the ones that tell titles apart.
+        codes = np.unique(_trigram_codes(" " + query))
+        at = np.minimum(
+            np.searchsorted(self.gram_codes, codes), max(len(self.gram_codes) - 1, 0)
+        )
+        found = at[self.gram_codes[at] == codes] if len(self.gram_codes) else at[:0]
+        if len(found) == 0:
+            return np.empty(0, dtype=np.int32)
+
+        sizes = self.gram_ptr[found + 1] - self.gram_ptr[found]
+        found = found[np.argsort(sizes, kind="stable")]
+        n_read = max(
+            1, int(np.searchsorted(np.cumsum(np.sort(sizes)), POSTINGS_BUDGET, "right"))
+        )
+        postings = np.concatenate(
+            [
+                self.gram_ids[self.gram_ptr[g] : self.gram_ptr[g + 1]]
+                for g in found[:n_read]
+            ]
+        )
+        ids, shared = np.unique(postings, return_counts=True)
+
+        keep = shared >= max(1, math.ceil(n_read * MIN_READ_SHARE))
+        ids, shared = ids[keep], shared[keep]
+        if len(ids) > k:
+            # The k best without sorting every candidate: all above the k-th
+            # largest count, then the most popular of those tied with it.
+            cutoff = np.partition(shared, len(shared) - k)[len(shared) - k]
+            above = shared > cutoff
+            tied = _most_popular(
+                ids[shared == cutoff], self.popularity, k - int(above.sum())
+            )
+            ids = np.concatenate([ids[above], tied])
+            shared = np.concatenate([shared[above], np.full(len(tied), cutoff)])
+
+        return ids[np.lexsort((-self.popularity[ids], -shared))]
+
+
+def _ranking(popularity) -> float:
+    # Sort value of a popularity: missing ones rank last.
+    try:
+        value = float(popularity)
+    except (TypeError, ValueError):
+        return -np.inf
+    return -np.inf if np.isnan(value) else value
+
+
+def _most_popular(ids: np.ndarray, popularity: np.ndarray, k: int) -> np.ndarray:
+    # The k most popular of ids, best first, ties in ids order.
+    if len(ids) > k:
+        values = popularity[ids]
+        cutoff = np.partition(values, len(values) - k)[len(values) - k]
+        ids = ids[values >= cutoff]
+    order = np.argsort(-popularity[ids], kind="stable")
+    return ids[order[:k]]
+
+
+def _prefix_tops(
+    keys: List[str], key_ids: np.ndarray, popularity: np.ndarray
+) -> Dict[str, np.ndarray]:
+    # Top PREFIX_TOP_K title ids of every prefix of more than
+    # PREFIX_SCAN_LIMIT keys, found level by level inside the large ranges
+    # of the previous level.
+    tops = {}
+    large = [("", 0, len(keys))] if len(keys) > PREFIX_SCAN_LIMIT else []
+    while large:
+        next_large = []
+        for prefix, lo, hi in large:
+            tops[prefix] = _most_popular(key_ids[lo:hi], popularity, PREFIX_TOP_K)
+
+            # Keys equal to the prefix sort first and have no longer prefix.
+            start = bisect.bisect_right(keys, prefix, lo, hi)
+            while start < hi:
+                child = keys[start][: len(prefix) + 1]
+                end = bisect.bisect_left(keys, child + _MAX_CHAR, start, hi)
+                if end - start > PREFIX_SCAN_LIMIT:
+                    next_large.append((child, start, end))
+                start = end
+        large = next_large
+    return tops
+
+
+def _trigram_codes(text: str) -> np.ndarray:
+    # Each trigram packed into an int64, 21 bits per code point.
+    chars = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    return (chars[:-2] << 42) | (chars[1:-1] << 21) | chars[2:]
+
+
+def _trigram_set(key: str) -> set:
+    text = " " + key
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _trigram_postings(
+    normalized: List[str],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # CSR trigram -> title ids over all titles at once: the titles are
+    # joined into one code point array, space-prefixed (so word starts are
+    # trigrams too) and NUL-separated, and trigrams spanning a NUL dropped.
+    text = "".join(" " + key + "\0" for key in normalized)
+    chars = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    lengths = np.fromiter(
+        (len(key) + 2 for key in normalized), dtype=np.int64, count=len(normalized)
+    )
+    ids = np.repeat(np.arange(len(normalized), dtype=np.int32), lengths)[:-2]
+    codes = (chars[:-2] << 42) | (chars[1:-1] << 21) | chars[2:]
+
+    valid = (chars[:-2] != 0) & (chars[1:-1] != 0) & (chars[2:] != 0)
+    codes, ids = codes[valid], ids[valid]
+
+    # ids ascend already, so a stable sort by code groups the postings with
+    # their ids still in order; then drop repeats of a trigram in a title.
+    order = np.argsort(codes, kind="stable")
+    codes, ids = codes[order], ids[order]
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = (codes[1:] != codes[:-1]) | (ids[1:] != ids[:-1])
+    codes, ids = codes[first], ids[first]
+
+    gram_codes, starts = np.unique(codes, return_index=True)
+    return gram_codes, np.append(starts, len(codes)), ids
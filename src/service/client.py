@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional
+from src.data.storage import DEFAULT_USER
+from src.service.server import RecommendationService
+
+
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class InProcessClient:
+    # Calls a RecommendationService through the same routing, validation and
+    # micro-batching as HTTP requests, without opening a socket:
+    #
+    #   service = RecommendationService(model)
+    #   client = InProcessClient(service)
+    #   results = asyncio.run(client.recommend_by_movie("Heat", top_n=10))
+    #
+    # Concurrent calls (asyncio.gather) are batched exactly like concurrent
+    # HTTP requests.
+
+    def __init__(self, service: RecommendationService):
+        self.service = service
+
+    async def request(
+        self, method: str, path: str, payload: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        status, body = await self.service.dispatch(method, path, payload)
+        if status != 200:
+            raise ServiceError(status, body.get("error", ""))
+        return body
+
+    async def recommend_by_movie(
+        self,
+        title: str,
+        top_n: int = 5,
+        profile_weight: float = 0.0,
+        user_id: str = DEFAULT_USER,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        body = await self.request(
+            "POST",
+            "/recommend/movie",
+            {
+                "title": title,
+                "top_n": top_n,
+                "profile_weight": profile_weight,
+                "user_id": user_id,
+                "filters": filters,
+            },
+        )
+        return body["results"]
+
+    async def recommend_by_keywords(
+        self,
+        keywords: str,
+        top_n: int = 5,
+        profile_weight: float = 0.0,
+        user_id: str = DEFAULT_USER,
+        strategy: str = "sum",
+        weights: Optional[List[float]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        body = await self.request(
+            "POST",
+            "/recommend/keywords",
+            {
+                "keywords": keywords,
+                "top_n": top_n,
+                "profile_weight": profile_weight,
+                "user_id": user_id,
+                "strategy": strategy,
+                "weights": weights,
+                "filters": filters,
+            },
+        )
+        return body["results"]
+
+    async def recommend_personal(
+        self,
+        top_n: int = 5,
+        user_id: str = DEFAULT_USER,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        body = await self.request(
+            "POST",
+            "/recommend/personal",
+            {"top_n": top_n, "user_id": user_id, "filters": filters},
+        )
+        return body["results"]
+
+    async def search_titles(self, query: str, limit: int = 10) -> List[str]:
+        body = await self.request("GET", "/titles/search", {"q": query, "limit": limit})
+        return body["results"]
+
+    async def get_ratings(self, user_id: str = DEFAULT_USER) -> Dict[str, str]:
+        body = await self.request("GET", "/ratings", {"user_id": user_id})
+        return body["ratings"]
+
+    async def save_rating(
+        self, title: str, rating: str, user_id: str = DEFAULT_USER
+    ) -> None:
+        await self.request(
+            "POST", "/ratings", {"title": title, "rating": rating, "user_id": user_id}
+        )
+
+    async def remove_rating(self, title: str, user_id: str = DEFAULT_USER) -> bool:
+        body = await self.request(
+            "DELETE", "/ratings", {"title": title, "user_id": user_id}
+        )
+        return body["removed"]
+
+    async def health(self) -> Dict[str, Any]:
+        return await self.request("GET", "/health")
+
+    async def stats(self) -> Dict[str, Any]:
+        return await self.request("GET", "/stats")
+
+    async def metrics(self) -> str:
+        return await self.request("GET", "/metrics")
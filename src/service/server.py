@@ -0,0 +1,456 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from concurrent.futures import Executor, ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+import argparse
+import asyncio
+import json
+import logging
+from dotenv import load_dotenv
+from src.data.catalog import json_safe
+from src.data.storage import DEFAULT_USER
+from src.models.filters import MovieFilter
+from src.models.recommender import KEYWORD_STRATEGIES, MovieRecommender
+from src.models.settings import load_model
+
+MAX_BODY_BYTES = 1 << 20
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class MicroBatcher:
+    # Collects the queries that arrive within `window` seconds of the first
+    # one (or until max_batch are waiting) and scores them with a single
+    # batch call on the executor, so many small requests become one matrix
+    # product and the event loop never runs the BLAS work itself.
+    #
+    # Queries are grouped by key (everything but the query and top_n must
+    # match); a group is scored with its largest top_n and every caller gets
+    # the prefix it asked for.
+
+    def __init__(
+        self,
+        run_batch: Callable[[tuple, List[Any], int], List[List[Dict[str, Any]]]],
+        executor: Executor,
+        window: float = 0.002,
+        max_batch: int = 256,
+    ):
+        self._run_batch = run_batch
+        self._executor = executor
+        self.window = window
+        self.max_batch = max_batch
+
+        self._pending: Dict[tuple, List[Tuple[Any, int, asyncio.Future]]] = {}
+        self._timers: Dict[tuple, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.n_batches = 0
+        self.n_queries = 0
+
+    async def submit(self, key: tuple, query: Any, top_n: int) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        group = self._pending.setdefault(key, [])
+        group.append((query, top_n, future))
+        if len(group) >= self.max_batch:
+            self._flush(key)
+        elif len(group) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        group = self._pending.pop(key, None)
+        if not group:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(key, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, key: tuple, group: List[Tuple[Any, int, asyncio.Future]]
+    ) -> None:
+        queries = [query for query, _, _ in group]
+        top_n = max(n for _, n, _ in group)
+        self.n_batches += 1
+        self.n_queries += len(group)
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._executor, self._run_batch, key, queries, top_n
+            )
+        except Exception as e:
+            for _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, n, future), recs in zip(group, results):
+            # Callers that went away (closed connection) are skipped.
+            if not future.done():
+                future.set_result(recs[:n])
+
+
+def _required(payload: Dict[str, Any], name: str) -> Any:
+    value = payload.get(name)
+    if value is None or value == "":
+        raise ValueError(f"Missing field: {name}")
+    return value
+
+
+def _query_params(payload: Dict[str, Any]) -> Tuple[int, float, str]:
+    top_n = int(payload.get("top_n", 5))
+    profile_weight = float(payload.get("profile_weight", 0.0))
+    user_id = str(payload.get("user_id") or DEFAULT_USER)
+    if top_n < 1:
+        raise ValueError("top_n must be at least 1.")
+    if not 0.0 <= profile_weight <= 1.0:
+        raise ValueError("profile_weight must be between 0 and 1.")
+    return top_n, profile_weight, user_id
+
+
+def _filters(payload: Dict[str, Any]) -> Optional[MovieFilter]:
+    values = payload.get("filters")
+    if not values:
+        return None
+    if not isinstance(values, dict):
+        raise ValueError("filters must be an object.")
+    movie_filter = MovieFilter.from_dict(values)
+    return None if movie_filter.is_empty() else movie_filter
+
+
+class RecommendationService:
+    # JSON API over a MovieRecommender:
+    #
+    #   GET    /health
+    #   GET    /stats               stage timings and counters (JSON)
+    #   GET    /metrics             the same, Prometheus text format
+    #   POST   /recommend/movie     {"title", "top_n", "profile_weight", "user_id",
+    #                                 "filters"}
+    #   POST   /recommend/keywords  {"keywords", "top_n", "profile_weight", "user_id",
+    #                                 "strategy", "weights", "filters"}
+    #   POST   /recommend/personal  {"user_id", "top_n", "filters"}
+    #   GET    /titles/search?q=...&limit=...
+    #   GET    /ratings?user_id=...
+    #   POST   /ratings             {"title", "rating", "user_id"}
+    #   DELETE /ratings             {"title", "user_id"}
+    #
+    # "filters" takes the MovieFilter fields, e.g. {"genres": ["Drama"],
+    # "year_min": 1990, "min_rating": 7}.
+    #
+    # Movie and keyword queries go through the MicroBatcher; everything else
+    # runs on the same executor one call at a time. The model's snapshots
+    # make it safe to call from the executor threads concurrently.
+
+    def __init__(
+        self,
+        model: MovieRecommender,
+        window: float = 0.002,
+        max_batch: int = 256,
+        workers: int = 2,
+    ):
+        self.model = model
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="recommend"
+        )
+        self._batcher = MicroBatcher(
+            self._run_batch, self._executor, window=window, max_batch=max_batch
+        )
+        self._routes = {
+            ("GET", "/health"): self._health,
+            ("GET", "/stats"): self._stats,
+            ("GET", "/metrics"): self._metrics,
+            ("POST", "/recommend/movie"): self._recommend_by_movie,
+            ("POST", "/recommend/keywords"): self._recommend_by_keywords,
+            ("POST", "/recommend/personal"): self._recommend_personal,
+            ("GET", "/titles/search"): self._search_titles,
+            ("GET", "/ratings"): self._get_ratings,
+            ("POST", "/ratings"): self._save_rating,
+            ("DELETE", "/ratings"): self._remove_rating,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    # ----------------------------
+    # Routing
+    # ----------------------------
+
+    async def dispatch(
+        self, method: str, path: str, payload: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, Union[Dict[str, Any], str]]:
+        # Handlers return a dict (sent as JSON) or a str (sent as plain text).
+        handler = self._routes.get((method.upper(), path))
+        if handler is None:
+            return 404, {"error": f"No route for {method} {path}"}
+
+        try:
+            return 200, await handler(payload or {})
+        except (TypeError, ValueError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            logging.exception("Request failed")
+            return 500, {"error": str(e)}
+
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    def _run_batch(
+        self, key: tuple, queries: List[str], top_n: int
+    ) -> List[List[Dict[str, Any]]]:
+        kind, profile_weight, user_id, strategy, filters = key
+        if kind == "movie":
+            return self.model.recommend_by_movie_batch(
+                queries,
+                top_n=top_n,
+                profile_weight=profile_weight,
+                user_id=user_id,
+                filters=filters,
+            )
+        return self.model.recommend_by_keywords_batch(
+            queries,
+            top_n=top_n,
+            profile_weight=profile_weight,
+            user_id=user_id,
+            strategy=strategy,
+            filters=filters,
+        )
+
+    # ----------------------------
+    # Handlers
+    # ----------------------------
+
+    async def _stats(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.model.telemetry_stats()
+
+    async def _metrics(self, payload: Dict[str, Any]) -> str:
+        return self.model.telemetry_metrics()
+
+    async def _health(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "movies": len(self.model.get_all_titles()),
+            "batches": self._batcher.n_batches,
+            "batched_queries": self._batcher.n_queries,
+            "result_cache": self.model.result_cache_stats(),
+        }
+
+    async def _recommend_by_movie(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        title = str(_required(payload, "title"))
+        top_n, profile_weight, user_id = _query_params(payload)
+        filters = _filters(payload)
+        recs = await self._batcher.submit(
+            ("movie", profile_weight, user_id, None, filters), title, top_n
+        )
+        return {"results": json_safe(recs)}
+
+    async def _recommend_by_keywords(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        keywords = str(_required(payload, "keywords"))
+        top_n, profile_weight, user_id = _query_params(payload)
+        strategy = str(payload.get("strategy") or "sum")
+        if strategy not in KEYWORD_STRATEGIES:
+            raise ValueError(
+                f"strategy must be one of {', '.join(KEYWORD_STRATEGIES)}."
+            )
+        filters = _filters(payload)
+
+        weights = payload.get("weights")
+        if weights is not None:
+            # Per-keyword weights are specific to the query, so it is not
+            # batched with others.
+            recs = await self._call(
+                self.model.recommend_by_keywords,
+                keywords,
+                top_n=top_n,
+                profile_weight=profile_weight,
+                user_id=user_id,
+                strategy=strategy,
+                weights=[float(w) for w in weights],
+                filters=filters,
+            )
+        else:
+            recs = await self._batcher.submit(
+                ("keywords", profile_weight, user_id, strategy, filters),
+                keywords,
+                top_n,
+            )
+        return {"results": json_safe(recs)}
+
+    async def _recommend_personal(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        top_n, _, user_id = _query_params(payload)
+        recs = await self._call(
+            self.model.recommend_personal,
+            top_n=top_n,
+            user_id=user_id,
+            filters=_filters(payload),
+        )
+        return {"results": json_safe(recs)}
+
+    async def _search_titles(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        query = str(payload.get("q") or "")
+        limit = int(payload.get("limit", 10))
+        if not 1 <= limit <= 100:
+            raise ValueError("limit must be between 1 and 100.")
+        # Sub-millisecond, so it runs inline rather than on the executor.
+        return {"results": self.model.search_titles(query, limit)}
+
+    async def _get_ratings(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        user_id = str(payload.get("user_id") or DEFAULT_USER)
+        ratings = await self._call(self.model.get_ratings, user_id)
+        return {"user_id": user_id, "ratings": dict(ratings)}
+
+    async def _save_rating(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        title = str(_required(payload, "title"))
+        rating = str(_required(payload, "rating"))
+        user_id = str(payload.get("user_id") or DEFAULT_USER)
+        await self._call(self.model.save_rating, title, rating, user_id=user_id)
+        return {"user_id": user_id, "title": title, "rating": rating}
+
+    async def _remove_rating(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        title = str(_required(payload, "title"))
+        user_id = str(payload.get("user_id") or DEFAULT_USER)
+        removed = await self._call(self.model.remove_rating, title, user_id=user_id)
+        return {"user_id": user_id, "title": title, "removed": removed}
+
+    # ----------------------------
+    # HTTP
+    # ----------------------------
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        # Minimal HTTP/1.1 with keep-alive: one JSON request body in, one JSON
+        # response out.
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Bad request line"})
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                # The body cannot be delimited, so the connection is closed.
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Bad Content-Length"})
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Body too large"})
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                url = urlsplit(target)
+                try:
+                    payload = dict(parse_qsl(url.query))
+                    if body:
+                        payload.update(json.loads(body))
+                except (json.JSONDecodeError, TypeError, ValueError):
+                    status, response = 400, {"error": "Body must be a JSON object"}
+                else:
+                    status, response = await self.dispatch(method, url.path, payload)
+
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter,
+        status: int,
+        response: Union[Dict[str, Any], str],
+        keep_alive: bool = False,
+    ) -> None:
+        if isinstance(response, str):
+            body = response.encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(response).encode()
+            content_type = "application/json"
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(
+    service: RecommendationService, host: str = "127.0.0.1", port: int = 8000
+) -> None:
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    logging.info(f"Serving recommendations on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    parser = argparse.ArgumentParser(
+        description="Serve recommendations over HTTP/JSON."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--window-ms",
+        type=float,
+        default=2.0,
+        help="How long to collect concurrent queries into one batch",
+    )
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--telemetry",
+        action="store_true",
+        help="Record stage timings and counters for /stats and /metrics",
+    )
+    args = parser.parse_args()
+
+    service = RecommendationService(
+        load_model(telemetry=args.telemetry or None),
+        window=args.window_ms / 1000,
+        max_batch=args.max_batch,
+        workers=args.workers,
+    )
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from src.models.filters import MovieFilter
+
+# Titles offered by a title picker; the search box narrows them down.
+TITLE_PICKER_SIZE = 25
 
 
 def render_movie_card(
@@ -28,3 +32,83 @@ def render_movie_card(
 
         with st.popover(t("popover")):
             st.write(movie.get("overview", ""))
+
+
+def render_filters(recommender, t, key_prefix: str) -> Optional[MovieFilter]:
+    # Metadata filters shared by the recommendation tabs. Only the controls
+    # moved away from their defaults restrict the results.
+    bounds = recommender.get_filter_bounds()
+
+    with st.expander(t("filters_header")):
+        genres = st.multiselect(
+            t("filter_genres"), bounds["genres"], key=f"{key_prefix}_genres"
+        )
+
+        filters = {"genres": genres}
+        if "year" in bounds:
+            low, high = (int(v) for v in bounds["year"])
+            years = st.slider(
+                t("filter_years"),
+                min_value=low,
+                max_value=max(high, low + 1),
+                value=(low, max(high, low + 1)),
+                key=f"{key_prefix}_years",
+            )
+            if years[0] > low:
+                filters["year_min"] = years[0]
+            if years[1] < high:
+                filters["year_max"] = years[1]
+
+        min_rating = st.slider(
+            t("filter_min_rating"),
+            min_value=0.0,
+            max_value=10.0,
+            value=0.0,
+            step=0.5,
+            key=f"{key_prefix}_rating",
+        )
+        if min_rating > 0:
+            filters["min_rating"] = min_rating
+
+        min_votes = st.number_input(
+            t("filter_min_votes"),
+            min_value=0,
+            value=0,
+            step=50,
+            key=f"{key_prefix}_votes",
+        )
+        if min_votes > 0:
+            filters["min_votes"] = min_votes
+
+        if "runtime" in bounds:
+            low, high = (int(v) for v in bounds["runtime"])
+            runtime = st.slider(
+                t("filter_runtime"),
+                min_value=low,
+                max_value=max(high, low + 1),
+                value=(low, max(high, low + 1)),
+                key=f"{key_prefix}_runtime",
+            )
+            if runtime[0] > low:
+                filters["runtime_min"] = runtime[0]
+            if runtime[1] < high:
+                filters["runtime_max"] = runtime[1]
+
+    movie_filter = MovieFilter.from_dict(filters)
+    return None if movie_filter.is_empty() else movie_filter
+
+
+def render_title_picker(recommender, t, label: str, key: str) -> Optional[str]:
+    # A search box and the best matching titles (most popular first, so an
+    # empty search offers the most popular movies), instead of sending the
+    # whole catalog to the browser as selectbox options.
+    query = st.text_input(
+        t("search_title"),
+        placeholder=t("search_title_placeholder"),
+        key=f"{key}_query",
+    )
+    titles = recommender.search_titles(query, limit=TITLE_PICKER_SIZE)
+    if not titles:
+        st.caption(t("no_title_matches"))
+        return None
+    return st.selectbox(label, titles, key=key)
@@ -1,10 +1,10 @@
 import streamlit as st
-from src.ui.components import render_movie_card
-from src.models.recommender import MovieRecommender
+from src.ui.components import render_filters, render_movie_card
+from src.models.recommender import KEYWORD_STRATEGIES, MovieRecommender
 from src.ui.translator import Translator
 
 
-def render_tab(recommender: MovieRecommender, t: Translator):
+def render_tab(recommender: MovieRecommender, t: Translator, user_id: str):
     st.header(t("tab2_header"))
     st.markdown(t("tab2_sub"))
 
@@ -33,11 +33,24 @@ def render_tab(recommender: MovieRecommender, t: Translator):
         step=1,
         key="top_n_input_keywords",
     )
+    strategy = st.radio(
+        t("keyword_strategy"),
+        KEYWORD_STRATEGIES,
+        format_func=lambda s: t(f"keyword_strategy_{s}"),
+        horizontal=True,
+        key="keyword_strategy",
+    )
+    filters = render_filters(recommender, t, key_prefix="keywords_filters")
 
     if st.button(t("btn_text_rec"), key="btn2"):
         if user_text.strip():
             recommendations = recommender.recommend_by_keywords(
-                user_text.strip(), profile_weight=profile_weight, top_n=top_n
+                user_text.strip(),
+                profile_weight=profile_weight,
+                top_n=top_n,
+                user_id=user_id,
+                strategy=strategy,
+                filters=filters,
             )
             st.success(t("success_text").format(user_text))
 
@@ -1,13 +1,15 @@
 import streamlit as st
-from src.ui.components import render_movie_card
+from src.ui.components import render_filters, render_movie_card, render_title_picker
 from src.models.recommender import MovieRecommender
 from src.ui.translator import Translator
 
 
-def render_tab(recommender: MovieRecommender, t: Translator):
+def render_tab(recommender: MovieRecommender, t: Translator, user_id: str):
     st.header(t("tab1_header"))
 
-    selected_movie = st.selectbox(t("select_movie"), recommender.get_all_titles())
+    selected_movie = render_title_picker(
+        recommender, t, label=t("select_movie"), key="movie_select"
+    )
     profile_weight = (
         st.slider(
             t("personalization_strength"),
@@ -28,14 +30,19 @@ def render_tab(recommender: MovieRecommender, t: Translator):
         step=1,
         key="top_n_input_movie",
     )
+    filters = render_filters(recommender, t, key_prefix="movie_filters")
 
-    if st.button(t("btn_recommend"), key="btn1"):
+    if st.button(t("btn_recommend"), key="btn1") and selected_movie is not None:
         recommendations = recommender.recommend_by_movie(
-            selected_movie, profile_weight=profile_weight, top_n=top_n
+            selected_movie,
+            profile_weight=profile_weight,
+            top_n=top_n,
+            user_id=user_id,
+            filters=filters,
         )
 
         if recommendations:
-            if profile_weight > 0 and not recommender.ratings:
+            if profile_weight > 0 and not recommender.get_ratings(user_id):
                 st.warning(t("no_ratings_warning"))
 
             st.success(t("success_movie").format(selected_movie))
@@ -2,35 +2,33 @@ import streamlit as st
 import pandas as pd
 from src.models.recommender import MovieRecommender
 from src.ui.translator import Translator
-from src.ui.components import render_movie_card
+from src.ui.components import render_filters, render_movie_card, render_title_picker
 
 
-def render_tab(recommender: MovieRecommender, t: Translator):
+def render_tab(recommender: MovieRecommender, t: Translator, user_id: str):
     st.header(t("tab4_header"))
     st.subheader(t("tab4_rate_movies"))
 
     col1, col2, col3 = st.columns([3, 1, 1])
     with col1:
-        movie_to_rate = st.selectbox(
-            t("tab4_select_movie"),
-            recommender.get_all_titles(),
-            key="rating_select",
+        movie_to_rate = render_title_picker(
+            recommender, t, label=t("tab4_select_movie"), key="rating_select"
         )
     with col2:
-        if st.button(t("tab4_like"), width="stretch"):
-            recommender.save_rating(movie_to_rate, "like")
+        if st.button(t("tab4_like"), width="stretch") and movie_to_rate is not None:
+            recommender.save_rating(movie_to_rate, "like", user_id=user_id)
             st.success(t("tab4_liked").format(movie_to_rate))
             st.rerun()
     with col3:
-        if st.button(t("tab4_dislike"), width="stretch"):
-            recommender.save_rating(movie_to_rate, "dislike")
+        if st.button(t("tab4_dislike"), width="stretch") and movie_to_rate is not None:
+            recommender.save_rating(movie_to_rate, "dislike", user_id=user_id)
             st.warning(t("tab4_disliked").format(movie_to_rate))
             st.rerun()
 
     st.divider()
 
     st.subheader(t("tab4_history"))
-    history = recommender.ratings
+    history = recommender.get_ratings(user_id)
     if history:
         hist_list = []
         for title, rating in history.items():
@@ -50,12 +48,12 @@ def render_tab(recommender: MovieRecommender, t: Translator):
             t("select_movie_to_remove"), list(history.keys()), key="remove_rating"
         )
         if st.button(t("btn_remove_rating"), type="secondary"):
-            recommender.remove_rating(remove_title)
+            recommender.remove_rating(remove_title, user_id=user_id)
             st.success(t("rating_removed").format(remove_title))
             st.rerun()
 
         if st.button(t("btn_clear_all_ratings"), type="primary"):
-            recommender.clear_all_ratings()
+            recommender.clear_all_ratings(user_id=user_id)
             st.success(t("all_ratings_cleared"))
             st.rerun()
     else:
@@ -101,9 +99,12 @@ def render_tab(recommender: MovieRecommender, t: Translator):
         step=1,
         key="top_n_input_personal",
     )
+    filters = render_filters(recommender, t, key_prefix="personal_filters")
 
     if st.button(t("tab4_generate_recs"), type="primary"):
-        personal_recs = recommender.recommend_personal(top_n=top_n)
+        personal_recs = recommender.recommend_personal(
+            top_n=top_n, user_id=user_id, filters=filters
+        )
 
         if personal_recs:
             for row_start in range(0, len(personal_recs), 5):
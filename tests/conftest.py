@@ -0,0 +1,39 @@
+from typing import Callable
+import pytest
+
+from src.data.storage import JSONStorage
+from src.models.recommender import MovieRecommender
+from tests.synthetic import make_catalog
+
+
+@pytest.fixture
+def catalog_path(tmp_path) -> str:
+    path = str(tmp_path / "movies.csv")
+    make_catalog().to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def make_model(tmp_path, catalog_path) -> Callable[..., MovieRecommender]:
+    # Unfitted models over the same catalog and, unless a storage is given,
+    # the same user data; keyword arguments go to MovieRecommender (csv_path
+    # defaults to the catalog fixture).
+    def make(csv_path: str = catalog_path, **kwargs) -> MovieRecommender:
+        kwargs.setdefault(
+            "storage",
+            JSONStorage(
+                str(tmp_path / "user_movies.json"), str(tmp_path / "user_ratings.json")
+            ),
+        )
+        return MovieRecommender(csv_path, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def model(request, make_model) -> MovieRecommender:
+    # A fitted model; parametrize with indirect=True to pass constructor
+    # arguments, e.g. {"representation": "lsa"}.
+    recommender = make_model(**getattr(request, "param", {}))
+    recommender.fit()
+    return recommender
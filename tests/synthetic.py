@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+GENRES = ["Action", "Comedy", "Drama", "Horror", "Romance", "Thriller"]
+WORDS = [f"w{i}" for i in range(300)]
+
+
+def make_catalog(n_rows: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "id": np.arange(1, n_rows + 1),
+            "title": [f"Movie {i}" for i in range(n_rows)],
+            "genres": [
+                ", ".join(rng.choice(GENRES, 2, replace=False)) for _ in range(n_rows)
+            ],
+            "keywords": [", ".join(rng.choice(WORDS, 4)) for _ in range(n_rows)],
+            "overview": [" ".join(rng.choice(WORDS, 20)) for _ in range(n_rows)],
+            "release_date": [f"{y}-01-01" for y in rng.integers(1960, 2024, n_rows)],
+            "vote_average": rng.uniform(3, 9, n_rows),
+            "vote_count": rng.integers(50, 5000, n_rows),
+            "popularity": rng.exponential(20, n_rows),
+            "runtime": rng.integers(70, 180, n_rows).astype(float),
+            "poster_path": [f"/p{i}.jpg" for i in range(n_rows)],
+        }
+    )
@@ -0,0 +1,24 @@
+import numpy as np
+from src.models.ann import IVFSearch
+from tests.synthetic import make_catalog
+
+
+def _titles(results):
+    return [r["title"] for r in results]
+
+
+def test_ivf_recall(tmp_path, make_model):
+    path = str(tmp_path / "movies_2000.csv")
+    make_catalog(2_000).to_csv(path, index=False)
+    exact = make_model(path)
+    ivf = make_model(path, search=IVFSearch(n_probe=8))
+    exact.fit()
+    ivf.fit()
+
+    recalls = []
+    for i in range(0, 2_000, 100):
+        title = f"Movie {i}"
+        expected = set(_titles(exact.recommend_by_movie(title, top_n=10)))
+        found = set(_titles(ivf.recommend_by_movie(title, top_n=10)))
+        recalls.append(len(expected & found) / len(expected))
+    assert np.mean(recalls) >= 0.8
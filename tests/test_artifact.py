@@ -0,0 +1,75 @@
+import os
+import numpy as np
+import pytest
+from tests.synthetic import make_catalog
+
+
+def _dense(matrix) -> np.ndarray:
+    return matrix.toarray() if hasattr(matrix, "toarray") else np.asarray(matrix)
+
+
+@pytest.mark.parametrize("representation", ["tfidf", "lsa"])
+def test_round_trip(tmp_path, make_model, representation):
+    artifacts = str(tmp_path / "artifacts")
+    options = dict(representation=representation, n_components=16)
+    fitted = make_model(**options)
+    fitted.fit(neighbors=8)
+    fitted.save(artifacts)
+
+    loaded = make_model(**options)
+    assert loaded.load(artifacts)
+
+    np.testing.assert_array_equal(_dense(loaded.vectors), _dense(fitted.vectors))
+    np.testing.assert_array_equal(loaded.vectorizer.idf_, fitted.vectorizer.idf_)
+    assert loaded.vectorizer.vocabulary_ == fitted.vectorizer.vocabulary_
+    np.testing.assert_array_equal(loaded._neighbor_idx, fitted._neighbor_idx)
+    assert loaded.neighbor_k == 8
+    if representation == "lsa":
+        np.testing.assert_array_equal(loaded._projection, fitted._projection)
+
+    for model in (fitted, loaded):
+        model.save_rating("Movie 3", "like")
+    for method, query in (
+        ("recommend_by_movie", "Movie 1"),
+        ("recommend_by_movie", "Movie 42"),
+        ("recommend_by_keywords", "w1, w7"),
+    ):
+        expected = getattr(fitted, method)(query, top_n=5, profile_weight=0.3)
+        assert getattr(loaded, method)(query, top_n=5, profile_weight=0.3) == expected
+
+
+def test_loaded_model_accepts_changes(tmp_path, model, make_model):
+    artifacts = str(tmp_path / "artifacts")
+    model.save(artifacts)
+
+    loaded = make_model()
+    assert loaded.load(artifacts)
+    assert loaded.add_new_movie("New Movie", ["Drama"], "w1, w2", "w1 w2 w1 w2")
+    titles = [r["title"] for r in loaded.recommend_by_keywords("w1, w2", top_n=5)]
+    assert "New Movie" in titles
+
+
+def test_load_reuses_lookup_index(tmp_path, model, make_model):
+    artifacts = str(tmp_path / "artifacts")
+    model.save(artifacts)
+
+    loaded = make_model()
+    title_search = loaded._title_search
+    assert loaded.load(artifacts)
+    # Built once in __init__ from the same catalog.
+    assert loaded._title_search is title_search
+
+
+def test_changed_catalog_is_refitted(tmp_path, catalog_path, make_model):
+    artifacts = str(tmp_path / "artifacts")
+    fitted = make_model()
+    assert not fitted.fit_or_load(artifacts)
+    assert os.listdir(artifacts)
+
+    make_catalog(seed=1).to_csv(catalog_path, index=False)
+    changed = make_model()
+    assert not changed.load(artifacts)
+    assert not changed.fit_or_load(artifacts)
+
+    reloaded = make_model()
+    assert reloaded.fit_or_load(artifacts)
@@ -0,0 +1,52 @@
+import pytest
+
+from src.models.ann import IVFSearch
+from src.models.filters import MovieFilter
+
+FILTERS = [None, MovieFilter(genres=["Comedy"], min_votes=200)]
+TITLES = [f"Movie {i}" for i in range(0, 300, 25)] + ["Not A Movie"]
+KEYWORDS = ["w1", "w2, w40", "w3, w7, w11", "", "w299, w5"]
+
+
+@pytest.fixture(params=["exact", "neighbors", "ivf"])
+def rated(request, make_model):
+    # Without a result cache, so batches are scored, not served from the
+    # entries of the single queries.
+    search = IVFSearch(n_lists=8) if request.param == "ivf" else None
+    model = make_model(search=search, result_cache_size=0)
+    model.fit(neighbors=20 if request.param == "neighbors" else 0)
+    model.save_rating("Movie 3", "like")
+    model.save_rating("Movie 8", "dislike")
+    return model
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("profile_weight", [0.0, 0.3])
+def test_movie_batch_matches_single_queries(rated, filters, profile_weight):
+    options = dict(top_n=7, profile_weight=profile_weight, filters=filters)
+    expected = [rated.recommend_by_movie(title, **options) for title in TITLES]
+    assert rated.recommend_by_movie_batch(TITLES, chunk_size=4, **options) == expected
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("strategy", ["sum", "weighted", "max"])
+def test_keyword_batch_matches_single_queries(rated, filters, strategy):
+    options = dict(top_n=7, profile_weight=0.3, strategy=strategy, filters=filters)
+    expected = [rated.recommend_by_keywords(query, **options) for query in KEYWORDS]
+    assert rated.recommend_by_keywords_batch(KEYWORDS, chunk_size=2, **options) == (
+        expected
+    )
+
+
+def test_batches_share_the_result_cache(make_model):
+    model = make_model(telemetry=True)
+    model.fit(neighbors=20)
+    single = model.recommend_by_movie("Movie 1", top_n=5)
+    batch = model.recommend_by_movie_batch(["Movie 1", "Movie 2"], top_n=5)
+    assert batch[0] == single
+    assert model.recommend_by_movie("Movie 2", top_n=5) == batch[1]
+
+    counters = model.telemetry.snapshot()["counters"]
+    assert counters["result_cache_hits"] == 2
+    assert counters["result_cache_misses"] == 2
+    assert counters["neighbor_table_hits"] == 2
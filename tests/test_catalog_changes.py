@@ -0,0 +1,47 @@
+import pytest
+from tests.synthetic import make_catalog
+
+
+def _titles(results):
+    return [r["title"] for r in results]
+
+
+@pytest.mark.parametrize("model", [{"refit_threshold": 10}], indirect=True)
+def test_added_and_removed_movies(model):
+    assert model.add_new_movie("New Movie", ["Drama"], "w1, w2", "w1 w2 w1 w2")
+    assert not model.add_new_movie("New Movie", ["Drama"], "w1", "duplicate")
+    assert "New Movie" in _titles(model.recommend_by_keywords("w1, w2", top_n=5))
+    assert model.search_titles("new mov", 5)[0] == "New Movie"
+
+    assert model.remove_user_movie("New Movie")
+    assert "New Movie" not in _titles(model.recommend_by_keywords("w1, w2", top_n=5))
+    assert "New Movie" not in model.get_all_titles()
+    assert "New Movie" not in model.search_titles("new mov", 5)
+
+
+@pytest.mark.parametrize("model", [{"refit_threshold": 3}], indirect=True)
+def test_compaction_matches_a_fresh_fit(model, make_model):
+    for i in range(3):
+        model.add_new_movie(f"New Movie {i}", ["Drama"], f"w{i}, w9", "w5 w6")
+    model.wait_for_compaction()
+    assert model._pending_changes == 0
+    assert len(model.df) == len(make_catalog()) + 3
+
+    fresh = make_model()
+    fresh.fit()
+    assert (model.vectors != fresh.vectors).nnz == 0
+    assert model.recommend_by_keywords("w9", top_n=10) == (
+        fresh.recommend_by_keywords("w9", top_n=10)
+    )
+
+
+@pytest.mark.parametrize("model", [{"refit_threshold": 3}], indirect=True)
+def test_changes_during_compaction_are_kept(model):
+    for i in range(5):
+        model.add_new_movie(f"New Movie {i}", ["Drama"], f"w{i}, w9", "w5 w6")
+    model.wait_for_compaction()
+
+    assert len(model.df) == len(make_catalog()) + 5
+    assert model.vectors.shape[0] == len(model.df)
+    titles = set(_titles(model.recommend_by_keywords("w9", top_n=10)))
+    assert {f"New Movie {i}" for i in range(5)} <= titles
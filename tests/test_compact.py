@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.catalog import RowStore, append_rows, compact_frame
+from src.data.storage import JSONStorage
+from tests.synthetic import make_catalog
+
+QUERIES = [
+    ("recommend_by_movie", "Movie 1"),
+    ("recommend_by_movie", "Movie 120"),
+    ("recommend_by_keywords", "w1, w7"),
+]
+
+
+def _results(model):
+    return [getattr(model, method)(query, top_n=5) for method, query in QUERIES]
+
+
+def test_row_store_reads_like_the_frame():
+    df = make_catalog(50)
+    df.loc[[3, 7], "overview"] = None
+    store = RowStore.from_frame(df, ["keywords", "overview"])
+
+    rows = pd.DataFrame({"overview": ["added é", None], "other": [1, 2]})
+    appended = store.append(rows)
+    assert len(store) == 50 and len(appended) == 52
+
+    expected = df["overview"].tolist() + ["added é", None]
+    assert appended.series("overview").tolist() == expected
+    assert appended.take("overview", [51, 3, 50, 0]) == [
+        None,
+        None,
+        "added é",
+        df["overview"][0],
+    ]
+    # Columns the rows lack are missing, and the original store is unchanged.
+    assert appended.take("keywords", [50, 51]) == [None, None]
+    assert store.series("keywords").tolist() == df["keywords"].tolist()
+
+
+def test_append_rows_keeps_compact_dtypes():
+    df = compact_frame(make_catalog(50))
+    row = pd.DataFrame(
+        [{"id": 1000, "title": "New", "genres": "Western", "vote_average": 7.5}],
+        index=[50],
+    )
+    appended = append_rows(df, row)
+
+    assert appended["genres"].dtype.name == "category"
+    assert appended["vote_average"].dtype == np.float32
+    assert appended["genres"].iloc[-1] == "Western"
+    assert appended["title"].iloc[-1] == "New"
+
+
+@pytest.fixture
+def pair(tmp_path, make_model):
+    # Separate user data, so each model's added movies are its own.
+    storage = JSONStorage(
+        str(tmp_path / "normal_movies.json"), str(tmp_path / "normal_ratings.json")
+    )
+    normal, compact = make_model(storage=storage), make_model(compact_catalog=True)
+    normal.fit()
+    compact.fit()
+    return normal, compact
+
+
+def test_compact_catalog_matches_the_normal_one(pair):
+    normal, compact = pair
+    assert (normal.vectors != compact.vectors).nnz == 0
+    assert _results(compact) == _results(normal)
+    assert "overview" not in compact.df.columns
+
+
+def test_added_movies_stay_out_of_the_frame(pair, make_model):
+    normal, compact = pair
+    for model in pair:
+        assert model.add_new_movie("New Movie", ["Western"], "w1, w7", "w7 w1 w7")
+    assert _results(compact) == _results(normal)
+    assert {"keywords", "overview"}.isdisjoint(compact.df.columns)
+    assert compact.recommend_by_keywords("w1, w7", top_n=1)[0]["overview"] == (
+        "w7 w1 w7"
+    )
+
+    # Reloading reads the user movie back into the store (compact shares the
+    # default user data), and a fresh fit learns its terms.
+    reloaded = make_model(compact_catalog=True)
+    reloaded.fit()
+    normal.compact()
+    assert {"keywords", "overview"}.isdisjoint(reloaded.df.columns)
+    assert (normal.vectors != reloaded.vectors).nnz == 0
+    assert _results(reloaded) == _results(normal)
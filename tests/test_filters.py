@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.filters import FilterIndex, MovieFilter
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(
+        {
+            "genres": ["Action, Drama", "Comedy", None, "Drama", "Horror"],
+            "release_date": ["1999-03-31", "2010-07-16", "2001-01-01", None, "2020"],
+            "vote_average": [8.7, 6.0, 7.5, 5.0, None],
+            "vote_count": [20_000, 150, 900, 40, 10],
+            "runtime": [136, 95, None, 120, 88],
+        }
+    )
+
+
+def _rows(index: FilterIndex, **fields) -> list:
+    return np.flatnonzero(index.mask(MovieFilter(**fields))).tolist()
+
+
+def test_mask_per_field(frame):
+    index = FilterIndex.build(frame)
+    assert _rows(index) == [0, 1, 2, 3, 4]
+    assert _rows(index, genres=["Drama"]) == [0, 3]
+    assert _rows(index, genres=["Comedy", "Horror"]) == [1, 4]
+    assert _rows(index, genres=["Western"]) == []
+    # Missing values fail every range tested against them.
+    assert _rows(index, year_min=2000, year_max=2015) == [1, 2]
+    assert _rows(index, min_rating=7) == [0, 2]
+    assert _rows(index, min_votes=150) == [0, 1, 2]
+    assert _rows(index, runtime_min=90, runtime_max=130) == [1, 3]
+
+
+def test_fields_combine(frame):
+    index = FilterIndex.build(frame)
+    assert _rows(index, genres=["Drama", "Comedy"], min_votes=100) == [0, 1]
+    assert _rows(index, genres=["Drama"], year_max=2000, min_rating=8) == [0]
+
+
+def test_append_matches_build(frame):
+    # More genres than one 64-bit word holds, so append widens the bitmap.
+    genres = ", ".join(f"Genre {i}" for i in range(70))
+    movie = {"genres": genres, "release_date": "2024-05-01", "vote_count": 3}
+
+    appended = FilterIndex.build(frame).append(movie)
+    built = FilterIndex.build(pd.concat([frame, pd.DataFrame([movie])]))
+    for fields in (
+        {"genres": ["Genre 69"]},
+        {"genres": ["Drama", "Genre 0"]},
+        {"year_min": 2015},
+        {"min_votes": 1, "runtime_max": 200},
+    ):
+        assert np.array_equal(
+            appended.mask(MovieFilter(**fields)), built.mask(MovieFilter(**fields))
+        )
+    assert _rows(appended, genres=["Genre 69"]) == [5]
+
+
+def test_from_dict_rejects_unknown_fields():
+    assert MovieFilter.from_dict({"genres": ["Drama"], "min_votes": "10"}) == (
+        MovieFilter(genres=["Drama"], min_votes=10)
+    )
+    assert MovieFilter(genres=[" ", ""]).is_empty()
+    with pytest.raises(ValueError):
+        MovieFilter.from_dict({"colour": "red"})
+
+
+def test_filtered_recommendations_pass_the_filter(model):
+    movie_filter = MovieFilter(genres=["Horror"], min_votes=300)
+    allowed = set(model.df["title"][model._filter_index.mask(movie_filter)])
+    results = model.recommend_by_movie("Movie 1", 10, filters=movie_filter)
+    assert results
+    assert {r["title"] for r in results} <= allowed
@@ -0,0 +1,17 @@
+import numpy as np
+from src.models.hashed import HashedTfidfVectorizer
+from tests.synthetic import make_catalog
+
+
+def test_parallel_fit_matches_serial_fit():
+    texts = make_catalog(2_000)["overview"].tolist()
+
+    serial = HashedTfidfVectorizer(n_jobs=1)
+    parallel = HashedTfidfVectorizer(n_jobs=2, min_chunk_size=500)
+    expected = serial.fit_transform(texts)
+    actual = parallel.fit_transform(texts)
+
+    np.testing.assert_allclose(parallel.idf_, serial.idf_)
+    assert (actual != expected).nnz == 0
+    query = ["w1 w2 w3"]
+    assert (parallel.transform(query) != serial.transform(query)).nnz == 0
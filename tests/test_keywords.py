@@ -0,0 +1,19 @@
+def test_term_vectors_survive_catalog_changes(model):
+    model.recommend_by_keywords("w1, w2", top_n=5)
+    misses = model._term_vectors.stats()["misses"]
+
+    assert model.add_new_movie("New Movie", ["Drama"], "w1, w2", "w1 w2 w1 w2")
+    results = model.recommend_by_keywords("w1, w2", top_n=5)
+
+    assert model._term_vectors.stats()["misses"] == misses
+    assert "New Movie" in [r["title"] for r in results]
+
+
+def test_term_vectors_are_dropped_on_refit(model):
+    model.recommend_by_keywords("w1, w2", top_n=5)
+    misses = model._term_vectors.stats()["misses"]
+
+    model.fit()
+    model.recommend_by_keywords("w1, w2", top_n=5)
+
+    assert model._term_vectors.stats()["misses"] == misses + 2
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.models.ann import IVFSearch
+from src.models.filters import MovieFilter
+
+FILTERS = [None, MovieFilter(genres=["Drama"]), MovieFilter(min_votes=500)]
+
+
+def _titles(results):
+    return [r["title"] for r in results]
+
+
+@pytest.fixture
+def exact(make_model):
+    model = make_model()
+    model.fit(neighbors=0)
+    return model
+
+
+@pytest.fixture
+def tabled(make_model):
+    model = make_model(telemetry=True)
+    model.fit(neighbors=20)
+    return model
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_neighbor_table_matches_exact_search(exact, tabled, filters):
+    for i in range(0, 300, 15):
+        title = f"Movie {i}"
+        assert _titles(tabled.recommend_by_movie(title, 5, filters=filters)) == (
+            _titles(exact.recommend_by_movie(title, 5, filters=filters))
+        )
+    assert tabled.telemetry.snapshot()["counters"]["neighbor_table_hits"] > 0
+
+
+def test_neighbor_table_block_budget(make_model, tabled):
+    # One row per block scores the same pairs as the default budget.
+    model = make_model()
+    model.fit(neighbors=20, max_block_bytes=1)
+    assert np.array_equal(model._neighbor_idx, tabled._neighbor_idx)
+    assert np.array_equal(model._neighbor_scores, tabled._neighbor_scores)
+
+
+def test_neighbor_table_from_ivf_candidates(make_model):
+    model = make_model(search=IVFSearch(n_lists=8, n_probe=2))
+    model.fit(neighbors=20)
+
+    n_items = model.vectors.shape[0]
+    rows = np.arange(n_items)[:, None]
+    finite = np.isfinite(model._neighbor_scores)
+    # Every entry is another movie, or padding at -inf.
+    assert not (finite & (model._neighbor_idx == rows)).any()
+    assert finite.any(axis=1).all()
+    assert _titles(model.recommend_by_movie("Movie 0", 5))
+
+
+def test_exact_neighbor_table_is_capped(monkeypatch, make_model):
+    monkeypatch.setattr("src.models.recommender.NEIGHBOR_EXACT_ROWS", 100)
+    model = make_model()
+    model.fit(neighbors=20)
+    assert model._neighbor_idx is None
+    assert _titles(model.recommend_by_movie("Movie 0", 5))
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from src.models.snapshot import pinned
+
+
+def _dense(matrix) -> np.ndarray:
+    return matrix.toarray() if hasattr(matrix, "toarray") else np.asarray(matrix)
+
+
+def _rebuilt_sums(model, user_id="default"):
+    # The like/dislike sums a profile rebuilt from scratch would hold.
+    profile = model._profiles.get(user_id)
+    with profile.lock:
+        profile.sums_version = -1
+    model.recommend_personal(top_n=5, user_id=user_id)
+    return profile.like_count, _dense(profile.like_sum)
+
+
+def test_rating_on_older_snapshot_reaches_newer_sums(model):
+    model.save_rating("Movie 1", "like")
+    model.save_rating("Movie 2", "like")
+
+    # A rating request pins the published snapshot, then a writer publishes
+    # a newer one and another request rebuilds the sums against it.
+    old = model._snapshot
+    assert model.add_new_movie("New Movie", ["Drama"], "w1, w2", "a new one")
+    model.recommend_personal(top_n=5)
+
+    # Only the newer snapshot has the rated movie.
+    with pinned(model, old, writable=False):
+        model.save_rating("New Movie", "like")
+
+    profile = model._profiles.get("default")
+    model.recommend_personal(top_n=5)
+    like_count, like_sum = profile.like_count, _dense(profile.like_sum)
+
+    expected_count, expected_sum = _rebuilt_sums(model)
+    assert like_count == expected_count == 3
+    np.testing.assert_allclose(like_sum, expected_sum)
+
+
+def test_incremental_sums_match_rebuild(model):
+    model.save_rating("Movie 1", "like")
+    model.save_rating("Movie 2", "dislike")
+    model.recommend_personal(top_n=5)
+
+    model.save_rating("Movie 2", "like")
+    model.save_rating("Movie 4", "dislike")
+    model.remove_rating("Movie 1")
+
+    profile = model._profiles.get("default")
+    like_count, like_sum = profile.like_count, _dense(profile.like_sum)
+    assert profile.dislike_count == 1
+
+    expected_count, expected_sum = _rebuilt_sums(model)
+    assert like_count == expected_count == 1
+    np.testing.assert_allclose(like_sum, expected_sum, atol=1e-9)
+
+
+def test_clear_on_older_snapshot_empties_the_profile(model):
+    model.save_rating("Movie 1", "like")
+    old = model._snapshot
+    assert model.add_new_movie("New Movie", ["Drama"], "w1, w2", "a new one")
+    model.recommend_personal(top_n=5)
+
+    with pinned(model, old, writable=False):
+        model.clear_all_ratings()
+
+    assert model.recommend_personal(top_n=5) == []
+
+
+def test_get_ratings_returns_a_copy(model):
+    model.save_rating("Movie 1", "like")
+    ratings = model.get_ratings()
+    ratings["Movie 2"] = "like"
+    model.save_rating("Movie 3", "dislike")
+
+    assert ratings == {"Movie 1": "like", "Movie 2": "like"}
+    assert model.get_ratings() == {"Movie 1": "like", "Movie 3": "dislike"}
+
+
+@pytest.mark.parametrize("model", [{"features": "hashed"}], indirect=True)
+def test_profile_sums_hold_only_rated_terms(model):
+    model.save_rating("Movie 1", "like")
+    model.save_rating("Movie 2", "dislike")
+    assert model.recommend_personal(top_n=5)
+
+    # A dense row of the hashed feature space would take megabytes.
+    assert model.vectors.shape[1] >= 1 << 18
+    assert model._profiles.get("default").nbytes() < 64 << 10
+
+
+@pytest.mark.parametrize("model", [{"representation": "lsa"}], indirect=True)
+def test_lsa_profile_recommendations(model):
+    model.save_rating("Movie 1", "like")
+    model.save_rating("Movie 2", "dislike")
+    titles = [r["title"] for r in model.recommend_personal(top_n=5)]
+    assert len(titles) == 5 and "Movie 1" not in titles
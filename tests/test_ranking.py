@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from src.models.recommender import _top_n_indices, _top_n_per_row
+
+
+def _reference(scores: np.ndarray, top_n: int) -> np.ndarray:
+    # Full stable sort: score descending, then row index.
+    return np.argsort(-scores, kind="stable")[:top_n]
+
+
+def test_all_tied_scores_rank_the_first_rows():
+    scores = np.zeros(10_000, dtype=np.float32)
+    np.testing.assert_array_equal(_top_n_indices(scores, 5), np.arange(5))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ties_at_the_cutoff_follow_row_order(seed):
+    rng = np.random.default_rng(seed)
+    # Few distinct values, so most cutoffs fall inside a tie.
+    scores = rng.integers(0, 4, 1_000).astype(np.float32)
+    for top_n in (1, 7, 50, 999, 1_000, 2_000):
+        np.testing.assert_array_equal(
+            _top_n_indices(scores, top_n), _reference(scores, top_n)
+        )
+
+
+def test_excluded_rows_are_skipped():
+    scores = np.array([1.0, 1.0, 1.0, 0.5, 1.0], dtype=np.float32)
+    excluded = np.array([False, True, False, False, False])
+    np.testing.assert_array_equal(
+        _top_n_indices(scores, 3, excluded), np.array([0, 2, 4])
+    )
+    assert len(_top_n_indices(scores, 10, np.ones(5, dtype=bool))) == 0
+
+
+def test_per_row_matches_single_row():
+    rng = np.random.default_rng(0)
+    block = rng.integers(0, 3, (20, 500)).astype(np.float32)
+    block[3] = 0.0
+    top = _top_n_per_row(block, 10)
+    for i, row in enumerate(block):
+        np.testing.assert_array_equal(top[i], _reference(row, 10))
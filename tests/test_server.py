@@ -0,0 +1,127 @@
+import asyncio
+import json
+import pytest
+from src.data.catalog import json_safe
+from src.service.client import InProcessClient, ServiceError
+from src.service.server import MAX_BODY_BYTES, RecommendationService
+
+
+async def _exchange(service: RecommendationService, raw: bytes):
+    # Sends one raw request over a real socket; returns (status, JSON body).
+    server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=10)
+        writer.close()
+
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    return status, json.loads(body)
+
+
+def _post(path: str, body: bytes, length: str) -> bytes:
+    return (
+        f"POST {path} HTTP/1.1\r\nContent-Length: {length}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode() + body
+
+
+@pytest.fixture
+def service(model):
+    service = RecommendationService(model)
+    yield service
+    service.close()
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1.5"])
+def test_bad_content_length_is_rejected(service, length):
+    status, body = asyncio.run(
+        _exchange(service, _post("/recommend/movie", b"", length))
+    )
+    assert status == 400
+    assert "error" in body
+
+
+def test_oversized_body_is_rejected(service):
+    raw = _post("/recommend/movie", b"", str(MAX_BODY_BYTES + 1))
+    status, _ = asyncio.run(_exchange(service, raw))
+    assert status == 413
+
+
+def test_malformed_json_is_rejected(service):
+    status, body = asyncio.run(_exchange(service, _post("/recommend/movie", b"{", "1")))
+    assert status == 400
+    assert body == {"error": "Body must be a JSON object"}
+
+
+def test_valid_request_over_http(service):
+    payload = json.dumps({"title": "Movie 1", "top_n": 3}).encode()
+    raw = _post("/recommend/movie", payload, str(len(payload)))
+    status, body = asyncio.run(_exchange(service, raw))
+    assert status == 200
+    assert len(body["results"]) == 3
+
+
+@pytest.mark.parametrize(
+    "path, payload",
+    [
+        ("/recommend/movie", {"top_n": 3}),
+        ("/recommend/movie", {"title": "Movie 1", "top_n": "many"}),
+        ("/recommend/movie", {"title": "Movie 1", "filters": {"colour": "red"}}),
+        ("/recommend/keywords", {"keywords": "w1", "strategy": "median"}),
+        ("/ratings", {"title": "Movie 1", "rating": "meh"}),
+    ],
+)
+def test_invalid_payload_is_rejected(service, path, payload):
+    async def call():
+        with pytest.raises(ServiceError) as error:
+            await InProcessClient(service).request("POST", path, payload)
+        return error.value.status
+
+    assert asyncio.run(call()) == 400
+
+
+def test_unknown_route(service):
+    async def call():
+        return await service.dispatch("GET", "/nope", {})
+
+    status, _ = asyncio.run(call())
+    assert status == 404
+
+
+def test_service_queries_use_the_neighbor_table_and_cache(make_model):
+    model = make_model(telemetry=True)
+    model.fit(neighbors=20)
+    service = RecommendationService(model)
+    client = InProcessClient(service)
+
+    async def call():
+        # Concurrent requests are batched together.
+        first = await asyncio.gather(
+            client.recommend_by_movie("Movie 1", top_n=5),
+            client.recommend_by_movie("Movie 2", top_n=5),
+        )
+        again = await client.recommend_by_movie("Movie 1", top_n=5)
+        health = await client.request("GET", "/health")
+        return first, again, health
+
+    try:
+        (first, second), again, health = asyncio.run(call())
+    finally:
+        service.close()
+
+    assert health["result_cache"]["hits"] == 1
+    assert health["result_cache"]["misses"] == 2
+
+    expected = model.recommend_by_movie("Movie 1", top_n=5)
+    assert first == again == json_safe(expected)
+    assert second == json_safe(model.recommend_by_movie("Movie 2", top_n=5))
+
+    counters = model.telemetry.snapshot()["counters"]
+    assert counters["neighbor_table_hits"] == 2
+    # The repeated request and the two direct calls.
+    assert counters["result_cache_hits"] == 3
+    assert counters["result_cache_misses"] == 2
@@ -0,0 +1,69 @@
+import json
+import sqlite3
+
+from src.data.storage import DEFAULT_USER, JSONStorage, SQLiteStorage
+
+
+def test_v1_ratings_are_migrated(tmp_path):
+    path = str(tmp_path / "user_data.db")
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "CREATE TABLE ratings (title TEXT PRIMARY KEY, rating TEXT NOT NULL)"
+        )
+        conn.executemany(
+            "INSERT INTO ratings (title, rating) VALUES (?, ?)",
+            [("Movie 2", "like"), ("Movie 1", "dislike"), ("Movie 3", "like")],
+        )
+        conn.execute("PRAGMA user_version=1")
+    conn.close()
+
+    storage = SQLiteStorage(path)
+    # Insertion order is kept and the ratings belong to the default user.
+    assert list(storage.load_ratings(DEFAULT_USER).items()) == [
+        ("Movie 2", "like"),
+        ("Movie 1", "dislike"),
+        ("Movie 3", "like"),
+    ]
+    storage.set_rating("alice", "Movie 2", "dislike")
+    assert storage.load_ratings("alice") == {"Movie 2": "dislike"}
+    assert storage.load_ratings(DEFAULT_USER)["Movie 2"] == "like"
+    storage.close()
+
+    (version,) = sqlite3.connect(path).execute("PRAGMA user_version").fetchone()
+    assert version == SQLiteStorage.SCHEMA_VERSION
+
+
+def test_json_files_are_imported_once(tmp_path):
+    movies_path = str(tmp_path / "user_movies.json")
+    ratings_path = str(tmp_path / "user_ratings.json")
+    movies = [{"id": 1, "title": "Mine"}, {"id": 2, "title": "Also Mine"}]
+    with open(movies_path, "w") as f:
+        json.dump(movies, f)
+    # The single-user layout: title -> rating.
+    with open(ratings_path, "w") as f:
+        json.dump({"Mine": "like", "Movie 1": "dislike"}, f)
+
+    path = str(tmp_path / "user_data.db")
+    storage = SQLiteStorage(path, movies_path, ratings_path)
+    assert storage.load_movies() == movies
+    assert storage.load_ratings(DEFAULT_USER) == {"Mine": "like", "Movie 1": "dislike"}
+    storage.remove_movie("Mine")
+    storage.close()
+
+    # An existing database is not imported into again.
+    storage = SQLiteStorage(path, movies_path, ratings_path)
+    assert storage.load_movies() == movies[1:]
+    storage.close()
+
+
+def test_per_user_json_ratings_are_imported(tmp_path):
+    ratings_path = str(tmp_path / "user_ratings.json")
+    JSONStorage(str(tmp_path / "user_movies.json"), ratings_path).set_rating(
+        "alice", "Movie 1", "like"
+    )
+
+    storage = SQLiteStorage(str(tmp_path / "user_data.db"), legacy_ratings=ratings_path)
+    assert storage.load_ratings("alice") == {"Movie 1": "like"}
+    assert storage.load_ratings(DEFAULT_USER) == {}
+    storage.close()
@@ -0,0 +1,69 @@
+import pytest
+
+from src.models import title_search
+from src.models.title_search import TitleSearchIndex, normalize_title
+
+TITLES = {
+    "The Matrix": 90.0,
+    "The Matrix Reloaded": 60.0,
+    "The Mask": 40.0,
+    "Amélie": 30.0,
+    "Matrimony": 5.0,
+    "Heat": 50.0,
+    "Heathers": 20.0,
+    "Up": None,
+}
+
+
+@pytest.fixture
+def index():
+    return TitleSearchIndex.build(list(TITLES), list(TITLES.values()))
+
+
+def test_normalize_title():
+    assert normalize_title("  Amélie: Le Fabuleux_Destin!  ") == (
+        "amelie le fabuleux destin"
+    )
+
+
+def test_exact_then_prefix_by_popularity(index):
+    assert index.search("heat", 5)[:2] == ["Heat", "Heathers"]
+    assert index.search("the ma", 3) == [
+        "The Matrix",
+        "The Matrix Reloaded",
+        "The Mask",
+    ]
+    assert index.search("THE MATRIX", 1) == ["The Matrix"]
+    assert index.search("ameli", 1) == ["Amélie"]
+    assert index.search("up", 1) == ["Up"]
+
+
+def test_trigrams_match_inner_words_and_typos(index):
+    assert index.search("matrix", 2) == ["The Matrix", "The Matrix Reloaded"]
+    assert index.search("matirx reloaded", 1) == ["The Matrix Reloaded"]
+    assert index.search("zzzz", 5) == []
+
+
+def test_added_and_removed_titles(index):
+    changed = index.append("The Matrix Resurrections", 70.0).remove(["The Mask"])
+    assert changed.search("the ma", 3) == [
+        "The Matrix",
+        "The Matrix Resurrections",
+        "The Matrix Reloaded",
+    ]
+    assert "The Mask" not in changed.search("mask", 5)
+    # The original index is unchanged.
+    assert index.search("the mas", 1) == ["The Mask"]
+
+
+def test_precomputed_prefix_tops_match_a_scan(monkeypatch):
+    titles = [f"Movie {i}" for i in range(300)]
+    popularity = [float((i * 37) % 101) for i in range(300)]
+    queries = ("m", "movie", "movie 1", "movie 2")
+    index = TitleSearchIndex.build(titles, popularity)
+    scanned = [index.search(query, 10) for query in queries]
+
+    monkeypatch.setattr(title_search, "PREFIX_SCAN_LIMIT", 8)
+    index = TitleSearchIndex.build(titles, popularity)
+    assert "movie 1" in index.top_by_prefix
+    assert [index.search(query, 10) for query in queries] == scanned